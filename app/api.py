@@ -1,25 +1,63 @@
 # app/api.py
 from flask import Blueprint, request, jsonify
+from flask_login import login_required
 import pandas as pd
-from app.chronos_model import forecast_with_chronos
+from app.worker_pool import run_forecast
+from app import deadline as deadlines
+from app.deadline import Deadline, DEFAULT_TIMEOUT
 
 forecast_bp = Blueprint("forecast_api", __name__)
 
 @forecast_bp.route("/forecast", methods=["POST"])
+@login_required
 def forecast():
     try:
         payload = request.get_json()
-        df = pd.DataFrame(payload["data"])
-        result, logs = forecast_with_chronos(
-            df,
-            id_col=payload.get("id_col"),
-            timestamp_col=payload.get("timestamp_col"),
-            target_col=payload.get("target_col"),
-            freq=payload.get("freq", "D"),
-            prediction_length=int(payload.get("prediction_length", 7)),
-            chronos_model=payload.get("chronos_model", "amazon/chronos-t5-tiny"),
-        )
-        return jsonify({"forecast": result.reset_index().to_dict(orient="records"), "log": logs})
+        # client-side timeout (seconds): stop working once the caller has given up
+        deadline = Deadline(float(payload.get("timeout", DEFAULT_TIMEOUT)), request_id=payload.get("request_id"))
+        with deadlines.track(deadline):
+            df = pd.DataFrame(payload["data"])
+            result, logs = run_forecast(
+                df,
+                id_col=payload.get("id_col"),
+                timestamp_col=payload.get("timestamp_col"),
+                target_col=payload.get("target_col"),
+                freq=payload.get("freq", "D"),
+                prediction_length=int(payload.get("prediction_length", 7)),
+                chronos_model=payload.get("chronos_model", "amazon/chronos-t5-tiny"),
+                deadline=deadline,
+            )
+        return jsonify({
+            "forecast": result.reset_index(drop=True).to_dict(orient="records"),
+            "log": logs,
+            "request_id": deadline.request_id,
+            "partial": bool(result.attrs.get("partial", False)),
+            "missing_series": list(result.attrs.get("missing_series", [])),
+            # set when Chronos could not run and the statistical engine answered instead
+            "engine_error": result.attrs.get("engine_error"),
+        })
     except Exception as e:
         import traceback
         return jsonify({"forecast": [], "log": traceback.format_exc(), "error": str(e)})
+
+
+@forecast_bp.route("/forecast/cancel", methods=["POST"])
+@login_required
+def cancel_forecast():
+    """Cooperatively cancel an in-flight /forecast call by its request_id (in any gunicorn worker)."""
+    payload = request.get_json(silent=True) or {}
+    request_id = payload.get("request_id")
+    if not request_id:
+        return jsonify({"success": False, "error": "request_id required"}), 400
+    return jsonify({"success": deadlines.cancel(request_id)})
+
+
+@forecast_bp.route("/forecast/workers", methods=["GET"])
+@login_required
+def worker_memory():
+    """Per-process memory of the inference pool (RSS / PSS / shared / private MB)."""
+    from app.worker_pool import get_pool
+    pool = get_pool()
+    if pool is None:
+        return jsonify({"workers": [], "mode": "in-process"})
+    return jsonify({"workers": pool.memory_report(), "mode": "prefork" if pool.prefork else "spawn"})
@@ -0,0 +1,219 @@
+# app/chronos_export.py
+"""
+Export Chronos-Bolt to an optimized CPU graph and run it without eager PyTorch.
+
+    python -m app.chronos_export amazon/chronos-bolt-tiny                   # TorchScript
+    python -m app.chronos_export amazon/chronos-bolt-small --format onnx    # ONNX Runtime
+    python -m app.chronos_export amazon/chronos-bolt-tiny --no-verify
+
+The graph takes a NaN left-padded (batch, context_length) float32 context and
+returns the model's native quantiles (batch, n_quantiles, model_horizon) in
+the original scale. It is written next to the model artifacts together with
+an export.json sidecar; load_pipeline() picks it up automatically when it is
+present (CHRONOS_USE_EXPORTED=0 disables that).
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+EXPORT_ROOT = os.environ.get(
+    "CHRONOS_EXPORT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "exported"),
+)
+USE_EXPORTED = os.environ.get("CHRONOS_USE_EXPORTED", "1") in ("1", "true", "True")
+FORMATS = {"torchscript": "bolt.ts", "onnx": "bolt.onnx"}
+SIDECAR = "export.json"
+
+
+def export_dir(model_id: str) -> str:
+    """Exports live inside a local model directory, else under EXPORT_ROOT/<org>__<name>."""
+    if os.path.isdir(model_id):
+        return os.path.join(model_id, "exported")
+    return os.path.join(EXPORT_ROOT, model_id.replace("/", "__"))
+
+
+def find_export(model_id: str):
+    """Path of the sidecar for an existing export of `model_id`, or None."""
+    sidecar = os.path.join(export_dir(model_id), SIDECAR)
+    return sidecar if os.path.isfile(sidecar) else None
+
+
+def _graph_module(model):
+    import torch
+
+    class BoltGraph(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, context):
+            return self.inner(context=context).quantile_preds
+
+    return BoltGraph(model).eval()
+
+
+def export_bolt(model_id: str, fmt: str = "torchscript", batch_size: int = 4) -> str:
+    """Trace/export the Bolt model of `model_id`; returns the sidecar path."""
+    from app.chronos_pipeline import load_pipeline
+
+    pipeline = load_pipeline(model_id, precision="fp32", use_exported=False)
+    return export_model(pipeline.model, export_dir(model_id), fmt, model_id=model_id, batch_size=batch_size)
+
+
+def export_model(model, out_dir: str, fmt: str = "torchscript", model_id: str = None, batch_size: int = 4) -> str:
+    """Export an eager Bolt model (ChronosBoltModelForForecasting) into `out_dir`; returns the sidecar path."""
+    import torch
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {list(FORMATS)}")
+    config = model.chronos_config
+    context_length = int(config.context_length)
+    graph = _graph_module(model)
+    example = torch.randn(batch_size, context_length)
+    example[:, : context_length // 2] = float("nan")   # padded prefix, like real inputs
+
+    os.makedirs(out_dir, exist_ok=True)
+    graph_path = os.path.join(out_dir, FORMATS[fmt])
+    with torch.inference_mode():
+        if fmt == "torchscript":
+            traced = torch.jit.trace(graph, example, check_trace=False)
+            traced = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+            traced.save(graph_path)
+        else:
+            torch.onnx.export(
+                graph, (example,), graph_path,
+                input_names=["context"], output_names=["quantiles"],
+                dynamic_axes={"context": {0: "batch"}, "quantiles": {0: "batch"}},
+                opset_version=17,
+            )
+
+    meta = {
+        "model_id": model_id,
+        "format": fmt,
+        "file": FORMATS[fmt],
+        "context_length": context_length,
+        "prediction_length": int(config.prediction_length),
+        "quantiles": [float(q) for q in config.quantiles],
+    }
+    sidecar = os.path.join(out_dir, SIDECAR)
+    with open(sidecar, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return sidecar
+
+
+class ExportedBoltPipeline:
+    """
+    Drop-in for the Bolt pipeline's predict_quantiles() backed by an exported
+    graph (TorchScript or ONNX Runtime). Horizons longer than the model's
+    native prediction_length are not supported here; callers fall back to eager.
+    """
+
+    def __init__(self, sidecar_path: str):
+        with open(sidecar_path, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.context_length = self.meta["context_length"]
+        self.prediction_length = self.meta["prediction_length"]
+        self.quantiles = np.asarray(self.meta["quantiles"], dtype=np.float64)
+        graph_path = os.path.join(os.path.dirname(sidecar_path), self.meta["file"])
+        if self.meta["format"] == "onnx":
+            import onnxruntime as ort
+            self._session = ort.InferenceSession(graph_path, providers=["CPUExecutionProvider"])
+            self._run = lambda x: self._session.run(None, {"context": x})[0]
+        else:
+            import torch
+            self._module = torch.jit.load(graph_path, map_location="cpu").eval()
+
+            def _run(x):
+                with torch.inference_mode():
+                    return self._module(torch.from_numpy(x)).numpy()
+            self._run = _run
+
+    def supports(self, prediction_length: int) -> bool:
+        return int(prediction_length) <= self.prediction_length
+
+    def _stack(self, context) -> np.ndarray:
+        L = self.context_length
+        batch = np.full((len(context), L), np.nan, dtype=np.float32)
+        for i, c in enumerate(context):
+            c = np.asarray(c, dtype=np.float32)[-L:]
+            if len(c):
+                batch[i, L - len(c):] = c
+        return batch
+
+    def predict_quantiles(self, context, prediction_length: int, quantile_levels, **kwargs):
+        import torch
+
+        if not self.supports(prediction_length):
+            raise ValueError(
+                f"exported graph covers {self.prediction_length} steps, {prediction_length} requested"
+            )
+        raw = self._run(self._stack(context))[:, :, :prediction_length]   # (B, Qm, H)
+        raw = np.swapaxes(raw, 1, 2)                                      # (B, H, Qm)
+        # interpolate the model's native levels to the requested grid (clamped at the edges)
+        levels = np.asarray(quantile_levels, dtype=np.float64)
+        idx = np.clip(np.searchsorted(self.quantiles, levels) - 1, 0, len(self.quantiles) - 2)
+        lo, hi = self.quantiles[idx], self.quantiles[idx + 1]
+        w = np.clip((levels - lo) / (hi - lo), 0.0, 1.0).astype(np.float32)
+        q = raw[..., idx] * (1 - w) + raw[..., idx + 1] * w
+        median_idx = int(np.argmin(np.abs(self.quantiles - 0.5)))
+        mean = raw[..., median_idx]
+        return torch.from_numpy(np.ascontiguousarray(q)), torch.from_numpy(np.ascontiguousarray(mean))
+
+
+def synthetic_contexts(n_series: int = 8, min_length: int = 16, max_length: int = 400, seed: int = 0) -> list:
+    """Noisy weekly sines of random length (shorter and longer than typical context lengths)."""
+    rng = np.random.default_rng(seed)
+    contexts = []
+    for i in range(n_series):
+        n = int(rng.integers(min_length, max_length))
+        t = np.arange(n)
+        contexts.append((10 + np.sin(2 * np.pi * t / 7) * (i + 1) + rng.normal(0, 0.3, n)).astype(np.float32))
+    return contexts
+
+
+def verify_export(model_id: str, sidecar: str, n_series: int = 8, rtol: float = 1e-3, atol: float = 1e-3,
+                  eager=None, quantile_levels=None) -> float:
+    """
+    Compare exported vs eager quantiles on synthetic series; returns max abs diff
+    (AssertionError beyond rtol / atol). `eager` defaults to the fp32 pipeline
+    of `model_id`, `quantile_levels` to the model's native levels.
+    """
+    import torch
+    from app.chronos_pipeline import load_pipeline
+
+    contexts = synthetic_contexts(n_series)
+    exported = ExportedBoltPipeline(sidecar)
+    if eager is None:
+        eager = load_pipeline(model_id, precision="fp32", use_exported=False)
+    levels = [float(q) for q in (quantile_levels if quantile_levels is not None else exported.quantiles)]
+    horizon = min(exported.prediction_length, 14)
+    with torch.inference_mode():
+        q_eager, _ = eager.predict_quantiles([torch.from_numpy(c) for c in contexts], horizon, levels)
+    q_exp, _ = exported.predict_quantiles(contexts, horizon, levels)
+    q_eager, q_exp = q_eager.float().numpy(), q_exp.numpy()
+    diff = float(np.max(np.abs(q_eager - q_exp)))
+    if not np.allclose(q_eager, q_exp, rtol=rtol, atol=atol):
+        raise AssertionError(f"exported graph differs from eager model (max abs diff {diff:.6f})")
+    return diff
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model_id")
+    parser.add_argument("--format", choices=list(FORMATS), default="torchscript")
+    parser.add_argument("--no-verify", action="store_true")
+    args = parser.parse_args(argv)
+
+    from app.chronos_pipeline import is_bolt
+    if not is_bolt(args.model_id):
+        raise SystemExit("[export] only Chronos-Bolt models can be exported")
+    sidecar = export_bolt(args.model_id, args.format)
+    print(f"[export] {args.model_id} -> {os.path.dirname(sidecar)}")
+    if not args.no_verify:
+        print(f"[export] equivalence OK (max abs diff {verify_export(args.model_id, sidecar):.2e})")
+
+
+if __name__ == "__main__":
+    main()
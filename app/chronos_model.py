@@ -1,8 +1,19 @@
-from autogluon.timeseries import TimeSeriesPredictor
-from autogluon.timeseries import TimeSeriesDataFrame
 import pandas as pd
 import sys, io, logging, contextlib
 
+from app.deadline import Deadline, DeadlineExceeded, DEFAULT_TIMEOUT
+from app import statistical_model
+from app.model_selection import AUTO_MODEL, DEFAULT_TARGET_LATENCY, select_model
+from app.quantiles import ensure_levels, normalize_quantile_columns, quantile_columns
+from app import chronos_pipeline, model_registry, predictor_registry
+
+# when less than this many seconds are left before model load, switch to the fast variant
+FAST_FALLBACK_MODEL = "amazon/chronos-bolt-tiny"
+FAST_FALLBACK_BELOW = 30
+# below this, don't load Chronos at all: the statistical engine answers the request
+STATISTICAL_FALLBACK_BELOW = 10
+# number of series per predict() call; the deadline is checked between batches
+PREDICT_BATCH_SIZE = 64
 
 
 class TeeLogger(io.StringIO):
@@ -19,6 +30,18 @@ class TeeLogger(io.StringIO):
 
 
 
+def _batches(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _statistical(df, id_col, timestamp_col, freq, prediction_length, levels):
+    return statistical_model.forecast_statistical(
+        df, id_col, timestamp_col, 'target', freq=freq, prediction_length=prediction_length,
+        quantile_levels=levels,
+    )
+
+
 def forecast_with_chronos(
     df: pd.DataFrame,
     id_col: str,
@@ -26,45 +49,82 @@ def forecast_with_chronos(
     target_col: str,
     freq: str = "D",
     prediction_length: int = 7,
-    chronos_model: str = 'amazon/chronos-t5-tiny'
+    chronos_model: str = 'amazon/chronos-t5-tiny',
+    deadline: Deadline = None,
+    batch_size: int = PREDICT_BATCH_SIZE,
+    short_series_length: int = statistical_model.SHORT_SERIES_LENGTH,
+    quantile_levels=None,
+    bolt_fast_path: bool = True,
+    precision: str = None,
 ):
+    """
+    Zero-shot Chronos forecast via AutoGluon.
+
+    The result holds the full quantile grid (`quantile_levels`, default
+    DEFAULT_QUANTILE_LEVELS) as p05 ... p95 columns next to 'mean'. Chronos-Bolt
+    variants skip AutoGluon and predict those quantiles natively in one
+    forward pass (see app.chronos_pipeline) unless `bolt_fast_path` is False.
+    `precision` (fp32 / bf16 / int8, default per model from the env) other
+    than fp32 also routes T5 models through that cached pipeline.
+
+    `deadline` carries the request budget through dataset build, model load and
+    predict. Series shorter than `short_series_length` go to the statistical
+    engine directly; when the deadline expires before/while Chronos runs, the
+    remaining series fall back to it too. Every row is tagged in the `engine`
+    column. A cancelled request returns the series finished so far and sets
+    `df_pred.attrs["partial"]` (missing ids in `df_pred.attrs["missing_series"]`).
+
+    A Chronos model that is not in the registry (or whose predictor cannot be
+    fitted) is answered statistically with the reason in
+    `df_pred.attrs["engine_error"]`; model_registry.IntegrityError (weights not
+    matching the registry) is raised to the caller.
+    """
+    if deadline is None:
+        deadline = Deadline(DEFAULT_TIMEOUT)
     log_capture = TeeLogger()
     sys_stdout_backup = sys.stdout
     sys.stdout = log_capture
+    levels = ensure_levels(quantile_levels)
+    columns = ['item_id', 'timestamp', 'mean', *quantile_columns(levels), 'engine']
     try:
+        deadline.check("dataset")
         if target_col != 'target':
             df = df.rename(columns={target_col: 'target'})
         df = df.sort_values([id_col, timestamp_col])
-        ts_df = TimeSeriesDataFrame.from_data_frame(df, id_column=id_col, timestamp_column=timestamp_col)
-        hyperparameters = {
-            "Chronos": [
-                {
-                    "model_path": chronos_model,
-                    "ag_args": {"name_suffix": "-ZeroShot"}
-                }
-            ]
-        }
-        predictor = TimeSeriesPredictor(
-            prediction_length=prediction_length,
-            path=None
-        ).fit(
-            train_data=ts_df,
-            hyperparameters=hyperparameters,
-            time_limit=60*3,
-            enable_ensemble=False
-        )
-        # FIX: beri argumen data!
-        pred = predictor.predict(data=ts_df)
-        df_pred = pred.copy()
-        if 'mean' not in df_pred.columns:
-            if 0.5 in df_pred.columns:
-                df_pred['mean'] = df_pred[0.5]
-        if '0.1' in df_pred.columns and '0.9' in df_pred.columns:
-            df_pred['p10'] = df_pred['0.1']
-            df_pred['p90'] = df_pred['0.9']
-        df_pred = df_pred.reset_index()
+
+        frames, missing, engine_error = [], [], None
+        # short series: the transformer has nothing to condition on, use the fast engine
+        lengths = df.groupby(id_col)[timestamp_col].size()
+        short_ids = lengths.index[lengths < short_series_length].tolist()
+        if short_ids:
+            print(f"[statistical] {len(short_ids)} series shorter than {short_series_length} points")
+            frames.append(_statistical(df[df[id_col].isin(short_ids)], id_col, timestamp_col, freq, prediction_length, levels))
+            df = df[~df[id_col].isin(short_ids)]
+
+        if not df.empty:
+            chronos_pred, missing, engine_error = _forecast_chronos_part(
+                df, id_col, timestamp_col, freq, prediction_length, chronos_model, deadline, batch_size,
+                levels, bolt_fast_path, precision,
+            )
+            frames.append(chronos_pred)
+            if missing and not deadline.cancelled:
+                print(f"[statistical] deadline fallback for {len(missing)} series")
+                frames.append(_statistical(df[df[id_col].isin(missing)], id_col, timestamp_col, freq, prediction_length, levels))
+                missing = []
+
+        frames = [f for f in frames if not f.empty]
+        # nothing forecast (e.g. cancelled before the first batch): keep the partial attrs below
+        df_pred = pd.concat(frames, ignore_index=True)[columns] if frames else pd.DataFrame(columns=columns)
+        df_pred.attrs["partial"] = bool(missing)
+        df_pred.attrs["missing_series"] = missing
+        df_pred.attrs["engines"] = df_pred.groupby('item_id')['engine'].first().to_dict()
+        df_pred.attrs["engine_error"] = engine_error
+        print(f"[deadline] stages: {deadline.stages}")
         logs = log_capture.getvalue()
-        return df_pred[['timestamp', 'mean', 'p10', 'p90']], logs
+        return df_pred, logs
+    except model_registry.IntegrityError:
+        # corrupted / tampered weights: never hidden behind a statistical answer
+        raise
     except Exception as e:
         logs = log_capture.getvalue() + f"\nException: {str(e)}"
         # Return empty DataFrame + logs, so unpacking always safe
@@ -73,4 +133,103 @@ def forecast_with_chronos(
         sys.stdout = sys_stdout_backup
 
 
+def _forecast_chronos_part(df, id_col, timestamp_col, freq, prediction_length, chronos_model, deadline, batch_size,
+                           levels, bolt_fast_path=True, precision=None):
+    """
+    Run Chronos on `df`; returns (pred_df, ids_not_forecast, engine_error): ids
+    not forecast before the deadline or because Chronos could not run, and why
+    not in the latter case (None otherwise).
+    """
+    item_ids = sorted(df[id_col].unique().tolist())
+    columns = ['item_id', 'timestamp', 'mean', *quantile_columns(levels), 'engine']
+    empty = pd.DataFrame(columns=columns)
+
+    if chronos_model == AUTO_MODEL:
+        history = int(df.groupby(id_col).size().median())
+        target = min(DEFAULT_TARGET_LATENCY, deadline.remaining())
+        chronos_model, estimate = select_model(len(item_ids), history, prediction_length, target)
+        print(f"[auto] picked {chronos_model} (~{estimate:.1f}s predicted, target {target:.1f}s)")
+
+    try:
+        deadline.check("model_load")
+    except DeadlineExceeded as e:
+        print(f"[deadline] {e}; skipping Chronos")
+        return empty, item_ids, None
+    if deadline.remaining() < STATISTICAL_FALLBACK_BELOW:
+        print(f"[deadline] {deadline.remaining():.1f}s left, not loading {chronos_model}")
+        return empty, item_ids, None
+    if deadline.remaining() < FAST_FALLBACK_BELOW and chronos_model != FAST_FALLBACK_MODEL:
+        print(f"[deadline] {deadline.remaining():.1f}s left, switching {chronos_model} -> {FAST_FALLBACK_MODEL}")
+        chronos_model = FAST_FALLBACK_MODEL
+
+    # weights come from the local registry only; a missing model is answered statistically
+    # (and reported), weights failing verification (IntegrityError) fail the request
+    try:
+        model_path = model_registry.resolve(chronos_model)
+    except model_registry.ModelNotAvailable as e:
+        print(f"[registry] {e}; skipping Chronos")
+        return empty, item_ids, f"{chronos_model}: {e}"
+
+    precision = chronos_pipeline.resolve_precision(chronos_model, precision)
+    # a pipeline already resident in this process (pre-fork pool) is used directly, T5 included
+    if ((bolt_fast_path and chronos_pipeline.is_bolt(chronos_model)) or precision != "fp32"
+            or chronos_pipeline.is_loaded(chronos_model, precision=precision)):
+        try:
+            pred, missing = chronos_pipeline.forecast_quantiles(
+                df, id_col, timestamp_col, 'target', prediction_length, chronos_model,
+                freq=freq, quantile_levels=levels, deadline=deadline, precision=precision,
+            )
+            return pred, missing, None
+        except ImportError as e:
+            print(f"[bolt] native quantile path unavailable ({e}); using AutoGluon")
+
+    # AutoGluon is imported on first use only (startup stays light; see app.warmup)
+    from autogluon.timeseries import TimeSeriesDataFrame
+    ts_df = TimeSeriesDataFrame.from_data_frame(df, id_column=id_col, timestamp_column=timestamp_col)
+    item_ids = list(ts_df.item_ids)
+
+    # one saved predictor per configuration, reused across requests (app.predictor_registry)
+    try:
+        predictor = predictor_registry.get_predictor(
+            model_path, prediction_length, levels, freq, time_limit=deadline.time_limit(DEFAULT_TIMEOUT),
+        )
+    except RuntimeError as e:
+        print(f"[predictors] {e}; skipping Chronos")
+        return empty, item_ids, f"{chronos_model}: {e}"
+
+    # predict per batch of series so a cancelled/expired request stops early
+    item_level = ts_df.index.get_level_values("item_id")
+    preds, done = [], 0
+    try:
+        for batch in _batches(item_ids, max(1, int(batch_size))):
+            deadline.check("predict", done, len(item_ids))
+            preds.append(predictor.predict(data=ts_df[item_level.isin(batch)]))
+            done += len(batch)
+    except DeadlineExceeded as e:
+        print(f"[deadline] {e}; Chronos finished {done}/{len(item_ids)} series")
+    if not preds:
+        return empty, item_ids, None
+
+    # AutoGluon names quantile columns '0.1' (str); map every level to pXX
+    df_pred = normalize_quantile_columns(pd.concat(preds), levels)
+    if 'mean' not in df_pred.columns:
+        df_pred['mean'] = df_pred['p50']
+    df_pred = df_pred.reset_index()
+    df_pred['engine'] = chronos_model
+    return df_pred[columns], item_ids[done:], None
+
 
+def predict(data_records,
+            id_col: str,
+            timestamp_col: str,
+            target_col: str,
+            prediction_length: int,
+            freq: str = "D",
+            chronos_model: str = 'amazon/chronos-t5-tiny',
+            deadline: Deadline = None,
+            **kwargs):
+    """Dispatcher-compatible predict(...): returns (DataFrame, log)."""
+    df = data_records.copy() if isinstance(data_records, pd.DataFrame) else pd.DataFrame(data_records)
+    return forecast_with_chronos(df, id_col=id_col, timestamp_col=timestamp_col, target_col=target_col,
+                                 freq=freq, prediction_length=prediction_length,
+                                 chronos_model=chronos_model, deadline=deadline, **kwargs)
@@ -0,0 +1,184 @@
+# app/chronos_pipeline.py
+"""
+Direct Chronos pipeline engine (bypasses AutoGluon fit/predict).
+
+Chronos-Bolt predicts quantiles natively: one forward pass per batch returns
+every requested quantile level, no sampling. This module loads the pipeline
+once per process (module-level cache, like the Lag-Llama predictor cache) and
+turns its (n_series, horizon, n_quantiles) output straight into the compact
+forecast layout: one row per (item_id, timestamp), a float32 column per
+quantile level (p05 ... p95) plus 'mean'.
+
+Precision is chosen per model when it enters the cache (CPU serving):
+  fp32 - weights as published
+  bf16 - weights/activations in bfloat16 (half the memory)
+  int8 - dynamic int8 quantization of every nn.Linear (weights int8,
+         activations quantized on the fly)
+Defaults come from CHRONOS_PRECISION (all models) and CHRONOS_PRECISION_MAP
+("model=precision,..."); pick them with `python -m benchmarks.precision_report`.
+
+A Bolt model exported with `python -m app.chronos_export` (TorchScript / ONNX)
+is used instead of the eager model for fp32 requests whose horizon the graph
+covers.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from app import chronos_export, model_registry
+from app.deadline import Deadline, DeadlineExceeded
+from app.quantiles import ensure_levels, quantile_columns
+from app.statistical_model import future_index
+
+# series per forward pass; the deadline is checked between batches
+BOLT_BATCH_SIZE = 256
+
+PRECISIONS = ("fp32", "bf16", "int8")
+DEFAULT_PRECISION = os.environ.get("CHRONOS_PRECISION", "fp32")
+# per-variant override, e.g. "amazon/chronos-bolt-base=int8,amazon/chronos-t5-base=bf16"
+PRECISION_MAP = dict(
+    item.split("=", 1) for item in os.environ.get("CHRONOS_PRECISION_MAP", "").split(",") if "=" in item
+)
+
+# module-level cache: (model_id, device, precision, exported) -> pipeline
+_pipeline_cache = {}
+
+
+def is_bolt(model_id: str) -> bool:
+    return "chronos-bolt" in str(model_id)
+
+
+def resolve_precision(model_id: str, precision: str = None) -> str:
+    precision = precision or PRECISION_MAP.get(model_id, DEFAULT_PRECISION)
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}, expected one of {PRECISIONS}")
+    return precision
+
+
+def _pipeline_class():
+    # prefer the standalone chronos-forecasting package, else the copy vendored in AutoGluon
+    try:
+        from chronos import BaseChronosPipeline
+    except ImportError:
+        from autogluon.timeseries.models.chronos.pipeline import BaseChronosPipeline
+    return BaseChronosPipeline
+
+
+def load_pipeline(model_id: str, device: str = "cpu", precision: str = None, use_exported: bool = None):
+    """
+    Load (or return the cached) Chronos pipeline for `model_id` at the given
+    precision. With `use_exported` (default CHRONOS_USE_EXPORTED) an fp32 Bolt
+    model that has an exported graph on disk is served from that graph.
+    """
+    precision = resolve_precision(model_id, precision)
+    if use_exported is None:
+        use_exported = chronos_export.USE_EXPORTED
+    sidecar = None
+    if use_exported and precision == "fp32" and device == "cpu" and is_bolt(model_id):
+        sidecar = chronos_export.find_export(model_id)
+    key = (model_id, device, precision, sidecar is not None)
+    pipeline = _pipeline_cache.get(key)
+    if pipeline is None and sidecar is not None:
+        pipeline = _pipeline_cache[key] = chronos_export.ExportedBoltPipeline(sidecar)
+    if pipeline is None:
+        import torch
+        dtype = torch.bfloat16 if precision == "bf16" else torch.float32
+        pipeline = _pipeline_class().from_pretrained(
+            model_registry.resolve(model_id), device_map=device, torch_dtype=dtype
+        )
+        if precision == "int8":
+            if device != "cpu":
+                raise ValueError("int8 dynamic quantization is CPU-only")
+            pipeline.model = torch.ao.quantization.quantize_dynamic(
+                pipeline.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        pipeline.model.eval()
+        _pipeline_cache[key] = pipeline
+    return pipeline
+
+
+def is_loaded(model_id: str, device: str = "cpu", precision: str = None) -> bool:
+    """True when `model_id` is already resident in this process (e.g. preloaded before a fork)."""
+    precision = resolve_precision(model_id, precision)
+    return any(k[:3] == (model_id, device, precision) for k in _pipeline_cache)
+
+
+def _contexts(df, id_col, timestamp_col, target_col):
+    """Per-series 1D float32 context arrays + last timestamps, in item order."""
+    df = df.sort_values([id_col, timestamp_col])
+    grouped = df.groupby(id_col, sort=True)
+    item_ids = list(grouped.groups.keys())
+    values = df[target_col].to_numpy(dtype=np.float32)
+    bounds = np.cumsum([0] + grouped.size().tolist())
+    contexts = [values[bounds[i]:bounds[i + 1]] for i in range(len(item_ids))]
+    last_ts = pd.to_datetime(grouped[timestamp_col].max()).to_numpy()
+    return item_ids, contexts, last_ts
+
+
+def forecast_quantiles(
+    df: pd.DataFrame,
+    id_col: str,
+    timestamp_col: str,
+    target_col: str,
+    prediction_length: int,
+    chronos_model: str,
+    freq: str = "D",
+    quantile_levels=None,
+    deadline: Deadline = None,
+    batch_size: int = BOLT_BATCH_SIZE,
+    device: str = "cpu",
+    precision: str = None,
+    use_exported: bool = None,
+):
+    """
+    Forecast all series with a single predict_quantiles() call per batch.
+    Bolt models emit the quantiles directly; T5 models (used here when a
+    reduced precision is requested) derive them from samples.
+
+    Returns (pred_df, ids_not_forecast_before_the_deadline) with the same
+    contract as the AutoGluon path in chronos_model.
+    """
+    import torch
+
+    deadline = deadline or Deadline(None)
+    levels = ensure_levels(quantile_levels)
+    item_ids, contexts, last_ts = _contexts(df, id_col, timestamp_col, target_col)
+
+    deadline.check("model_load")
+    precision = resolve_precision(chronos_model, precision)
+    pipeline = load_pipeline(chronos_model, device=device, precision=precision, use_exported=use_exported)
+    if hasattr(pipeline, "supports") and not pipeline.supports(prediction_length):
+        pipeline = load_pipeline(chronos_model, device=device, precision=precision, use_exported=False)
+
+    q_parts, mean_parts, done = [], [], 0
+    try:
+        for start in range(0, len(contexts), max(1, int(batch_size))):
+            deadline.check("predict", done, len(contexts))
+            batch = [torch.from_numpy(c) for c in contexts[start:start + batch_size]]
+            with torch.inference_mode():
+                q, mean = pipeline.predict_quantiles(
+                    batch, prediction_length=prediction_length, quantile_levels=list(levels)
+                )
+            q_parts.append(q.to(torch.float32).numpy())
+            mean_parts.append(mean.to(torch.float32).numpy())
+            done += len(batch)
+    except DeadlineExceeded as e:
+        print(f"[deadline] {e}; {chronos_model} finished {done}/{len(item_ids)} series")
+    if not q_parts:
+        return pd.DataFrame(columns=['item_id', 'timestamp', 'mean', *quantile_columns(levels), 'engine']), item_ids
+
+    q = np.sort(np.concatenate(q_parts), axis=-1)        # (n, H, Q), monotone in q
+    mean = np.concatenate(mean_parts)                    # (n, H)
+    H = int(prediction_length)
+    timestamps = future_index(last_ts[:done], H, freq)
+    out = {
+        "item_id": np.repeat(np.asarray(item_ids[:done], dtype=object), H),
+        "timestamp": np.concatenate([t.to_numpy() for t in timestamps]),
+        "mean": mean.reshape(-1),
+    }
+    flat = q.reshape(-1, len(levels))
+    for i, col in enumerate(quantile_columns(levels)):
+        out[col] = flat[:, i]
+    out["engine"] = chronos_model if precision == "fp32" else f"{chronos_model}@{precision}"
+    return pd.DataFrame(out), item_ids[done:]
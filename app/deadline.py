@@ -0,0 +1,330 @@
+# app/deadline.py
+"""
+Per-request deadline + cooperative cancellation for the forecast pipeline.
+
+A Deadline is created once per request (API call / Dash callback) and passed
+down through sanitize -> dataset build -> model load -> predict. Each stage
+calls `deadline.check(stage)` which raises DeadlineExceeded when the time
+budget is spent or when somebody called `cancel()` on it (e.g. the client
+went away). Long loops (predict batches) check between iterations, so the
+work stops at the next safe point instead of running to completion.
+
+Active deadlines are kept in a small registry so another request can cancel
+them by request_id or by owner (user id). configure(cache_dir) adds a shared
+diskcache store (<cache_dir>/deadlines) as the cross-process cancel signal:
+cancel() / cancel_owner() publish there and every Deadline polls it (at most
+every POLL_INTERVAL s) from its checkpoints, so a cancel also stops the copy
+of a request running in an inference pool worker (Deadline.to_remote /
+from_remote). Registered requests are also listed there (active:<id>), so
+cancel(request_id) works from any gunicorn worker, not only the one running
+the request. Without configure() cancels stay inside the process.
+
+An optional `on_stage(stage, done, total)` listener sees every checkpoint
+(the dashboard turns them into a progress bar); predict loops pass how many
+series are done out of how many.
+"""
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# default budget for one forecast request (was hard-coded as time_limit=60*3)
+DEFAULT_TIMEOUT = 60 * 3
+# how often a Deadline looks for cancels published by other processes
+POLL_INTERVAL = 0.5
+# cancel markers outlive any request that could still be looking for them
+SHARED_TTL = 60 * 60
+# drain(): time a request cancelled at shutdown gets to return its partial result
+DRAIN_GRACE = 10.0
+
+
+class DeadlineExceeded(Exception):
+    """Raised by Deadline.check() when the budget is spent or the request was cancelled."""
+
+    def __init__(self, stage: str, cancelled: bool = False):
+        self.stage = stage
+        self.cancelled = cancelled
+        reason = "cancelled" if cancelled else "deadline exceeded"
+        super().__init__(f"{reason} at stage '{stage}'")
+
+    def __reduce__(self):
+        # raised in pool workers / the inference service and re-raised by the caller
+        return DeadlineExceeded, (self.stage, self.cancelled)
+
+
+class Deadline:
+    def __init__(self, seconds: float | None = DEFAULT_TIMEOUT, request_id: str | None = None, owner=None,
+                 on_stage=None):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.owner = owner
+        self.on_stage = on_stage
+        self.started = time.monotonic()
+        self.started_wall = time.time()   # comparable across processes (owner cancels)
+        self.expires_at = None if seconds is None else self.started + float(seconds)
+        self.stages = []   # list of (stage, elapsed_seconds) for logging
+        self._cancelled = threading.Event()
+        self._polled = 0.0
+
+    # -- state -------------------------------------------------------------
+    @property
+    def cancelled(self) -> bool:
+        if not self._cancelled.is_set() and self._cancelled_elsewhere():
+            self._cancelled.set()
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        _publish(f"cancel:request:{self.request_id}", time.time())
+
+    def _cancelled_elsewhere(self) -> bool:
+        now = time.monotonic()
+        if now - self._polled < POLL_INTERVAL:
+            return False
+        self._polled = now
+        store = _shared()
+        if store is None:
+            return False
+        try:
+            # markers older than this request (a reused request_id, an earlier logout) do not apply
+            keys = [f"cancel:request:{self.request_id}"]
+            if self.owner is not None:
+                keys.append(f"cancel:owner:{self.owner}")
+            for key in keys:
+                cancelled_at = store.get(key)
+                if cancelled_at is not None and cancelled_at >= self.started_wall:
+                    return True
+        except Exception as e:
+            print(f"[deadline] shared store read failed: {e}")
+        return False
+
+    # -- crossing a process boundary ---------------------------------------
+    def to_remote(self) -> dict:
+        """Picklable state for the copy of this deadline that runs in another process."""
+        return {
+            "seconds": None if self.expires_at is None else self.remaining(),
+            "request_id": self.request_id,
+            "owner": self.owner,
+            "started_wall": self.started_wall,
+            "cancelled": self._cancelled.is_set(),
+            "progress": self.on_stage is not None,
+            "cache_dir": _cache_dir,
+        }
+
+    @classmethod
+    def from_remote(cls, state: dict, on_stage=None) -> "Deadline":
+        if state.get("cache_dir") and state["cache_dir"] != _cache_dir:
+            configure(state["cache_dir"])
+        if on_stage is None and state.get("progress"):
+            # the caller's listener is in another process: it polls read_progress()
+            key = f"progress:{state['request_id']}"
+
+            def on_stage(stage, done=None, total=None):
+                _publish(key, (stage, done, total))
+        deadline = cls(state["seconds"], request_id=state["request_id"], owner=state["owner"], on_stage=on_stage)
+        deadline.started_wall = state["started_wall"]
+        if state.get("cancelled"):
+            deadline._cancelled.set()
+        return deadline
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.cancelled or self.remaining() <= 0
+
+    # -- checkpoints -------------------------------------------------------
+    def check(self, stage: str, done: int = None, total: int = None) -> None:
+        """Record a stage boundary; raise DeadlineExceeded if we must stop here."""
+        self.stages.append((stage, round(self.elapsed(), 3)))
+        if self.on_stage is not None:
+            try:
+                self.on_stage(stage, done, total)
+            except Exception as e:   # progress reporting must never break the forecast
+                print(f"[deadline] stage listener failed: {e}")
+        if self.cancelled:
+            raise DeadlineExceeded(stage, cancelled=True)
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(stage)
+
+    def time_limit(self, default: float = DEFAULT_TIMEOUT, reserve: float = 0.0, minimum: float = 1.0) -> float:
+        """Budget to hand to a blocking call (e.g. AutoGluon fit time_limit)."""
+        budget = min(float(default), self.remaining() - reserve)
+        return max(minimum, budget)
+
+
+# ---------------------------------------------------------------------------
+# Shared cancel store (diskcache, one directory for every process of the app)
+# ---------------------------------------------------------------------------
+_cache_dir = None
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+
+def configure(cache_dir: str | None) -> None:
+    """Publish / poll cancels in <cache_dir>/deadlines (None = process-local only)."""
+    global _cache_dir, _store
+    with _store_lock:
+        _cache_dir, _store = cache_dir, None
+
+
+def _shared():
+    """The shared store of this process (reopened after fork), or None."""
+    global _store, _store_pid
+    if _cache_dir is None:
+        return None
+    with _store_lock:
+        if _store is None or _store_pid != os.getpid():
+            _store_pid = os.getpid()
+            try:
+                import diskcache
+                _store = diskcache.Cache(os.path.join(_cache_dir, "deadlines"))
+            except Exception as e:
+                print(f"[deadline] shared store unavailable, cancels stay in-process: {e}")
+                _store = False   # do not retry on every poll
+        return _store if _store is not False else None
+
+
+def _reset_store_after_fork():
+    global _store_lock
+    _store_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_store_after_fork)
+
+
+def _publish(key: str, value, expire: float = SHARED_TTL) -> None:
+    store = _shared()
+    if store is None:
+        return
+    try:
+        store.set(key, value, expire=expire)
+    except Exception as e:
+        print(f"[deadline] shared store write failed: {e}")
+
+
+def _discard(key: str) -> None:
+    store = _shared()
+    if store is None:
+        return
+    try:
+        store.delete(key)
+    except Exception as e:
+        print(f"[deadline] shared store write failed: {e}")
+
+
+def read_progress(request_id: str):
+    """Last (stage, done, total) published by the remote copy of a request, or None."""
+    store = _shared()
+    if store is None:
+        return None
+    try:
+        return store.get(f"progress:{request_id}")
+    except Exception as e:
+        print(f"[deadline] shared store read failed: {e}")
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Registry of in-flight deadlines (so they can be cancelled from elsewhere)
+# ---------------------------------------------------------------------------
+_active = {}
+_lock = threading.Lock()
+
+
+def register(deadline: Deadline) -> Deadline:
+    with _lock:
+        _active[deadline.request_id] = deadline
+    # visible to the other web workers / jobs, so a cancel can land in any of them
+    ttl = SHARED_TTL if deadline.expires_at is None else min(SHARED_TTL, deadline.remaining() + 60)
+    _publish(f"active:{deadline.request_id}", os.getpid(), expire=ttl)
+    return deadline
+
+
+def unregister(deadline: Deadline) -> None:
+    with _lock:
+        _active.pop(deadline.request_id, None)
+    _discard(f"active:{deadline.request_id}")
+
+
+def cancel(request_id: str) -> bool:
+    """
+    Cancel one in-flight request, in this process or any other one sharing the
+    store. Returns False if it is not (or no longer) running anywhere.
+    """
+    with _lock:
+        deadline = _active.get(request_id)
+    if deadline is not None:
+        deadline.cancel()
+        return True
+    store = _shared()
+    try:
+        running = store is not None and store.get(f"active:{request_id}") is not None
+    except Exception as e:
+        print(f"[deadline] shared store read failed: {e}")
+        running = False
+    if running:
+        # its Deadline picks this up at the next checkpoint poll
+        _publish(f"cancel:request:{request_id}", time.time())
+    return running
+
+
+def cancel_owner(owner) -> int:
+    """
+    Cancel every in-flight request started by `owner`; returns how many were
+    cancelled in this process (copies in other processes stop at their next poll).
+    """
+    if owner is None:
+        return 0
+    _publish(f"cancel:owner:{owner}", time.time())
+    with _lock:
+        targets = [d for d in _active.values() if d.owner == owner]
+    for d in targets:
+        d.cancel()
+    return len(targets)
+
+
+def active_requests() -> list:
+    with _lock:
+        return list(_active.values())
+
+
+def drain(timeout: float, cancel_after: float = None, grace: float = DRAIN_GRACE, poll: float = 0.2) -> int:
+    """
+    Wait (up to `timeout` s) for in-flight requests to finish, for graceful
+    shutdown. Requests still running after `cancel_after` s are cancelled so
+    they return their partial result instead of being killed; cancelling
+    happens by `timeout - grace` at the latest (also the default), so they
+    always get `grace` s for that. Returns the number of requests still
+    active at the end.
+    """
+    start = time.monotonic()
+    latest = max(0.0, timeout - grace)
+    cancel_after = latest if cancel_after is None else max(0.0, min(cancel_after, latest))
+    cancelled = False
+    while active_requests():
+        elapsed = time.monotonic() - start
+        if not cancelled and elapsed >= cancel_after:
+            for d in active_requests():
+                d.cancel()
+            cancelled = True
+        if elapsed >= timeout:
+            break
+        time.sleep(poll)
+    return len(active_requests())
+
+
+@contextmanager
+def track(deadline: Deadline):
+    """Register `deadline` for the duration of the block."""
+    register(deadline)
+    try:
+        yield deadline
+    finally:
+        unregister(deadline)
@@ -1,9 +1,28 @@
 # app/dispatcher.py (snippet)
-from . import lag_llama_model, chronos_model
+import importlib.util
+import os
+
+import pandas as pd
+
+from . import chronos_model, statistical_model
+
+
+def _load_lag_llama():
+    # the module file is named lag-llama_model.py (not importable by name);
+    # load it by path on first use so torch/gluonts are only imported when needed
+    path = os.path.join(os.path.dirname(__file__), "lag-llama_model.py")
+    spec = importlib.util.spec_from_file_location("app.lag_llama_model", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 
 MODEL_MAP = {
-    "lag-llama": lag_llama_model,
+    "lag-llama": _load_lag_llama,
+    "statistical": statistical_model,
+    "auto": chronos_model,
     "amazon/chronos-t5-tiny": chronos_model,
+    "amazon/chronos-t5-mini": chronos_model,
     "amazon/chronos-t5-small": chronos_model,
     "amazon/chronos-t5-base": chronos_model,
     "amazon/chronos-bolt-tiny": chronos_model,
@@ -14,10 +33,14 @@ MODEL_MAP = {
 
 
 def predict(model_key, data_records, id_col, timestamp_col, target_col, prediction_length, **kwargs):
-    
+
     handler = MODEL_MAP.get(model_key)
     if handler is None:
         raise ValueError("Unknown model: " + str(model_key))
+    if callable(handler):
+        handler = MODEL_MAP[model_key] = handler()
+    if handler is chronos_model:
+        kwargs.setdefault("chronos_model", model_key)
     # handlers expected to return (df, log) or df; adapt:
     result = handler.predict(data_records=data_records,
                              id_col=id_col,
@@ -29,4 +52,6 @@ def predict(model_key, data_records, id_col, timestamp_col, target_col, predicti
         df, log = result
     else:
         df, log = result, ""
+    if isinstance(df, pd.DataFrame) and not df.empty and "engine" not in df.columns:
+        df = df.assign(engine=model_key)
     return df, log
@@ -0,0 +1,200 @@
+# app/inference_service.py
+"""
+Dedicated inference parent process.
+
+worker_pool.start_service() (app factory: the gunicorn master under
+preload_app, or the dev server) runs `python -m app.inference_service` once
+when INFERENCE_WORKERS > 0. The service builds the InferencePool in its main
+thread before any other thread exists (preload, gc.freeze, fork), then serves
+it over a unix socket (multiprocessing.managers) to every web worker and
+dashboard job:
+
+  INFERENCE_ADDRESS          socket path (set by start_service; set it yourself
+                             to point the app at a service run separately)
+  INFERENCE_AUTHKEY          hex authkey shared with the clients
+  INFERENCE_CONNECT_TIMEOUT  seconds a client waits for the service to come up,
+                             e.g. while it preloads models (default 300)
+
+A request is submit() + wait() polls, so the client keeps relaying stage
+events to its Deadline.on_stage and stops waiting like InferencePool.forecast
+does. The service exits with its parent and on SIGTERM (its pool with it).
+"""
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from multiprocessing.managers import BaseManager
+
+from app import deadline as deadlines
+from app.deadline import Deadline, DEFAULT_TIMEOUT
+from app.worker_pool import RESULT_POLL, InferencePool, Topology, _abandon, _grace
+
+CONNECT_TIMEOUT = float(os.environ.get("INFERENCE_CONNECT_TIMEOUT", 300))
+
+
+class _ServerManager(BaseManager):
+    pass
+
+
+class _ClientManager(BaseManager):
+    pass
+
+
+_ClientManager.register("service")
+
+
+class PoolService:
+    """The object the service exposes; every public method is callable from clients."""
+
+    def __init__(self, pool: InferencePool):
+        self.pool = pool
+        self._jobs = {}
+        self._lock = threading.Lock()
+        # one thread per request waiting on the pool (requests beyond that queue here)
+        self._threads = ThreadPoolExecutor(max_workers=max(4, 4 * pool.topology.workers),
+                                           thread_name_prefix="inference")
+
+    def submit(self, df, deadline_state: dict, kwargs: dict) -> str:
+        ticket = uuid.uuid4().hex
+        deadline = Deadline.from_remote(deadline_state)
+        future = self._threads.submit(self.pool.forecast, df, deadline=deadline, **kwargs)
+        with self._lock:
+            self._jobs[ticket] = future
+        return ticket
+
+    def wait(self, ticket: str, timeout: float):
+        """(True, result) when the forecast is done, (False, None) after `timeout` s; re-raises its error."""
+        with self._lock:
+            future = self._jobs[ticket]
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeout:
+            return False, None
+        finally:
+            if future.done():
+                self.discard(ticket)
+        return True, result
+
+    def discard(self, ticket: str) -> None:
+        with self._lock:
+            self._jobs.pop(ticket, None)
+
+    def mode(self) -> str:
+        return "prefork" if self.pool.prefork else "spawn"
+
+    def memory_report(self) -> list:
+        return self.pool.memory_report()
+
+
+class PoolClient:
+    """What worker_pool.get_pool() returns in web workers and jobs: forecasts run in the service."""
+
+    def __init__(self, address: str, authkey: bytes, connect_timeout: float = CONNECT_TIMEOUT):
+        self.address = address
+        self.authkey = authkey
+        self.connect_timeout = connect_timeout
+        self._service = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Proxy of the service, connecting (and waiting for it to come up) on first use."""
+        with self._lock:
+            if self._service is None:
+                stop_at = time.monotonic() + self.connect_timeout
+                while True:
+                    manager = _ClientManager(address=self.address, authkey=self.authkey)
+                    try:
+                        manager.connect()
+                        break
+                    except (FileNotFoundError, ConnectionRefusedError) as e:
+                        if time.monotonic() >= stop_at:
+                            raise RuntimeError(f"inference service at {self.address} not reachable: {e}")
+                        time.sleep(0.5)
+                self._service = manager.service()
+            return self._service
+
+    @property
+    def prefork(self) -> bool:
+        return self.connect().mode() == "prefork"
+
+    def memory_report(self) -> list:
+        return self.connect().memory_report()
+
+    def forecast(self, df, deadline: Deadline = None, **kwargs):
+        deadline = deadline or Deadline(DEFAULT_TIMEOUT)
+        try:
+            service = self.connect()
+            ticket = service.submit(df, deadline.to_remote(), kwargs)
+            give_up_at, last = None, None
+            while True:
+                done, result = service.wait(ticket, RESULT_POLL)
+                if done:
+                    return result
+                last = self._relay_progress(deadline, last)
+                give_up_at = _grace(deadline, give_up_at)
+                if deadline.elapsed() >= give_up_at:
+                    service.discard(ticket)
+                    _abandon(deadline)
+        except (EOFError, ConnectionError) as e:
+            with self._lock:
+                self._service = None   # reconnect on the next request (service restarted?)
+            raise RuntimeError(f"lost the connection to the inference service: {e}")
+
+    @staticmethod
+    def _relay_progress(deadline: Deadline, last):
+        if deadline.on_stage is None:
+            return last
+        progress = deadlines.read_progress(deadline.request_id)
+        if progress is not None and progress != last:
+            try:
+                deadline.on_stage(*progress)
+            except Exception as e:   # progress reporting must never break the forecast
+                print(f"[deadline] stage listener failed: {e}")
+        return progress if progress is not None else last
+
+
+def _exit_with_parent(server, parent_pid: int) -> None:
+    while os.getppid() == parent_pid:
+        time.sleep(1.0)
+    print("[inference] parent exited, stopping")
+    while not hasattr(server, "stop_event"):   # created by serve_forever()
+        time.sleep(0.1)
+    server.stop_event.set()
+
+
+def serve() -> None:
+    address = os.environ["INFERENCE_ADDRESS"]
+    authkey = bytes.fromhex(os.environ["INFERENCE_AUTHKEY"])
+    parent_pid = os.getppid()
+
+    # same resources as the app (model registry, predictor dir, cache dir), without a second service
+    from app_factory import configure_resources
+    from config import get_config
+    configure_resources(get_config())
+    topology_json = os.environ.get("INFERENCE_TOPOLOGY_JSON")
+    topology = Topology(**json.loads(topology_json)) if topology_json else Topology.from_env()
+
+    # still single-threaded here: preload + gc.freeze + fork every worker
+    pool = InferencePool(topology)
+    service = PoolService(pool)
+    _ServerManager.register("service", callable=lambda: service)
+    if os.path.exists(address):
+        os.unlink(address)
+    server = _ServerManager(address=address, authkey=authkey).get_server()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    threading.Thread(target=_exit_with_parent, args=(server, parent_pid), daemon=True).start()
+    print(f"[inference] serving {topology.workers} workers ({service.mode()}) at {address}")
+    try:
+        server.serve_forever()
+    finally:
+        pool.shutdown(wait=False)
+        if os.path.exists(address):
+            os.unlink(address)
+
+
+if __name__ == "__main__":
+    serve()
@@ -9,6 +9,7 @@ import os
 
 # LagLlama estimator class (from your installed package)
 from lag_llama_package.lag_llama.gluon.estimator import LagLlamaEstimator
+from app import lag_llama_weights
 
 # module-level cache
 _predictor_cache = {
@@ -34,9 +35,10 @@ def _ensure_predictor(ckpt_path: str, context_length: int, use_rope_scaling: boo
     if device is None:
         device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    # load checkpoint
-    ckpt = torch.load(ckpt_path, map_location=device)
-    estimator_args = ckpt["hyper_parameters"]["model_kwargs"]
+    # weights-only safetensors + hparams sidecar (python -m app.lag_llama_weights) when converted,
+    # so only the hyperparameters are read up front and the weights come in via mmap
+    converted = lag_llama_weights.is_converted(ckpt_path)
+    estimator_args = lag_llama_weights.load_hparams(ckpt_path)
 
     # compute rope scaling if requested
     rope_scaling_arguments = None
@@ -47,7 +49,7 @@ def _ensure_predictor(ckpt_path: str, context_length: int, use_rope_scaling: boo
         }
 
     estimator = LagLlamaEstimator(
-        ckpt_path=ckpt_path,
+        ckpt_path=None if converted else ckpt_path,
         prediction_length=estimator_args.get("prediction_length", 32),
         context_length=context_length,
         input_size=estimator_args.get("input_size", 1),
@@ -62,6 +64,11 @@ def _ensure_predictor(ckpt_path: str, context_length: int, use_rope_scaling: boo
     )
 
     lightning_module = estimator.create_lightning_module()
+    if converted:
+        # assign=True: the parameters become the loaded tensors (the mmap'd storage on cpu)
+        # instead of copies into freshly allocated ones; on cuda the weights are copied anyway
+        lightning_module.load_state_dict(lag_llama_weights.load_state_dict(ckpt_path, device=device), assign=True)
+        lightning_module.eval()
     transformation = estimator.create_transformation()
     predictor = estimator.create_predictor(transformation, lightning_module, device=device)
 
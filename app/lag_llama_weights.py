@@ -0,0 +1,112 @@
+# app/lag_llama_weights.py
+"""
+Weights-only, memory-mappable Lag-Llama checkpoint.
+
+The Lightning .ckpt holds optimizer state, callbacks and loops next to the
+weights, and torch.load() reads all of it into RAM just to get at
+hyper_parameters. Convert it once:
+
+    python -m app.lag_llama_weights app/lag_llama_package/lag-llama.ckpt
+
+which writes, next to the checkpoint:
+  lag-llama.safetensors   - the LightningModule state_dict (weights only)
+  lag-llama.hparams.json  - hyper_parameters["model_kwargs"] (JSON values only;
+                            objects such as distr_output are not stored)
+
+The engine then reads the hyperparameters from the sidecar and the weights
+through safetensors' mmap: cold start skips the optimizer state, and
+processes on the same host share the file's page cache instead of each
+holding a private copy.
+"""
+import argparse
+import json
+import os
+
+WEIGHTS_SUFFIX = ".safetensors"
+HPARAMS_SUFFIX = ".hparams.json"
+# model_kwargs holding objects the engine rebuilds itself (LagLlamaEstimator defaults); not stored
+SKIPPED_HPARAMS = ("distr_output",)
+
+
+def converted_paths(ckpt_path: str):
+    """(weights_path, hparams_path) derived from the checkpoint path."""
+    base = os.path.splitext(ckpt_path)[0]
+    return base + WEIGHTS_SUFFIX, base + HPARAMS_SUFFIX
+
+
+def is_converted(ckpt_path: str) -> bool:
+    return all(os.path.isfile(p) for p in converted_paths(ckpt_path))
+
+
+def _plain(key: str, value):
+    """JSON-native copy of one hyperparameter; TypeError for anything else."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_plain(key, v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _plain(key, v) for k, v in value.items()}
+    raise TypeError(f"hyperparameter {key!r} is a {type(value).__name__}, which has no JSON form")
+
+
+def serialize_hparams(model_kwargs: dict) -> dict:
+    """model_kwargs -> JSON-native dict (SKIPPED_HPARAMS dropped); rejects other objects."""
+    return {k: _plain(k, v) for k, v in model_kwargs.items() if k not in SKIPPED_HPARAMS}
+
+
+def convert_checkpoint(ckpt_path: str) -> tuple:
+    """One-time conversion of a Lightning checkpoint; returns (weights_path, hparams_path)."""
+    import torch
+    from safetensors.torch import save_file
+
+    ckpt = torch.load(ckpt_path, map_location="cpu", weights_only=False)
+    model_kwargs = serialize_hparams(ckpt["hyper_parameters"]["model_kwargs"])
+    # safetensors refuses shared/non-contiguous storages; store independent copies
+    state_dict = {k: v.detach().contiguous().clone() for k, v in ckpt["state_dict"].items()}
+
+    weights_path, hparams_path = converted_paths(ckpt_path)
+    save_file(state_dict, weights_path, metadata={"source": os.path.basename(ckpt_path)})
+    with open(hparams_path, "w", encoding="utf-8") as f:
+        json.dump(model_kwargs, f, indent=2)
+    return weights_path, hparams_path
+
+
+def load_hparams(ckpt_path: str) -> dict:
+    """model_kwargs from the sidecar; falls back to a (mmap'd) read of the .ckpt."""
+    _, hparams_path = converted_paths(ckpt_path)
+    if os.path.isfile(hparams_path):
+        with open(hparams_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    import torch
+    ckpt = torch.load(ckpt_path, map_location="cpu", mmap=True, weights_only=False)
+    return ckpt["hyper_parameters"]["model_kwargs"]
+
+
+def load_state_dict(ckpt_path: str, device: str = "cpu") -> dict:
+    """
+    Weights of a converted checkpoint: memory-mapped on "cpu"; any other device
+    (e.g. "cuda") gets a copy in device memory, so nothing is mmap'd there.
+    """
+    from safetensors.torch import load_file
+
+    weights_path, _ = converted_paths(ckpt_path)
+    return load_file(weights_path, device=device)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("ckpt_path")
+    parser.add_argument("--force", action="store_true", help="convert again even if the outputs exist")
+    args = parser.parse_args(argv)
+
+    if is_converted(args.ckpt_path) and not args.force:
+        print(f"[lag-llama] already converted: {converted_paths(args.ckpt_path)[0]}")
+        return
+    weights_path, hparams_path = convert_checkpoint(args.ckpt_path)
+    size_in = os.path.getsize(args.ckpt_path) / 2**20
+    size_out = os.path.getsize(weights_path) / 2**20
+    print(f"[lag-llama] {args.ckpt_path} ({size_in:.1f} MB) -> {weights_path} ({size_out:.1f} MB), {hparams_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# app/model_registry.py
+"""
+Local model registry: Chronos weights pre-fetched to disk, resolved offline.
+
+    python -m app.model_registry fetch                        # every variant in REGISTRY_MODELS
+    python -m app.model_registry fetch amazon/chronos-bolt-small --revision main
+    python -m app.model_registry verify
+    python -m app.model_registry list
+
+Layout under MODEL_REGISTRY_DIR (default models/registry):
+
+    amazon__chronos-t5-tiny/
+        CURRENT                     <- name of the active version
+        <commit sha>/
+            config.json, model.safetensors, ...
+            manifest.json           <- model_id, revision, sha256 + size per file
+
+resolve(model_id) maps a hub id to the active local directory and checks it
+against its manifest the first time it is used in a process. A model missing
+from the registry raises ModelNotAvailable (run the fetch command above)
+instead of being downloaded mid-request; HF_HUB_OFFLINE / TRANSFORMERS_OFFLINE
+are set by configure(). Downloading from the hub at request time is an
+explicit opt-in: MODEL_REGISTRY_ALLOW_HUB=1 (development only).
+
+MODEL_REGISTRY_VERIFY is the check done by resolve(): size (default; the
+sha256 of every file is computed by fetch and re-checked by `verify`, run it
+at deploy), sha256 (full check of multi-GB weights on first use in every
+process) or off. It runs under a per-model lock, so a slow check only holds
+up requests for that model.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+REGISTRY_DIR = os.environ.get(
+    "MODEL_REGISTRY_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "registry"),
+)
+ALLOW_HUB = os.environ.get("MODEL_REGISTRY_ALLOW_HUB", "0") in ("1", "true", "True")
+# check done by resolve(): size (file sizes only), sha256 (full check) or off
+VERIFY = os.environ.get("MODEL_REGISTRY_VERIFY", "size")
+REGISTRY_MODELS = [
+    m.strip() for m in os.environ.get(
+        "MODEL_REGISTRY_MODELS",
+        "amazon/chronos-t5-tiny,amazon/chronos-t5-mini,amazon/chronos-t5-small,amazon/chronos-t5-base,"
+        "amazon/chronos-bolt-tiny,amazon/chronos-bolt-mini,amazon/chronos-bolt-small,amazon/chronos-bolt-base",
+    ).split(",") if m.strip()
+]
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+
+
+def _set_offline_env():
+    # not at import: `python -m app.model_registry fetch` must still reach the hub
+    if not ALLOW_HUB:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+
+# model_id -> verified local path (verification runs once per process)
+_resolved = {}
+_lock = threading.Lock()          # guards _resolved / _model_locks only
+_model_locks = {}
+
+
+class ModelNotAvailable(LookupError):
+    pass
+
+
+class IntegrityError(RuntimeError):
+    pass
+
+
+def configure(registry_dir: str = None, allow_hub: bool = None) -> None:
+    """Override the env settings (app factory); clears the resolved-path cache."""
+    global REGISTRY_DIR, ALLOW_HUB
+    with _lock:
+        if registry_dir is not None:
+            REGISTRY_DIR = registry_dir
+        if allow_hub is not None:
+            ALLOW_HUB = bool(allow_hub)
+        _resolved.clear()
+    _set_offline_env()
+
+
+def model_dir(model_id: str) -> str:
+    return os.path.join(REGISTRY_DIR, model_id.replace("/", "__"))
+
+
+def current_path(model_id: str):
+    """Directory of the active version of `model_id`, or None."""
+    pointer = os.path.join(model_dir(model_id), CURRENT)
+    if not os.path.isfile(pointer):
+        return None
+    with open(pointer, "r", encoding="utf-8") as f:
+        path = os.path.join(model_dir(model_id), f.read().strip())
+    return path if os.path.isfile(os.path.join(path, MANIFEST)) else None
+
+
+def _sha256(path: str, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _files(root: str):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d != "exported"]
+        for name in filenames:
+            if name == MANIFEST or name.startswith("."):
+                continue
+            full = os.path.join(dirpath, name)
+            yield os.path.relpath(full, root).replace(os.sep, "/"), full
+
+
+def verify(path: str, mode: str = None) -> dict:
+    """Check a version directory against its manifest; raises IntegrityError."""
+    mode = mode or VERIFY
+    with open(os.path.join(path, MANIFEST), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if mode == "off":
+        return manifest
+    for rel, expected in manifest["files"].items():
+        full = os.path.join(path, rel)
+        if not os.path.isfile(full):
+            raise IntegrityError(f"{manifest['model_id']}: missing {rel}")
+        if os.path.getsize(full) != expected["size"]:
+            raise IntegrityError(f"{manifest['model_id']}: size mismatch for {rel}")
+        if mode == "sha256" and _sha256(full) != expected["sha256"]:
+            raise IntegrityError(f"{manifest['model_id']}: checksum mismatch for {rel}")
+    return manifest
+
+
+def _model_lock(model_id: str) -> threading.Lock:
+    with _lock:
+        return _model_locks.setdefault(model_id, threading.Lock())
+
+
+def resolve(model_id: str) -> str:
+    """
+    Local, verified directory for `model_id`. Local paths pass through.
+    Models not in the registry raise ModelNotAvailable (hub id with ALLOW_HUB).
+    """
+    if os.path.isdir(model_id):
+        return model_id
+    with _lock:
+        if model_id in _resolved:
+            return _resolved[model_id]
+    with _model_lock(model_id):
+        with _lock:
+            if model_id in _resolved:
+                return _resolved[model_id]
+        path = current_path(model_id)
+        if path is None:
+            if ALLOW_HUB:
+                print(f"[registry] {model_id} not in {REGISTRY_DIR}; loading from the hub (MODEL_REGISTRY_ALLOW_HUB)")
+                return model_id
+            raise ModelNotAvailable(
+                f"{model_id} is not in the model registry ({REGISTRY_DIR}); "
+                f"run `python -m app.model_registry fetch {model_id}` on this host "
+                f"(or set MODEL_REGISTRY_ALLOW_HUB=1 to download it at request time)"
+            )
+        verify(path)
+        with _lock:
+            _resolved[model_id] = path
+        print(f"[registry] {model_id} -> {path}")
+        return path
+
+
+def materialize(model_id: str, revision: str = None) -> str:
+    """Download `model_id` into a new version directory, write its manifest, make it CURRENT."""
+    from huggingface_hub import HfApi, snapshot_download
+
+    sha = HfApi().model_info(model_id, revision=revision).sha
+    target = os.path.join(model_dir(model_id), sha)
+    if not os.path.isfile(os.path.join(target, MANIFEST)):
+        staging = target + ".partial"
+        shutil.rmtree(staging, ignore_errors=True)
+        snapshot_download(model_id, revision=sha, local_dir=staging)
+        shutil.rmtree(os.path.join(staging, ".cache"), ignore_errors=True)
+        files = {rel: {"sha256": _sha256(full), "size": os.path.getsize(full)} for rel, full in _files(staging)}
+        manifest = {
+            "model_id": model_id,
+            "revision": sha,
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "files": files,
+        }
+        with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(staging, target)
+    pointer = os.path.join(model_dir(model_id), CURRENT)
+    with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+        f.write(sha)
+    os.replace(pointer + ".tmp", pointer)
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    fetch = sub.add_parser("fetch", help="download models into the registry")
+    fetch.add_argument("models", nargs="*")
+    fetch.add_argument("--revision", default=None)
+    check = sub.add_parser("verify", help="check every registered model against its manifest")
+    check.add_argument("models", nargs="*")
+    sub.add_parser("list")
+    args = parser.parse_args(argv)
+
+    if args.command == "fetch":
+        for model_id in args.models or REGISTRY_MODELS:
+            print(f"[registry] {model_id} -> {materialize(model_id, args.revision)}")
+    elif args.command == "verify":
+        failed = 0
+        for model_id in args.models or REGISTRY_MODELS:
+            path = current_path(model_id)
+            try:
+                if path is None:
+                    raise ModelNotAvailable("not in registry")
+                verify(path, "sha256")
+                print(f"[registry] OK      {model_id} ({os.path.basename(path)})")
+            except (ModelNotAvailable, IntegrityError) as e:
+                failed += 1
+                print(f"[registry] FAILED  {model_id}: {e}")
+        raise SystemExit(1 if failed else 0)
+    else:
+        for model_id in REGISTRY_MODELS:
+            path = current_path(model_id)
+            print(f"{model_id:32s} {os.path.basename(path) if path else '-'}")
+
+
+if __name__ == "__main__":
+    main()
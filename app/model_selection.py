@@ -0,0 +1,119 @@
+# app/model_selection.py
+"""
+Latency-aware automatic choice of the Chronos variant ("auto" in the UI).
+
+A stored profile (built by `python -m benchmarks.model_profile`) holds, per
+variant, a fitted latency model and its accuracy (WQL, lower is better) on
+local data:
+
+    latency ~= load_s + n_series * (per_series_s + per_context_s * history + per_step_s * horizon)
+
+select_model() picks the most accurate variant whose predicted latency fits
+the target. Without a profile on disk a built-in rough profile is used.
+"""
+import datetime
+import json
+import os
+
+AUTO_MODEL = "auto"
+# explicit location; by default the profile is runtime state under CACHE_DIR (see profile_path())
+PROFILE_PATH = os.environ.get("CHRONOS_PROFILE_PATH") or None
+PROFILE_NAME = "chronos_profile.json"
+# default per-request latency target (seconds) when the caller gives none
+DEFAULT_TARGET_LATENCY = float(os.environ.get("CHRONOS_TARGET_LATENCY", 20))
+# profiles older than this are reported stale (refresh with --if-stale from cron)
+PROFILE_MAX_AGE_DAYS = float(os.environ.get("CHRONOS_PROFILE_MAX_AGE_DAYS", 7))
+
+# rough CPU numbers, only used until a local profile has been built
+DEFAULT_PROFILE = {
+    "created_at": None,
+    "variants": {
+        "amazon/chronos-t5-tiny":   {"load_s": 2.0, "per_series_s": 0.15, "per_context_s": 0.0004, "per_step_s": 0.020, "wql": 0.110},
+        "amazon/chronos-t5-mini":   {"load_s": 2.5, "per_series_s": 0.25, "per_context_s": 0.0008, "per_step_s": 0.035, "wql": 0.105},
+        "amazon/chronos-t5-small":  {"load_s": 3.5, "per_series_s": 0.50, "per_context_s": 0.0015, "per_step_s": 0.070, "wql": 0.100},
+        "amazon/chronos-t5-base":   {"load_s": 6.0, "per_series_s": 1.40, "per_context_s": 0.0040, "per_step_s": 0.200, "wql": 0.096},
+        "amazon/chronos-bolt-tiny": {"load_s": 1.5, "per_series_s": 0.01, "per_context_s": 0.00002, "per_step_s": 0.0002, "wql": 0.102},
+        "amazon/chronos-bolt-mini": {"load_s": 1.8, "per_series_s": 0.02, "per_context_s": 0.00004, "per_step_s": 0.0004, "wql": 0.099},
+        "amazon/chronos-bolt-small": {"load_s": 2.5, "per_series_s": 0.04, "per_context_s": 0.00008, "per_step_s": 0.0008, "wql": 0.095},
+        "amazon/chronos-bolt-base": {"load_s": 4.0, "per_series_s": 0.10, "per_context_s": 0.0002, "per_step_s": 0.0020, "wql": 0.092},
+    },
+}
+
+_profile_cache = {"mtime": None, "profile": None}
+_cache_dir = None
+
+
+def configure(cache_dir: str) -> None:
+    """Keep the profile under `cache_dir` (app factory: CACHE_DIR)."""
+    global _cache_dir
+    _cache_dir = cache_dir
+
+
+def profile_path() -> str:
+    """CHRONOS_PROFILE_PATH, else <CACHE_DIR>/chronos_profile.json (never inside the source tree)."""
+    if PROFILE_PATH:
+        return PROFILE_PATH
+    base = _cache_dir or os.environ.get("CACHE_DIR") or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+    return os.path.join(base, PROFILE_NAME)
+
+
+def load_profile(path: str = None) -> dict:
+    """Read the stored profile (cached until the file changes); built-in default if missing."""
+    path = path or profile_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return DEFAULT_PROFILE
+    if _profile_cache["mtime"] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            _profile_cache.update({"mtime": mtime, "profile": json.load(f)})
+    return _profile_cache["profile"]
+
+
+def save_profile(profile: dict, path: str = None) -> str:
+    path = path or profile_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def is_stale(profile: dict = None, max_age_days: float = PROFILE_MAX_AGE_DAYS) -> bool:
+    profile = profile or load_profile()
+    created = profile.get("created_at")
+    if not created:
+        return True
+    created = datetime.datetime.fromisoformat(created)
+    if created.tzinfo is None:   # profiles written before timestamps carried an offset are UTC
+        created = created.replace(tzinfo=datetime.timezone.utc)
+    age = datetime.datetime.now(datetime.timezone.utc) - created
+    return age > datetime.timedelta(days=max_age_days)
+
+
+def predict_latency(entry: dict, n_series: int, history_length: int, horizon: int) -> float:
+    per_series = (entry.get("per_series_s", 0.0)
+                  + entry.get("per_context_s", 0.0) * history_length
+                  + entry.get("per_step_s", 0.0) * horizon)
+    return entry.get("load_s", 0.0) + n_series * max(0.0, per_series)
+
+
+def select_model(n_series: int, history_length: int, horizon: int,
+                 target_latency: float = DEFAULT_TARGET_LATENCY, profile: dict = None):
+    """
+    Return (model_id, predicted_latency_s) for the most accurate variant that
+    fits `target_latency`; the fastest variant if none does.
+    """
+    variants = (profile or load_profile())["variants"]
+    estimates = {
+        name: predict_latency(entry, n_series, history_length, horizon)
+        for name, entry in variants.items()
+    }
+    fitting = [name for name, t in estimates.items() if t <= target_latency]
+    if fitting:
+        best = min(fitting, key=lambda name: variants[name].get("wql", float("inf")))
+    else:
+        best = min(estimates, key=estimates.get)
+    return best, estimates[best]
@@ -0,0 +1,257 @@
+# app/predictor_registry.py
+"""
+One saved AutoGluon predictor per model configuration, reused across requests
+and restarts, instead of a new AutogluonModels/ag-<timestamp>/ per forecast.
+
+A Chronos zero-shot "fit" learns nothing from the training data, so the
+predictor for (model, horizon, quantile levels, freq) is fitted once into
+AutogluonModels/chronos-<config hash>/ and loaded from there afterwards
+(TimeSeriesPredictor.load). The entry is shared by every user, so it is
+fitted on a synthetic placeholder series, never on a request's data, and the
+training data AutoGluon keeps under utils/data is removed before it is
+published. Prediction caching is disabled, so serving writes no
+cached_predictions.pkl. The marker is only written once the Chronos model
+is in predictor.model_names() (a fit cut short by time_limit is discarded).
+
+Retention (PREDICTOR_RETENTION_DAYS, PREDICTOR_MAX_ENTRIES) is applied by
+
+    python -m app.predictor_registry cleanup [--dry-run]
+    python -m app.predictor_registry list
+
+which removes entries unused for too long, the least recently used ones above
+the limit, half-written entries and legacy ag-* directories.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+PREDICTOR_DIR = os.environ.get(
+    "PREDICTOR_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AutogluonModels"),
+)
+RETENTION_DAYS = float(os.environ.get("PREDICTOR_RETENTION_DAYS", 30))
+MAX_ENTRIES = int(os.environ.get("PREDICTOR_MAX_ENTRIES", 50))
+PREFIX = "chronos-"
+# written after a successful fit; its mtime is the entry's last use
+MARKER = "registry.json"
+# a process serving an entry from memory refreshes the marker at most this often (s)
+TOUCH_INTERVAL = 3600
+
+# in-process cache: config key -> loaded TimeSeriesPredictor
+_predictors = {}
+_lock = threading.Lock()          # guards _predictors / _key_locks only
+_key_locks = {}
+_touched = {}                     # key -> time.monotonic() of the last marker refresh
+
+
+def configure(root: str = None) -> None:
+    """Override PREDICTOR_DIR (app factory)."""
+    global PREDICTOR_DIR
+    with _lock:
+        if root is not None and root != PREDICTOR_DIR:
+            PREDICTOR_DIR = root
+            _predictors.clear()
+
+
+def config_key(model_path: str, prediction_length: int, quantile_levels, freq: str) -> tuple:
+    import autogluon.timeseries
+    config = {
+        "model_path": str(model_path),
+        "prediction_length": int(prediction_length),
+        "quantile_levels": [round(float(q), 4) for q in quantile_levels],
+        "freq": str(freq),
+        "autogluon": autogluon.timeseries.__version__,
+    }
+    digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+    return PREFIX + digest, config
+
+
+def _touch(path: str) -> None:
+    try:
+        os.utime(os.path.join(path, MARKER))
+    except OSError:
+        pass
+    with _lock:
+        _touched[os.path.basename(path)] = time.monotonic()
+
+
+def _touch_if_due(key: str) -> None:
+    """Keep an entry served from memory recent for cleanup(), without a utime per request."""
+    with _lock:
+        due = time.monotonic() - _touched.get(key, float("-inf")) >= TOUCH_INTERVAL
+    if due:
+        _touch(os.path.join(PREDICTOR_DIR, key))
+
+
+def _key_lock(key: str) -> threading.Lock:
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _placeholder_data(prediction_length: int, freq: str):
+    """One synthetic series long enough for AutoGluon's validation window."""
+    import numpy as np
+    import pandas as pd
+    from autogluon.timeseries import TimeSeriesDataFrame
+
+    n = 2 * int(prediction_length) + 20
+    df = pd.DataFrame({
+        "item_id": "placeholder",
+        "timestamp": pd.date_range("2000-01-01", periods=n, freq=freq),
+        "target": np.sin(np.arange(n) / 3.0) + 10.0,
+    })
+    return TimeSeriesDataFrame.from_data_frame(df, id_column="item_id", timestamp_column="timestamp")
+
+
+def _strip_train_data(path: str) -> None:
+    # AutoGluon keeps the fit's train / val data here (for refit_full, unused in serving)
+    data_dir = os.path.join(path, "utils", "data")
+    if os.path.isdir(data_dir):
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def _fit(path: str, model_path: str, prediction_length: int, quantile_levels, freq: str, config: dict,
+         time_limit=None) -> None:
+    """Fit into a staging directory and publish it at `path` (marker last)."""
+    from autogluon.timeseries import TimeSeriesPredictor
+
+    staging = f"{path}.partial-{os.getpid()}-{threading.get_ident()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    predictor = TimeSeriesPredictor(
+        prediction_length=prediction_length,
+        quantile_levels=list(quantile_levels),
+        freq=freq,
+        path=staging,
+        cache_predictions=False,
+        verbosity=1,
+    ).fit(
+        train_data=_placeholder_data(prediction_length, freq),
+        hyperparameters={"Chronos": [{"model_path": model_path, "ag_args": {"name_suffix": "-ZeroShot"}}]},
+        time_limit=time_limit,
+        enable_ensemble=False,
+    )
+    if not any(name.startswith("Chronos") for name in predictor.model_names()):
+        shutil.rmtree(staging, ignore_errors=True)
+        raise RuntimeError(f"Chronos fit for {model_path} did not complete (time_limit={time_limit})")
+    _strip_train_data(staging)
+    with open(os.path.join(staging, MARKER), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    shutil.rmtree(path, ignore_errors=True)   # leftover without marker
+    try:
+        os.replace(staging, path)
+    except OSError:
+        # another process published the same configuration first
+        shutil.rmtree(staging, ignore_errors=True)
+    print(f"[predictors] saved {model_path} as {os.path.basename(path)}")
+
+
+def get_predictor(model_path: str, prediction_length: int, quantile_levels, freq: str, time_limit=None):
+    """
+    Saved Chronos zero-shot predictor for this configuration; fitted on first
+    use (RuntimeError when that fit does not finish within `time_limit`).
+    """
+    from autogluon.timeseries import TimeSeriesPredictor
+
+    key, config = config_key(model_path, prediction_length, quantile_levels, freq)
+    with _lock:
+        predictor = _predictors.get(key)
+    if predictor is not None:
+        _touch_if_due(key)
+        return predictor
+    # a first fit only holds up requests for the same configuration
+    with _key_lock(key):
+        with _lock:
+            predictor = _predictors.get(key)
+        if predictor is not None:
+            _touch_if_due(key)
+            return predictor
+        path = os.path.join(PREDICTOR_DIR, key)
+        if not os.path.isfile(os.path.join(path, MARKER)):
+            _fit(path, model_path, prediction_length, quantile_levels, freq, config, time_limit)
+        else:
+            _strip_train_data(path)   # entries saved before placeholder fits held a user's data
+        predictor = TimeSeriesPredictor.load(path)
+        _touch(path)
+        with _lock:
+            _predictors[key] = predictor
+        return predictor
+
+
+def entries(root: str = None) -> list:
+    """[(name, path, last_used_ts, complete)] for every directory under `root`."""
+    root = root or PREDICTOR_DIR
+    if not os.path.isdir(root):
+        return []
+    out = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if not os.path.isdir(path):
+            continue
+        marker = os.path.join(path, MARKER)
+        complete = name.startswith(PREFIX) and "." not in name and os.path.isfile(marker)
+        out.append((name, path, os.path.getmtime(marker if complete else path), complete))
+    return out
+
+
+def cleanup(max_age_days: float = None, max_entries: int = None, dry_run: bool = False, root: str = None) -> list:
+    """
+    Remove stale artifacts; returns the removed paths. Entries loaded in this
+    process are kept; other processes keep theirs recent via TOUCH_INTERVAL.
+    """
+    max_age_days = RETENTION_DAYS if max_age_days is None else max_age_days
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    now = time.time()
+    removed = []
+    kept = []
+    with _lock:
+        loaded = set(_predictors)
+    for name, path, last_used, complete in entries(root):
+        if name in loaded:
+            continue
+        if not complete:
+            # legacy ag-<timestamp> dirs and half-written fits (skip very recent ones: may be in progress)
+            if now - last_used > 3600 or name.startswith("ag-"):
+                removed.append(path)
+        elif now - last_used > max_age_days * 86400:
+            removed.append(path)
+        else:
+            kept.append((last_used, path))
+    kept.sort(reverse=True)
+    removed += [path for _, path in kept[max_entries:]]
+    for path in removed:
+        print(f"[predictors] {'would remove' if dry_run else 'removing'} {path}")
+        if not dry_run:
+            shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    clean = sub.add_parser("cleanup", help="apply the retention policy")
+    clean.add_argument("--max-age-days", type=float, default=None)
+    clean.add_argument("--max-entries", type=int, default=None)
+    clean.add_argument("--dry-run", action="store_true")
+    sub.add_parser("list")
+    args = parser.parse_args(argv)
+
+    if args.command == "cleanup":
+        removed = cleanup(args.max_age_days, args.max_entries, args.dry_run)
+        print(f"[predictors] {len(removed)} artifact(s) {'to remove' if args.dry_run else 'removed'}")
+    else:
+        for name, path, last_used, complete in entries():
+            config = ""
+            if complete:
+                with open(os.path.join(path, MARKER), "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                config = f"{meta['model_path']} h={meta['prediction_length']} freq={meta['freq']}"
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(last_used))
+            print(f"{name:28s} {stamp}  {config or '(legacy/incomplete)'}")
+
+
+if __name__ == "__main__":
+    main()
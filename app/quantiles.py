@@ -0,0 +1,70 @@
+# app/quantiles.py
+"""
+Quantile grid shared by all engines.
+
+Forecast frames use one column per quantile level, named like the columns the
+dashboard already knows: 0.1 -> 'p10', 0.05 -> 'p05', 0.95 -> 'p95'.
+"""
+DEFAULT_QUANTILE_LEVELS = (0.05, 0.1, 0.2, 0.25, 0.3, 0.4, 0.5, 0.6, 0.7, 0.75, 0.8, 0.9, 0.95)
+# levels every forecast must contain (mean clipping + P10–P90 default band)
+REQUIRED_LEVELS = (0.1, 0.5, 0.9)
+
+
+def ensure_levels(levels=None) -> tuple:
+    """Sorted, de-duplicated grid that always contains REQUIRED_LEVELS."""
+    levels = DEFAULT_QUANTILE_LEVELS if levels is None else levels
+    return tuple(sorted({round(float(q), 4) for q in levels} | set(REQUIRED_LEVELS)))
+
+
+def quantile_column(level: float) -> str:
+    return f"p{int(round(float(level) * 100)):02d}"
+
+
+def quantile_columns(levels) -> list:
+    return [quantile_column(q) for q in levels]
+
+
+def normalize_quantile_columns(df, levels):
+    """
+    Rename raw quantile columns (float 0.1 or string '0.1', as returned by
+    AutoGluon) to the pXX names. Returns a new frame.
+    """
+    mapping = {}
+    for col in df.columns:
+        try:
+            level = float(col)
+        except (TypeError, ValueError):
+            continue
+        if any(abs(level - q) < 1e-9 for q in levels):
+            mapping[col] = quantile_column(level)
+    return df.rename(columns=mapping)
+
+
+# interval bands the UI can switch between without re-running the model:
+# key -> (lower level, upper level); every level is part of DEFAULT_QUANTILE_LEVELS
+INTERVAL_BANDS = {
+    "80": (0.1, 0.9),
+    "90": (0.05, 0.95),
+    "60": (0.2, 0.8),
+    "50": (0.25, 0.75),
+}
+DEFAULT_BAND = "80"
+
+
+def band_columns(band: str = None) -> tuple:
+    """(lower_col, upper_col) for a band key, e.g. '90' -> ('p05', 'p95')."""
+    lower, upper = INTERVAL_BANDS.get(str(band), INTERVAL_BANDS[DEFAULT_BAND])
+    return quantile_column(lower), quantile_column(upper)
+
+
+def band_label(band: str = None) -> str:
+    lower_col, upper_col = band_columns(band)
+    return f"{lower_col.upper()}–{upper_col.upper()} Interval"
+
+
+def band_options() -> list:
+    """Dropdown options for the interval band selector."""
+    return [
+        {"label": f"{key}% ({band_label(key).replace(' Interval', '')})", "value": key}
+        for key in sorted(INTERVAL_BANDS, key=int, reverse=True)
+    ]
@@ -0,0 +1,170 @@
+# app/statistical_model.py
+"""
+Fast statistical forecasting engine (no torch / AutoGluon).
+
+Used next to Chronos / Lag-Llama for:
+  - very short series (too little history for a transformer to help), and
+  - requests whose deadline would be blown by loading a Chronos model.
+
+All series are stacked into one right-aligned (n_series, T) matrix (NaN padded
+on the left), so seasonal naive, simple exponential smoothing (ETS(A,N,N)
+style) and the empirical residual quantiles are computed for every series at
+once with NumPy instead of a Python loop per series.
+"""
+import numpy as np
+import pandas as pd
+
+from app.quantiles import ensure_levels, quantile_columns
+
+ENGINE_NAME = "statistical"
+# series with fewer observations than this skip Chronos and use this engine
+SHORT_SERIES_LENGTH = 24
+# smoothing levels tried for the ETS-style level model (best one picked per series)
+SES_ALPHAS = np.array([0.1, 0.3, 0.5, 0.8])
+
+
+def _stack_series(df, id_col, timestamp_col, target_col):
+    """Return (item_ids, last_timestamps, Y) with Y right-aligned and NaN padded."""
+    df = df[[id_col, timestamp_col, target_col]].copy()
+    df[timestamp_col] = pd.to_datetime(df[timestamp_col], errors="coerce")
+    df[target_col] = pd.to_numeric(df[target_col], errors="coerce")
+    df = df.dropna(subset=[timestamp_col]).sort_values([id_col, timestamp_col])
+
+    codes, item_ids = pd.factorize(df[id_col], sort=True)
+    lengths = np.bincount(codes, minlength=len(item_ids))
+    width = int(lengths.max()) if len(lengths) else 0
+    # position of each row inside its series, then shift so every series ends at column T-1
+    pos = df.groupby(codes).cumcount().to_numpy() + (width - lengths[codes])
+    Y = np.full((len(item_ids), width), np.nan)
+    Y[codes, pos] = df[target_col].to_numpy(dtype=float)
+    last_ts = df.groupby(codes)[timestamp_col].max().to_numpy()
+    return list(item_ids), last_ts, Y
+
+
+def _seasonal_naive(Y, horizon, season_length):
+    """Repeat the last season; falls back to last value where history < 2 seasons."""
+    n, T = Y.shape
+    m = max(1, int(season_length))
+    idx = T - m + (np.arange(horizon) % m)
+    fc = Y[:, np.clip(idx, 0, T - 1)]
+    short = np.sum(~np.isnan(Y), axis=1) < 2 * m
+    fc[short] = Y[short, -1:]
+    # in-sample m-step errors (y_t - y_{t-m})
+    resid = np.full_like(Y, np.nan)
+    if T > m:
+        resid[:, m:] = Y[:, m:] - Y[:, :-m]
+    resid[short] = np.nan
+    if T > 1:
+        resid[short, 1:] = Y[short, 1:] - Y[short, :-1]
+    return fc, resid
+
+
+def _exp_smoothing(Y):
+    """Vectorized SES over all series and all candidate alphas; best alpha per series."""
+    n, T = Y.shape
+    a = SES_ALPHAS[:, None]                      # (A, 1)
+    first = np.nan_to_num(Y[np.arange(n), np.argmax(~np.isnan(Y), axis=1)])
+    level = np.tile(first, (len(SES_ALPHAS), 1))  # (A, n)
+    resid = np.full((len(SES_ALPHAS), n, T), np.nan)
+    for t in range(T):
+        y = Y[:, t]
+        seen = ~np.isnan(y)
+        err = np.where(seen, y - level, np.nan)
+        resid[:, :, t] = err
+        level = np.where(seen, level + a * np.nan_to_num(err), level)
+    sse = np.nansum(resid ** 2, axis=2)          # (A, n)
+    best = np.argmin(sse, axis=0)
+    cols = np.arange(n)
+    return level[best, cols], resid[best, cols, :]
+
+
+def future_index(last_ts, horizon, freq):
+    """Timestamps per series, computed once per distinct last timestamp."""
+    offset = pd.tseries.frequencies.to_offset(freq)
+    cache = {}
+    out = []
+    for ts in last_ts:
+        key = pd.Timestamp(ts)
+        if key not in cache:
+            cache[key] = pd.date_range(start=key + offset, periods=horizon, freq=offset)
+        out.append(cache[key])
+    return out
+
+
+def forecast_statistical(
+    df: pd.DataFrame,
+    id_col: str,
+    timestamp_col: str,
+    target_col: str,
+    freq: str = "D",
+    prediction_length: int = 7,
+    season_length: int = 7,
+    quantile_levels=None,
+    method: str = "auto",
+) -> pd.DataFrame:
+    """
+    Forecast every series in `df` with a cheap statistical model.
+
+    method: "seasonal_naive", "ets" or "auto" (per series, whichever has the
+    lower in-sample MAE). Intervals come from empirical quantiles of the
+    in-sample residuals, widened by sqrt(h) along the horizon.
+    Returns columns ['item_id','timestamp','mean', <pXX per quantile level>, 'engine'].
+    """
+    levels = ensure_levels(quantile_levels)
+    if id_col is None or id_col not in df.columns:
+        df = df.assign(item_id="main_series")
+        id_col = "item_id"
+    item_ids, last_ts, Y = _stack_series(df, id_col, timestamp_col, target_col)
+    if not item_ids:
+        return pd.DataFrame(columns=["item_id", "timestamp", "mean", *quantile_columns(levels), "engine"])
+    H = int(prediction_length)
+
+    sn_fc, sn_resid = _seasonal_naive(Y, H, season_length)
+    ses_level, ses_resid = _exp_smoothing(Y)
+    ses_fc = np.repeat(ses_level[:, None], H, axis=1)
+
+    if method == "seasonal_naive":
+        use_sn = np.ones(len(item_ids), dtype=bool)
+    elif method == "ets":
+        use_sn = np.zeros(len(item_ids), dtype=bool)
+    else:
+        with np.errstate(all="ignore"):
+            use_sn = np.nanmean(np.abs(sn_resid), axis=1) < np.nanmean(np.abs(ses_resid), axis=1)
+    mean = np.where(use_sn[:, None], sn_fc, ses_fc)
+    resid = np.where(use_sn[:, None], sn_resid, ses_resid)
+
+    # empirical residual quantiles (0 when a series has no residuals at all)
+    with np.errstate(all="ignore"):
+        q = np.nan_to_num(np.nanquantile(resid, list(levels), axis=1))   # (Q, n)
+    scale = np.sqrt(np.arange(1, H + 1))[None, None, :]
+    bands = np.sort(mean[None, :, :] + q[:, :, None] * scale, axis=0)   # (Q, n, H), monotone in q
+
+    timestamps = future_index(last_ts, H, freq)
+    out = {
+        "item_id": np.repeat(np.asarray(item_ids, dtype=object), H),
+        "timestamp": np.concatenate([t.to_numpy() for t in timestamps]),
+        "mean": mean.ravel(),
+    }
+    for col, band in zip(quantile_columns(levels), bands):
+        out[col] = band.ravel().astype(np.float32)
+    out["engine"] = ENGINE_NAME
+    return pd.DataFrame(out)
+
+
+def predict(data_records,
+            id_col: str,
+            timestamp_col: str,
+            target_col: str,
+            prediction_length: int,
+            freq: str = "D",
+            season_length: int = 7,
+            method: str = "auto",
+            quantile_levels=None,
+            **kwargs):
+    """Dispatcher-compatible predict(...): returns (DataFrame, log)."""
+    df = data_records.copy() if isinstance(data_records, pd.DataFrame) else pd.DataFrame(data_records)
+    out = forecast_statistical(df, id_col, timestamp_col, target_col, freq=freq,
+                               prediction_length=prediction_length,
+                               season_length=season_length, method=method,
+                               quantile_levels=quantile_levels)
+    return out, f"[statistical] {out['item_id'].nunique()} series forecast with method={method}"
@@ -0,0 +1,65 @@
+# app/warmup.py
+"""
+Background warm-up of the inference stack.
+
+The web tier imports no ML libraries at startup; the first forecast would
+otherwise pay for importing torch / AutoGluon and loading weights. start()
+does that work in a daemon thread right after the server is up:
+
+  INFERENCE_WARMUP          1 (default) = warm up in the background, 0 = on first request
+  INFERENCE_WARMUP_MODELS   pipelines to load, e.g. "amazon/chronos-bolt-small"
+
+With an inference pool (INFERENCE_WORKERS > 0) this only connects to the
+inference service (app.inference_service); its workers import the stack
+themselves and the web process stays light.
+"""
+import importlib
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("INFERENCE_WARMUP", "1") in ("1", "true", "True")
+WARMUP_MODELS = [m.strip() for m in os.environ.get("INFERENCE_WARMUP_MODELS", "").split(",") if m.strip()]
+
+_thread = None
+# step -> seconds, for benchmarks.startup_profile
+timings = {}
+
+
+def _run(models):
+    start = time.perf_counter()
+    try:
+        from app.worker_pool import configure_local_threads, get_pool
+        pool = get_pool()
+        if pool is not None:
+            pool.connect()   # waits until the inference service has preloaded and forked its workers
+            timings["pool"] = time.perf_counter() - start
+            return
+        # inference runs in this process: its thread counts are set here (imports torch)
+        configure_local_threads()
+        timings["import torch"] = time.perf_counter() - start
+        for module in ("app.chronos_model", "autogluon.timeseries"):
+            importlib.import_module(module)
+        timings["import autogluon"] = time.perf_counter() - start - timings["import torch"]
+        if models:
+            from app.chronos_pipeline import load_pipeline
+            for model_id in models:
+                t = time.perf_counter()
+                load_pipeline(model_id)
+                timings[f"load {model_id}"] = time.perf_counter() - t
+    except Exception as e:
+        print(f"[warmup] failed: {e}")
+        return
+    print(f"[warmup] inference stack ready in {time.perf_counter() - start:.1f}s")
+
+
+def start(models=None):
+    """Start the warm-up thread once per process; returns it (None when disabled)."""
+    global _thread
+    if not ENABLED:
+        return None
+    if _thread is None:
+        _thread = threading.Thread(target=_run, args=(models if models is not None else WARMUP_MODELS,),
+                                   name="inference-warmup", daemon=True)
+        _thread.start()
+    return _thread
@@ -0,0 +1,375 @@
+# app/worker_pool.py
+"""
+CPU thread / process topology for inference.
+
+Torch uses every core for intra-op parallelism in every process by default,
+so several web workers each running a forecast oversubscribe the CPU. This
+module makes the topology explicit:
+
+  INFERENCE_WORKERS           inference processes (0 = run in the web process)
+  INFERENCE_INTRA_OP_THREADS  torch intra-op threads per process (default:
+                              cores // workers; with workers=0 every web
+                              process runs inference: cores // WEB_CONCURRENCY)
+  INFERENCE_INTER_OP_THREADS  torch inter-op threads per process (default 1)
+  INFERENCE_CPU_AFFINITY      1 = pin each worker to its own slice of cores
+  INFERENCE_START_METHOD      spawn (default) or fork
+  INFERENCE_PRELOAD           models loaded in the parent before forking,
+                              e.g. "amazon/chronos-t5-base,amazon/chronos-bolt-small"
+
+The pool lives in one dedicated inference process (app.inference_service),
+started by the app factory: in the gunicorn master under preload_app, before
+any worker or thread exists. Web workers and dashboard jobs never build a
+pool; get_pool() returns a PoolClient that submits to the service over a unix
+socket, so every request shares the same warm workers and the memory does not
+grow with WEB_CONCURRENCY.
+
+Pre-fork mode (INFERENCE_START_METHOD=fork): the service loads the models in
+INFERENCE_PRELOAD once, freezes the GC and forks every worker up front from its
+single-threaded main thread, so the weight storages are shared copy-on-write
+instead of loaded once per worker. Safeguards against un-sharing those pages:
+  - gc.freeze() before forking: the collector never walks (and writes to) the
+    parent's objects in the children;
+  - nothing runs inference in the parent, so no torch/OpenMP thread pool
+    exists at fork time (thread counts are set in each child);
+  - tensors are frozen (requires_grad=False, eval mode) before forking and the
+    workers only ever read them under inference_mode.
+InferencePool.memory_report() gives RSS / PSS / shared / private per worker
+(from /proc/<pid>/smaps_rollup); GET /forecast/workers exposes it.
+
+Workers get the request's Deadline via Deadline.to_remote(): its cancels
+(/forecast/cancel, cancel_owner, the SIGTERM drain) reach the worker through
+the shared deadline store (app.deadline.configure), and its stage events come
+back the same way. The caller waits with a timeout and gives up RESULT_GRACE s
+after the deadline passed or the request was cancelled. A worker that dies
+(OOM kill, segfault) breaks the executor; the pool is rebuilt once and the
+failing request gets an error. A rebuilt pre-fork pool uses spawn (the
+service is multi-threaded by then) and loads INFERENCE_PRELOAD in each worker.
+
+run_forecast() is the entry point used by the API and the dashboard: it runs
+forecast_with_chronos in the service's pool when one is running, in-process
+otherwise.
+Sweep the settings with `python -m benchmarks.thread_topology`.
+"""
+import atexit
+import gc
+import json
+import multiprocessing
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+
+from app.deadline import Deadline, DeadlineExceeded, DEFAULT_TIMEOUT
+
+# how often the caller wakes up to look at its deadline while a worker runs
+RESULT_POLL = 0.5
+# how long a cancelled / expired request may still take to return its partial result
+RESULT_GRACE = 30.0
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+@dataclass
+class Topology:
+    workers: int = 0
+    intra_op_threads: int = None
+    inter_op_threads: int = 1
+    cpu_affinity: bool = False
+    cores: list = field(default_factory=lambda: sorted(_available_cores()))
+    start_method: str = "spawn"
+    preload: list = field(default_factory=list)
+    # web worker processes (gunicorn sets WEB_CONCURRENCY); they share the cores when workers=0
+    web_processes: int = field(default_factory=lambda: _env_int("WEB_CONCURRENCY", 1))
+
+    def __post_init__(self):
+        if not self.intra_op_threads:
+            processes = self.workers if self.workers > 0 else self.web_processes
+            self.intra_op_threads = max(1, len(self.cores) // max(1, processes))
+
+    @classmethod
+    def from_env(cls) -> "Topology":
+        return cls(
+            workers=_env_int("INFERENCE_WORKERS", 0),
+            intra_op_threads=_env_int("INFERENCE_INTRA_OP_THREADS", None),
+            inter_op_threads=_env_int("INFERENCE_INTER_OP_THREADS", 1),
+            cpu_affinity=os.environ.get("INFERENCE_CPU_AFFINITY", "0") in ("1", "true", "True"),
+            start_method=os.environ.get("INFERENCE_START_METHOD", "spawn"),
+            preload=[m.strip() for m in os.environ.get("INFERENCE_PRELOAD", "").split(",") if m.strip()],
+        )
+
+    def core_slice(self, index: int) -> list:
+        """Disjoint cores for worker `index` (wraps around when workers * threads > cores)."""
+        n = self.intra_op_threads
+        return [self.cores[(index * n + i) % len(self.cores)] for i in range(n)]
+
+
+def _available_cores() -> set:
+    if hasattr(os, "sched_getaffinity"):
+        return os.sched_getaffinity(0)
+    return set(range(os.cpu_count() or 1))
+
+
+def configure_threads(intra_op_threads: int, inter_op_threads: int = 1) -> None:
+    """Set torch (and OpenMP/MKL) thread counts for this process."""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(intra_op_threads)
+    import torch
+    torch.set_num_threads(intra_op_threads)
+    try:
+        torch.set_num_interop_threads(inter_op_threads)
+    except RuntimeError:
+        # can only be set once, before any inter-op work started in this process
+        pass
+
+
+def pin_affinity(cores) -> None:
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, set(cores))
+
+
+def preload_models(models) -> None:
+    """Load `models` into this process's pipeline cache, read-only, without running them."""
+    from app.chronos_pipeline import load_pipeline
+    for model_id in models:
+        pipeline = load_pipeline(model_id)
+        model = getattr(pipeline, "model", None)
+        if model is not None and hasattr(model, "parameters"):
+            model.eval()
+            for param in model.parameters():
+                param.requires_grad_(False)
+        print(f"[pool] preloaded {model_id}")
+
+
+def _smaps_rollup(pid: int) -> dict:
+    """Memory counters (MB) of one process from /proc/<pid>/smaps_rollup (Linux only)."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024.0
+    except OSError:
+        return {"pid": pid}
+    return {
+        "pid": pid,
+        "rss_mb": round(fields.get("Rss", 0.0), 1),
+        "pss_mb": round(fields.get("Pss", 0.0), 1),
+        "shared_mb": round(fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0), 1),
+        "private_mb": round(fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0), 1),
+    }
+
+
+def _init_worker(slots, topology: Topology, preload=()):
+    index = slots.get()
+    if topology.cpu_affinity:
+        pin_affinity(topology.core_slice(index))
+    configure_threads(topology.intra_op_threads, topology.inter_op_threads)
+    if preload:
+        preload_models(preload)
+
+
+def _forecast_in_worker(df, deadline_state, kwargs):
+    from app.chronos_model import forecast_with_chronos
+    return forecast_with_chronos(df, deadline=Deadline.from_remote(deadline_state), **kwargs)
+
+
+def _grace(deadline: Deadline, give_up_at):
+    """
+    When to stop waiting for a worker: RESULT_GRACE s after the deadline passed or
+    the request was cancelled (it normally returns its partial result well before).
+    """
+    if give_up_at is None and deadline.expired():
+        return deadline.elapsed() + RESULT_GRACE
+    return float("inf") if give_up_at is None else give_up_at
+
+
+def _abandon(deadline: Deadline):
+    if not deadline.cancelled:
+        deadline.cancel()   # the worker drops it at its next checkpoint
+    print(f"[pool] request {deadline.request_id} did not stop within {RESULT_GRACE:.0f}s, giving up")
+    raise DeadlineExceeded("pool", cancelled=True)
+
+
+class InferencePool:
+    """Fixed set of inference processes, each with its own thread budget / core slice."""
+
+    def __init__(self, topology: Topology, start_method: str = None):
+        self.topology = topology
+        start_method = start_method or topology.start_method
+        self.prefork = start_method == "fork"
+        self._rebuild_lock = threading.Lock()
+        if self.prefork:
+            preload_models(topology.preload)
+            gc.collect()
+            gc.freeze()
+        self._executor = self._start(start_method)
+
+    def _start(self, start_method: str, preload=()) -> ProcessPoolExecutor:
+        ctx = multiprocessing.get_context(start_method)
+        slots = ctx.SimpleQueue()   # no feeder thread in the parent
+        for i in range(self.topology.workers):
+            slots.put(i)
+        executor = ProcessPoolExecutor(
+            max_workers=self.topology.workers, mp_context=ctx,
+            initializer=_init_worker, initargs=(slots, self.topology, tuple(preload)),
+        )
+        if start_method == "fork":
+            # fork every worker now, before the executor starts its management thread
+            for f in [executor.submit(os.getpid) for _ in range(self.topology.workers)]:
+                f.result()
+        return executor
+
+    def _rebuild(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a broken executor (once, however many requests saw it break)."""
+        with self._rebuild_lock:
+            if self._executor is not broken:
+                return
+            print("[pool] an inference worker died, rebuilding the pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+            preload = self.topology.preload if self.prefork else ()
+            self._executor = self._start("spawn", preload=preload)
+
+    def forecast(self, df, deadline: Deadline = None, **kwargs):
+        deadline = deadline or Deadline(DEFAULT_TIMEOUT)
+        executor = self._executor
+        try:
+            future = executor.submit(_forecast_in_worker, df, deadline.to_remote(), kwargs)
+        except BrokenProcessPool:
+            self._rebuild(executor)
+            executor = self._executor
+            future = executor.submit(_forecast_in_worker, df, deadline.to_remote(), kwargs)
+        give_up_at = None
+        while True:
+            try:
+                return future.result(timeout=RESULT_POLL)
+            except FutureTimeout:
+                pass
+            except BrokenProcessPool:
+                self._rebuild(executor)
+                raise RuntimeError("inference worker died during the forecast; the pool was rebuilt")
+            give_up_at = _grace(deadline, give_up_at)
+            if deadline.elapsed() >= give_up_at:
+                future.cancel()
+                _abandon(deadline)
+
+    def worker_pids(self) -> list:
+        return sorted(getattr(self._executor, "_processes", None) or {})
+
+    def memory_report(self) -> list:
+        """RSS / PSS / shared / private MB of the parent and every worker."""
+        report = [dict(_smaps_rollup(os.getpid()), role="parent")]
+        report += [dict(_smaps_rollup(pid), role="worker") for pid in self.worker_pids()]
+        return report
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_pool = None
+_topology = None
+_service = None        # subprocess.Popen of the inference service started by this process
+_service_owner = None
+_threads_configured = False
+_lock = threading.Lock()
+
+
+def configure(topology: Topology) -> None:
+    """Use `topology` instead of INFERENCE_* env vars (app factory); applied when the service starts."""
+    global _topology
+    with _lock:
+        if _service is not None:
+            raise RuntimeError("inference service already started")
+        _topology = topology
+
+
+def start_service(topology: Topology = None):
+    """
+    Start the inference service for this app (app factory), unless
+    INFERENCE_WORKERS=0 or INFERENCE_ADDRESS already points at one (a service
+    started by a parent process or run separately). Its address and authkey go
+    into os.environ, so forked web workers and jobs find it. Returns the Popen.
+    """
+    global _service, _service_owner
+    topology = topology or _topology or Topology.from_env()
+    with _lock:
+        if _service is not None or os.environ.get("INFERENCE_ADDRESS") or topology.workers <= 0:
+            return _service
+        address = os.path.join(tempfile.gettempdir(), f"forecast-inference-{os.getpid()}.sock")
+        os.environ["INFERENCE_ADDRESS"] = address
+        os.environ["INFERENCE_AUTHKEY"] = secrets.token_hex(16)
+        env = dict(os.environ, INFERENCE_TOPOLOGY_JSON=json.dumps(asdict(topology)))
+        # own session: a Ctrl-C on the terminal stops the server first, then the service (stop_service)
+        _service = subprocess.Popen([sys.executable, "-m", "app.inference_service"], env=env,
+                                    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    start_new_session=True)
+        _service_owner = os.getpid()
+    atexit.register(stop_service)
+    print(f"[pool] inference service pid={_service.pid} at {address} ({topology.workers} workers)")
+    return _service
+
+
+def stop_service(timeout: float = 10.0) -> None:
+    """Stop the service started by this process (gunicorn on_exit / atexit); no-op elsewhere."""
+    global _service
+    with _lock:
+        service, _service = (_service, None) if _service_owner == os.getpid() else (None, _service)
+    if service is None or service.poll() is not None:
+        return
+    service.terminate()
+    try:
+        service.wait(timeout)
+    except subprocess.TimeoutExpired:
+        service.kill()
+
+
+def get_pool():
+    """Client of the inference service (PoolClient); None when none is running (INFERENCE_WORKERS=0)."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            address = os.environ.get("INFERENCE_ADDRESS")
+            if address:
+                from app.inference_service import PoolClient
+                _pool = PoolClient(address, bytes.fromhex(os.environ.get("INFERENCE_AUTHKEY", "")))
+            else:
+                _pool = False
+    return _pool or None
+
+
+def configure_local_threads() -> None:
+    """Thread counts for inference in this process (no pool); imports torch, once per process."""
+    global _threads_configured
+    with _lock:
+        if _threads_configured:
+            return
+        topology = _topology or Topology.from_env()
+        _threads_configured = True
+    configure_threads(topology.intra_op_threads, topology.inter_op_threads)
+
+
+def _forget_pool_after_fork():
+    # a forked child opens its own connection to the service and never owns it
+    global _pool, _threads_configured, _lock
+    _pool, _threads_configured, _lock = None, False, threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_pool_after_fork)
+
+
+def run_forecast(df, deadline: Deadline = None, **kwargs):
+    """forecast_with_chronos(df, ...) in the inference service's pool if one runs, else in-process."""
+    pool = get_pool()
+    if pool is not None:
+        return pool.forecast(df, deadline=deadline, **kwargs)
+    configure_local_threads()
+    from app.chronos_model import forecast_with_chronos
+    return forecast_with_chronos(df, deadline=deadline or Deadline(DEFAULT_TIMEOUT), **kwargs)
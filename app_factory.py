@@ -0,0 +1,118 @@
+# app_factory.py
+"""
+App factory: create_app(config) merakit Flask + API + auth + Dash secara
+deterministik, tanpa menjalankan server.
+
+Dipakai oleh run.py (server development), wsgi.py (gunicorn) dan benchmark /
+load-test harness:
+
+    from app_factory import create_app
+    from config import BenchmarkConfig
+    flask_app = create_app(BenchmarkConfig)
+    client = flask_app.test_client()
+
+Semua resource diambil dari `config` (lihat config.py) dan diterapkan sebelum
+modul lain memakainya: database auth, cache dir, model registry, direktori
+artefak predictor dan topologi worker inference. Kegagalan wiring tidak lagi
+di-skip diam-diam: create_app raise, supaya app yang jalan selalu lengkap.
+"""
+import os
+import secrets
+import time
+
+# durasi tiap langkah inisialisasi (detik), dibaca oleh benchmarks.startup_profile
+STEP_TIMINGS = {}
+_last_mark = [time.perf_counter()]
+
+
+def _mark(step):
+    now = time.perf_counter()
+    STEP_TIMINGS[step] = now - _last_mark[0]
+    _last_mark[0] = now
+    print(f"[app] step {step}: {STEP_TIMINGS[step] * 1000:.0f} ms")
+
+
+def configure_resources(config) -> None:
+    """Terapkan setting resource dari `config` ke modul-modul yang memakainya."""
+    from auth.models import init_engine, init_db
+    from app import deadline, model_registry, model_selection, predictor_registry, worker_pool
+    from dashboard import datastore
+
+    init_engine(config.DATABASE_URL)
+    if config.INIT_DB:
+        init_db()
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    datastore.configure(config.CACHE_DIR)
+    # frame upload lama (> DATASTORE_MAX_AGE_DAYS) dibuang saat start; selama jalan lihat datastore._maybe_cleanup
+    removed = datastore.cleanup()
+    if removed:
+        print(f"[app] datastore: {removed} frame kedaluwarsa dihapus")
+    deadline.configure(config.CACHE_DIR)
+    model_selection.configure(config.CACHE_DIR)
+    model_registry.configure(registry_dir=config.MODEL_REGISTRY_DIR, allow_hub=config.MODEL_REGISTRY_ALLOW_HUB)
+    predictor_registry.configure(config.PREDICTOR_DIR)
+    if config.INFERENCE_TOPOLOGY is not None:
+        worker_pool.configure(config.INFERENCE_TOPOLOGY)
+    # proses inference (INFERENCE_WORKERS > 0) dimulai di sini, sekali: di master gunicorn
+    # (preload_app) sebelum worker di-fork; worker & job hanya terhubung ke sana
+    worker_pool.start_service()
+
+
+def create_app(config=None):
+    """Flask app (dengan Dash terpasang) untuk profil `config`; default dari APP_ENV."""
+    from config import get_config
+    config = config or get_config()
+    _last_mark[0] = time.perf_counter()
+
+    # 1) Flask app
+    from flask import Flask
+    flask_app = Flask(__name__, static_folder=None)  # Dash will serve assets itself
+    secret_key = config.SECRET_KEY
+    if not secret_key and config.NAME == "production":
+        # setiap worker/restart akan punya key berbeda -> session user hilang
+        raise RuntimeError("SECRET_KEY wajib di-set untuk profil production")
+    flask_app.config['SECRET_KEY'] = secret_key or "dev-" + secrets.token_urlsafe(24)
+    flask_app.config['SESSION_COOKIE_SAMESITE'] = config.SESSION_COOKIE_SAMESITE
+    flask_app.config['SESSION_COOKIE_SECURE'] = config.SESSION_COOKIE_SECURE
+    flask_app.config['CACHE_DIR'] = config.CACHE_DIR
+    flask_app.config['APP_PROFILE'] = config
+    print(f"[app] Created Flask app (profile={config.NAME})")
+    _mark("flask")
+
+    # 2) resources (database, cache, model registry, predictor artifacts, worker pool)
+    configure_resources(config)
+    _mark("resources")
+
+    # 3) API blueprint (route tetap '/forecast', tanpa url_prefix)
+    from app.api import forecast_bp
+    flask_app.register_blueprint(forecast_bp)
+    _mark("api")
+
+    # 4) auth: login manager + guard, lalu routes
+    from auth.manager import init_auth
+    from auth.routes import bp as auth_bp
+    init_auth(flask_app)
+    if auth_bp.name not in flask_app.blueprints:
+        flask_app.register_blueprint(auth_bp)
+    _mark("auth")
+
+    # 5) Dash di atas Flask server yang sama
+    from dashboard.app import create_dash_app
+    dash_app = create_dash_app(flask_app)
+    _mark("dash")
+
+    if config.DASH_DEV_TOOLS:
+        dash_app.enable_dev_tools(
+            debug=True,
+            dev_tools_ui=True,
+            dev_tools_props_check=config.DASH_PROPS_CHECK,
+            dev_tools_serve_dev_bundles=config.DASH_SERVE_DEV_BUNDLES,
+            dev_tools_hot_reload=config.DASH_HOT_RELOAD,
+        )
+        print("[app] Dash Dev Tools ENABLED ✅")
+    else:
+        print(f"[app] Dash Dev Tools disabled ({config.NAME}: minified bundles, no props check)")
+    flask_app.extensions["dash_app"] = dash_app
+    _mark("dev_tools")
+    print(f"[app] startup steps total {sum(STEP_TIMINGS.values()) * 1000:.0f} ms")
+    return flask_app
@@ -25,6 +25,7 @@ from sqlalchemy import (
     String,
     Boolean,
     DateTime,
+    Float,
     ForeignKey,
     create_engine,
     UniqueConstraint,
@@ -55,20 +56,37 @@ _engine_kwargs = {
     "pool_pre_ping": True,
 }
 
-if DATABASE_URL.startswith("sqlite"):
-    # sqlite needs check_same_thread for single-process dev
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        **{k: v for k, v in _engine_kwargs.items() if k != "pool_pre_ping"},
-    )
-else:
+def _create_engine(url: str):
+    if url.startswith("sqlite"):
+        # sqlite needs check_same_thread for single-process dev
+        return create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            **{k: v for k, v in _engine_kwargs.items() if k != "pool_pre_ping"},
+        )
     # MySQL / Postgres / others
-    engine = create_engine(DATABASE_URL, **_engine_kwargs)
+    return create_engine(url, **_engine_kwargs)
+
+
+engine = _create_engine(DATABASE_URL)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine,expire_on_commit=False)
 
+
+def init_engine(url: str):
+    """
+    Point the module at another database (app factory / test harness).
+    SessionLocal is re-bound in place, so modules that imported it keep working.
+    """
+    global engine, DATABASE_URL
+    if url == DATABASE_URL:
+        return engine
+    old, engine, DATABASE_URL = engine, _create_engine(url), url
+    SessionLocal.configure(bind=engine)
+    old.dispose()
+    return engine
+
 # ---------------------------------------------------------------------------
 # Models
 # ---------------------------------------------------------------------------
@@ -140,6 +158,46 @@ class RealDataInput(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     forecast = relationship("ForecastResult", back_populates="real_data_input")
+
+
+# Skema ternormalisasi (dashboard/forecast_store.py): satu baris per run forecast,
+# satu baris per observasi real. ForecastResult / RealDataInput di atas hanya
+# dibaca oleh migrasi (python update_db.py).
+class ForecastRun(Base):
+    __tablename__ = "forecast_runs"
+    __table_args__ = (UniqueConstraint("user_id", "run_key", name="uq_forecast_runs_user_key"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    run_key = Column(String(64), nullable=False)   # id forecast di datastore / hash records
+    model_name = Column(String(100))
+    uploaded_filename = Column(String(255))
+    forecast_output = Column(JSON)   # records forecast, ditulis sekali
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+
+    observations = relationship("Observation", back_populates="run", cascade="all, delete-orphan",
+                                passive_deletes=True)
+
+
+class Observation(Base):
+    __tablename__ = "observations"
+    __table_args__ = (UniqueConstraint("run_id", "series", "timestamp", name="uq_observations_point"),)
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("forecast_runs.id", ondelete="CASCADE"), nullable=False)
+    series = Column(String(100), nullable=False, default="")
+    timestamp = Column(DateTime, nullable=False)
+    value = Column(Float, nullable=False)
+    forecast = Column(Float, nullable=True)
+    lower = Column(Float, nullable=True)
+    upper = Column(Float, nullable=True)
+    band = Column(String(20), nullable=True)
+    anomaly = Column(String(8), nullable=True)
+    alert_sent = Column(Boolean, default=False, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    run = relationship("ForecastRun", back_populates="observations")
 # ---------------------------------------------------------------------------
 # DB utilities
 # ---------------------------------------------------------------------------
@@ -340,10 +398,15 @@ __all__ = [
     "Base",
     "engine",
     "SessionLocal",
+    "init_engine",
     "init_db",
     "get_db_session",
     "Role",
     "User",
+    "ForecastResult",
+    "RealDataInput",
+    "ForecastRun",
+    "Observation",
     "create_role",
     "get_role_by_name",
     "create_user",
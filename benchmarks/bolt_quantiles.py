@@ -0,0 +1,64 @@
+# benchmarks/bolt_quantiles.py
+"""
+Compare the native Chronos-Bolt quantile path against the AutoGluon paths.
+
+    python -m benchmarks.bolt_quantiles
+    python -m benchmarks.bolt_quantiles --bolt amazon/chronos-bolt-small --t5 amazon/chronos-t5-small --repeats 5
+
+For every bundled dataset it forecasts the holdout with
+  - bolt-native : Bolt via app.chronos_pipeline (one forward pass, no sampling)
+  - bolt-ag     : the same Bolt model through AutoGluon fit/predict
+  - t5-ag       : a T5 model through AutoGluon (sample-based quantiles)
+and prints median / p95 latency and WQL over the full quantile grid.
+"""
+import argparse
+
+import numpy as np
+
+from app.chronos_model import forecast_with_chronos
+from app.deadline import Deadline
+from app.quantiles import DEFAULT_QUANTILE_LEVELS, quantile_column
+from benchmarks.common import holdout_split, iter_datasets, percentile, replicate_series, timed, weighted_quantile_loss
+
+
+def _paths(bolt, t5):
+    return {
+        "bolt-native": dict(chronos_model=bolt, bolt_fast_path=True),
+        "bolt-ag": dict(chronos_model=bolt, bolt_fast_path=False),
+        "t5-ag": dict(chronos_model=t5),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bolt", default="amazon/chronos-bolt-tiny")
+    parser.add_argument("--t5", default="amazon/chronos-t5-tiny")
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--series", type=int, default=16, help="replicate each dataset to this many series")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    grid = {quantile_column(q): q for q in DEFAULT_QUANTILE_LEVELS}
+    print(f"{'dataset':46s} {'path':12s} {'median_s':>9s} {'p95_s':>8s} {'WQL':>8s}")
+    for name, df in iter_datasets():
+        df = replicate_series(df, args.series)
+        train, test = holdout_split(df, args.horizon)
+        for label, kwargs in _paths(args.bolt, args.t5).items():
+            seconds, scores = [], []
+            for _ in range(args.repeats):
+                (pred, logs), t = timed(
+                    forecast_with_chronos, train, id_col="item_id", timestamp_col="timestamp",
+                    target_col="target", prediction_length=args.horizon,
+                    deadline=Deadline(None), short_series_length=0, **kwargs,
+                )
+                if pred.empty:
+                    print(f"{name:46s} {label:12s} failed: {logs.strip().splitlines()[-1:]}")
+                    break
+                seconds.append(t)
+                scores.append(weighted_quantile_loss(test, pred, grid))
+            if seconds:
+                print(f"{name:46s} {label:12s} {percentile(seconds, 50):9.3f} {percentile(seconds, 95):8.3f} {np.mean(scores):8.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/common.py
+"""
+Shared helpers for the benchmark commands: bundled datasets, holdout split,
+scaling a dataset to N series, accuracy metrics and timing.
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# bundled CSVs -> (id_col, timestamp_col, target_col); id None = single series
+BUNDLED_DATASETS = {
+    "sample_forecasting_dataset.csv": ("item_id", "timestamp", "value"),
+    "Diskreperensi - Data Clean.csv": ("id", "date", "target"),
+    "Data_Forecasting_Positif_untuk_AutoGluon.csv": (None, "date", "target"),
+}
+
+
+def load_dataset(name: str) -> pd.DataFrame:
+    """Load a bundled CSV normalized to columns item_id / timestamp / target."""
+    id_col, ts_col, target_col = BUNDLED_DATASETS[name]
+    df = pd.read_csv(os.path.join(ROOT, name))
+    if id_col is None:
+        df["item_id"] = "main_series"
+        id_col = "item_id"
+    df = df.rename(columns={id_col: "item_id", ts_col: "timestamp", target_col: "target"})
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df[["item_id", "timestamp", "target"]].sort_values(["item_id", "timestamp"]).reset_index(drop=True)
+
+
+def iter_datasets(names=None):
+    for name in names or BUNDLED_DATASETS:
+        yield name, load_dataset(name)
+
+
+def holdout_split(df: pd.DataFrame, horizon: int):
+    """Last `horizon` points of every series are the test part."""
+    rank = df.groupby("item_id").cumcount(ascending=False)
+    return df[rank >= horizon].reset_index(drop=True), df[rank < horizon].reset_index(drop=True)
+
+
+def replicate_series(df: pd.DataFrame, n_series: int, history_length: int = None) -> pd.DataFrame:
+    """Tile the dataset's series (with jitter-free copies) to get exactly `n_series` ids."""
+    if history_length:
+        df = df[df.groupby("item_id").cumcount(ascending=False) < history_length]
+    base_ids = df["item_id"].unique().tolist()
+    parts = []
+    for i in range(n_series):
+        part = df[df["item_id"] == base_ids[i % len(base_ids)]].copy()
+        part["item_id"] = f"{part['item_id'].iloc[0]}#{i}"
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def weighted_quantile_loss(actual: pd.DataFrame, forecast: pd.DataFrame, quantile_cols=None) -> float:
+    """
+    Mean weighted quantile loss over the given quantile columns ({'p10': 0.1, ...});
+    defaults to p10 / mean (as the median) / p90 like the dashboard output.
+    """
+    quantile_cols = quantile_cols or {"p10": 0.1, "mean": 0.5, "p90": 0.9}
+    merged = actual.merge(forecast, on=["item_id", "timestamp"], how="inner")
+    if merged.empty:
+        return float("nan")
+    y = merged["target"].to_numpy(dtype=float)
+    denom = np.abs(y).sum() or 1.0
+    losses = []
+    for col, q in quantile_cols.items():
+        pred = merged[col].to_numpy(dtype=float)
+        losses.append(2 * np.sum(np.abs((y - pred) * ((y <= pred) - q))) / denom)
+    return float(np.mean(losses))
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn and return (result, seconds)."""
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def percentile(values, q) -> float:
+    return float(np.percentile(np.asarray(values, dtype=float), q)) if len(values) else float("nan")
@@ -0,0 +1,57 @@
+# benchmarks/export_latency.py
+"""
+Latency of an exported Chronos-Bolt graph vs the eager PyTorch model.
+
+    python -m app.chronos_export amazon/chronos-bolt-tiny       # once
+    python -m benchmarks.export_latency --model amazon/chronos-bolt-tiny
+
+Runs both paths through forecast_quantiles on the bundled datasets for a few
+batch sizes (the dashboard mostly sends small batches) and prints median /
+p95 latency, the speed-up and the max abs difference of the quantile grid.
+"""
+import argparse
+
+import numpy as np
+
+from app import chronos_export, chronos_pipeline
+from app.deadline import Deadline
+from app.quantiles import DEFAULT_QUANTILE_LEVELS, quantile_columns
+from benchmarks.common import iter_datasets, percentile, replicate_series, timed
+
+
+def _run(df, model, horizon, use_exported, repeats):
+    seconds, pred = [], None
+    for _ in range(repeats):
+        (pred, _), t = timed(
+            chronos_pipeline.forecast_quantiles, df, "item_id", "timestamp", "target",
+            horizon, model, deadline=Deadline(None), precision="fp32", use_exported=use_exported,
+        )
+        seconds.append(t)
+    return pred, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="amazon/chronos-bolt-tiny")
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--series", type=int, nargs="*", default=[1, 8, 32])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if chronos_export.find_export(args.model) is None:
+        raise SystemExit(f"no export for {args.model}; run: python -m app.chronos_export {args.model}")
+
+    cols = quantile_columns(DEFAULT_QUANTILE_LEVELS)
+    print(f"{'dataset':46s} {'series':>6s} {'eager_p50':>10s} {'export_p50':>10s} {'export_p95':>10s} {'speedup':>8s} {'max_diff':>9s}")
+    for name, base in iter_datasets():
+        for n in args.series:
+            df = replicate_series(base, n)
+            eager_pred, eager_s = _run(df, args.model, args.horizon, False, args.repeats)
+            exp_pred, exp_s = _run(df, args.model, args.horizon, True, args.repeats)
+            diff = float(np.max(np.abs(eager_pred[cols].to_numpy() - exp_pred[cols].to_numpy())))
+            e50, x50 = percentile(eager_s, 50), percentile(exp_s, 50)
+            print(f"{name:46s} {n:6d} {e50:10.4f} {x50:10.4f} {percentile(exp_s, 95):10.4f} {e50 / x50:8.2f} {diff:9.2e}")
+
+
+if __name__ == "__main__":
+    main()
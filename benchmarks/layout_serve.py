@@ -0,0 +1,96 @@
+# benchmarks/layout_serve.py
+"""
+Per-request cost of serving the Dash layout (GET /_dash-layout), with and
+without the memoized shell/sidebar of dashboard/app.py.
+
+    python -m benchmarks.layout_serve
+    python -m benchmarks.layout_serve --requests 500 --users 5
+
+Each mode runs in a fresh interpreter (DASH_LAYOUT_CACHE=0 / 1) that builds
+the app with the benchmark profile, creates `--users` accounts and requests
+the layout anonymously and as those users (round robin) through the Flask
+test client. Reports mean / p50 / p95 per request in ms.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, time
+import app_factory
+from config import BenchmarkConfig
+from auth.models import create_user, get_user_by_username, ensure_default_roles
+
+app = app_factory.create_app(BenchmarkConfig)
+ensure_default_roles()
+ids = []
+for i in range(USERS):
+    name = f"bench-layout-{i}"
+    user = get_user_by_username(name) or create_user(name, "bench-pass", role_name="user")
+    ids.append(str(user.id))
+
+def measure(client, n):
+    client.get("/_dash-layout")          # first request builds / fills the cache
+    times = []
+    for _ in range(n):
+        t = time.perf_counter()
+        status = client.get("/_dash-layout").status_code
+        times.append(time.perf_counter() - t)
+        assert status == 200, status
+    return times
+
+out = {"anonymous": measure(app.test_client(), REQUESTS)}
+user_times = []
+for i in range(REQUESTS):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = ids[i % len(ids)]
+        sess["_fresh"] = True
+    t = time.perf_counter()
+    status = client.get("/_dash-layout").status_code
+    user_times.append(time.perf_counter() - t)
+    assert status == 200, status
+out["signed-in"] = user_times
+print("@@LAYOUT@@" + json.dumps(out))
+"""
+
+
+def _summary(times):
+    times = sorted(times)
+    p = lambda q: times[min(len(times) - 1, int(q * len(times)))] * 1000
+    return sum(times) / len(times) * 1000, p(0.5), p(0.95)
+
+
+def run_mode(cached: bool, requests: int, users: int) -> dict:
+    env = dict(os.environ, FLASK_DEBUG="0", INFERENCE_WARMUP="0", DASH_LAYOUT_CACHE="1" if cached else "0")
+    proc = subprocess.run(
+        [sys.executable, "-c", f"REQUESTS = {requests}\nUSERS = {users}\n" + CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    marker = [l for l in proc.stdout.splitlines() if l.startswith("@@LAYOUT@@")]
+    if not marker:
+        print(proc.stdout[-4000:], proc.stderr[-4000:])
+        raise SystemExit("[layout] child process failed")
+    return json.loads(marker[-1][len("@@LAYOUT@@"):])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--users", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':<10} {'client':<10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for cached in (False, True):
+        result = run_mode(cached, args.requests, args.users)
+        for client, times in result.items():
+            mean, p50, p95 = _summary(times)
+            print(f"{'cached' if cached else 'rebuild':<10} {client:<10} {mean:9.3f} {p50:9.3f} {p95:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
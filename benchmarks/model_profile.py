@@ -0,0 +1,107 @@
+# benchmarks/model_profile.py
+"""
+Build the latency/accuracy profile used by the "auto" Chronos choice.
+
+    python -m benchmarks.model_profile                 # all variants, write <CACHE_DIR>/chronos_profile.json
+    python -m benchmarks.model_profile --if-stale      # cron-friendly: only rebuild when stale
+    python -m benchmarks.model_profile --variants amazon/chronos-bolt-tiny amazon/chronos-t5-tiny
+
+For every variant the command runs forecast_with_chronos over a small grid of
+(series count, history length, horizon) on the bundled data, fits
+latency = load + n * (a + b * history + c * horizon) by least squares, and
+measures WQL on a holdout of each bundled dataset.
+"""
+import argparse
+import datetime
+import platform
+
+import numpy as np
+
+from app.chronos_model import forecast_with_chronos
+from app.deadline import Deadline
+from app.model_selection import DEFAULT_PROFILE, is_stale, load_profile, profile_path, save_profile
+from benchmarks.common import holdout_split, iter_datasets, load_dataset, replicate_series, timed, weighted_quantile_loss
+
+GRID_SERIES = (1, 8, 32)
+GRID_HISTORY = (64, 200)
+GRID_HORIZON = (7, 14)
+LATENCY_DATASET = "sample_forecasting_dataset.csv"
+ACCURACY_HORIZON = 7
+
+
+def _run(df, model, horizon):
+    return forecast_with_chronos(
+        df, id_col="item_id", timestamp_col="timestamp", target_col="target",
+        prediction_length=horizon, chronos_model=model,
+        deadline=Deadline(None), short_series_length=0,
+    )
+
+
+def profile_variant(model: str) -> dict:
+    base = load_dataset(LATENCY_DATASET)
+    rows, times = [], []
+    for n in GRID_SERIES:
+        for history in GRID_HISTORY:
+            for horizon in GRID_HORIZON:
+                df = replicate_series(base, n, history)
+                (pred, _), seconds = timed(_run, df, model, horizon)
+                if pred.empty:
+                    continue
+                rows.append([1.0, n, n * history, n * horizon])
+                times.append(seconds)
+                print(f"  {model} n={n} history={history} horizon={horizon}: {seconds:.2f}s")
+    if not rows:
+        raise RuntimeError(f"{model}: every benchmark run failed")
+    coef, *_ = np.linalg.lstsq(np.asarray(rows), np.asarray(times), rcond=None)
+    coef = np.clip(coef, 0.0, None)
+
+    scores = []
+    for name, df in iter_datasets():
+        train, test = holdout_split(df, ACCURACY_HORIZON)
+        pred, _ = _run(train, model, ACCURACY_HORIZON)
+        if not pred.empty:
+            scores.append(weighted_quantile_loss(test, pred))
+            print(f"  {model} {name}: WQL={scores[-1]:.4f}")
+
+    return {
+        "load_s": float(coef[0]),
+        "per_series_s": float(coef[1]),
+        "per_context_s": float(coef[2]),
+        "per_step_s": float(coef[3]),
+        "wql": float(np.nanmean(scores)) if scores else None,
+        "runs": len(times),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", nargs="*", default=list(DEFAULT_PROFILE["variants"]))
+    parser.add_argument("--output", default=None, help="default: CHRONOS_PROFILE_PATH or <CACHE_DIR>/chronos_profile.json")
+    parser.add_argument("--if-stale", action="store_true", help="do nothing if the stored profile is fresh")
+    args = parser.parse_args(argv)
+    args.output = args.output or profile_path()
+
+    if args.if_stale and not is_stale(load_profile(args.output)):
+        print(f"[profile] {args.output} is fresh, nothing to do")
+        return
+
+    variants = {}
+    for model in args.variants:
+        print(f"[profile] benchmarking {model}")
+        try:
+            variants[model] = profile_variant(model)
+        except Exception as e:
+            print(f"[profile] {model} skipped: {e}")
+    if not variants:
+        raise SystemExit("[profile] no variant could be benchmarked")
+
+    profile = {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "variants": variants,
+    }
+    print(f"[profile] written to {save_profile(profile, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/precision_report.py
+"""
+Accuracy-vs-latency report for the Chronos inference precisions (CPU).
+
+    python -m benchmarks.precision_report
+    python -m benchmarks.precision_report --variants amazon/chronos-bolt-base amazon/chronos-t5-base --repeats 5
+
+For every variant x precision (fp32 / bf16 / int8) it loads the pipeline
+(load time, RSS growth), forecasts the holdout of every bundled dataset
+(median latency, WQL over the full quantile grid) and reports the drift of
+the median against fp32. The last lines suggest a default per variant: the
+fastest precision whose WQL stays within --tolerance of fp32, as a
+CHRONOS_PRECISION_MAP value.
+"""
+import argparse
+import gc
+
+import numpy as np
+import pandas as pd
+
+from app import chronos_pipeline
+from app.deadline import Deadline
+from app.model_selection import DEFAULT_PROFILE
+from app.quantiles import DEFAULT_QUANTILE_LEVELS, quantile_column
+from benchmarks.common import holdout_split, iter_datasets, percentile, timed, weighted_quantile_loss
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * (4096 / 2 ** 20)
+    except OSError:
+        return float("nan")
+
+
+def _evaluate(model, precision, datasets, horizon, repeats):
+    chronos_pipeline._pipeline_cache.clear()
+    gc.collect()
+    rss_before = _rss_mb()
+    _, load_s = timed(chronos_pipeline.load_pipeline, model, precision=precision)
+    rss_mb = _rss_mb() - rss_before
+
+    grid = {quantile_column(q): q for q in DEFAULT_QUANTILE_LEVELS}
+    seconds, scores, medians = [], [], []
+    for train, test in datasets:
+        for _ in range(repeats):
+            (pred, _), t = timed(
+                chronos_pipeline.forecast_quantiles, train, "item_id", "timestamp", "target",
+                horizon, model, deadline=Deadline(None), precision=precision,
+            )
+            seconds.append(t)
+        scores.append(weighted_quantile_loss(test, pred, grid))
+        medians.append(pred["p50"].to_numpy(dtype=float))
+    return {
+        "load_s": load_s,
+        "rss_mb": rss_mb,
+        "median_s": percentile(seconds, 50),
+        "p95_s": percentile(seconds, 95),
+        "wql": float(np.nanmean(scores)),
+        "medians": np.concatenate(medians),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", nargs="*", default=list(DEFAULT_PROFILE["variants"]))
+    parser.add_argument("--precisions", nargs="*", default=list(chronos_pipeline.PRECISIONS))
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.02, help="allowed relative WQL increase vs fp32")
+    args = parser.parse_args(argv)
+
+    datasets = [holdout_split(df, args.horizon) for _, df in iter_datasets()]
+    rows, suggestion = [], {}
+    for model in args.variants:
+        results = {}
+        for precision in args.precisions:
+            try:
+                results[precision] = _evaluate(model, precision, datasets, args.horizon, args.repeats)
+            except Exception as e:
+                print(f"[precision] {model} {precision} skipped: {e}")
+        base = results.get("fp32")
+        for precision, r in results.items():
+            drift = float(np.mean(np.abs(r["medians"] - base["medians"]))) if base else float("nan")
+            rows.append({"model": model, "precision": precision, **{k: v for k, v in r.items() if k != "medians"},
+                         "median_drift": drift})
+        if base:
+            ok = [p for p, r in results.items() if r["wql"] <= base["wql"] * (1 + args.tolerance)]
+            suggestion[model] = min(ok, key=lambda p: results[p]["median_s"])
+
+    report = pd.DataFrame(rows)
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        print(report.round(4).to_string(index=False))
+    if suggestion:
+        print("\nSuggested defaults:")
+        print("CHRONOS_PRECISION_MAP=" + ",".join(f"{m}={p}" for m, p in suggestion.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/prefork_memory.py
+"""
+Compare per-worker memory of spawned vs pre-forked inference pools.
+
+    python -m benchmarks.prefork_memory
+    python -m benchmarks.prefork_memory --model amazon/chronos-bolt-small --workers 4
+
+Each mode starts an InferencePool, runs one forecast per worker on a bundled
+dataset (so every worker has the model in use), then prints RSS / PSS /
+shared / private MB per process. PSS summed over the pool is the real
+footprint; with fork it should grow far less than linearly with workers.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from app.worker_pool import InferencePool, Topology
+from benchmarks.common import load_dataset
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="amazon/chronos-t5-base")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--dataset", default="sample_forecasting_dataset.csv")
+    args = parser.parse_args(argv)
+
+    df = load_dataset(args.dataset)
+    kwargs = dict(id_col="item_id", timestamp_col="timestamp", target_col="target",
+                  prediction_length=7, chronos_model=args.model, short_series_length=0)
+    rows = []
+    for mode in ("spawn", "fork"):
+        topology = Topology(workers=args.workers, start_method=mode,
+                            preload=[args.model] if mode == "fork" else [])
+        pool = InferencePool(topology)
+        try:
+            with ThreadPoolExecutor(max_workers=args.workers) as callers:
+                list(callers.map(lambda _: pool.forecast(df, **kwargs), range(args.workers)))
+            for row in pool.memory_report():
+                rows.append(dict(row, mode=mode))
+        finally:
+            pool.shutdown()
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    totals = report.groupby("mode")[["rss_mb", "pss_mb"]].sum()
+    print("\nPool totals (parent + workers):")
+    print(totals.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/startup_profile.py
+"""
+Startup-time profile of the app: import time per module and time per init step.
+
+    python -m benchmarks.startup_profile
+    python -m benchmarks.startup_profile --top 40 --warmup
+
+Runs `python -X importtime` in a fresh interpreter that builds the app with
+app_factory.create_app() and requests the login page through the Flask test
+client, then prints:
+  - the slowest imports (cumulative, top-level packages and all modules),
+  - the duration of every create_app step (app_factory.STEP_TIMINGS),
+  - time until the first /login response.
+With --warmup the background warm-up is run to completion too, to show what
+it costs off the request path.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# not benchmarks.common: this command must not import numpy/pandas itself
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import app_factory
+from config import get_config
+app = app_factory.create_app(get_config(PROFILE))
+status = app.test_client().get("/login").status_code
+ready = time.perf_counter() - t0
+out = {"steps": app_factory.STEP_TIMINGS, "ready_s": ready, "login_status": status}
+if WARMUP:
+    from app import warmup
+    thread = warmup.start()
+    if thread is not None:
+        thread.join()
+    out["warmup"] = warmup.timings
+print("@@STARTUP@@" + json.dumps(out))
+"""
+
+
+def parse_importtime(stderr: str):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--warmup", action="store_true")
+    parser.add_argument("--profile", default="benchmark", help="config profile (config.CONFIGS)")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, FLASK_DEBUG="0", INFERENCE_WARMUP="1" if args.warmup else "0")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"WARMUP = {args.warmup}\nPROFILE = {args.profile!r}\n" + CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    marker = [l for l in proc.stdout.splitlines() if l.startswith("@@STARTUP@@")]
+    if not marker:
+        print(proc.stdout[-4000:], proc.stderr[-4000:])
+        raise SystemExit("[startup] child process failed")
+    result = json.loads(marker[-1][len("@@STARTUP@@"):])
+    imports = parse_importtime(proc.stderr)
+
+    top_level = sorted((r for r in imports if r[3] == 0), key=lambda r: -r[2])
+    print(f"Top-level imports by cumulative time (top {args.top}):")
+    for name, _, cum, _ in top_level[: args.top]:
+        print(f"  {cum / 1000:9.1f} ms  {name}")
+    print(f"\nModules by self time (top {args.top}):")
+    for name, self_us, _, _ in sorted(imports, key=lambda r: -r[1])[: args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {name}")
+    heavy = [r[0] for r in imports if r[0].split(".")[0] in ("torch", "autogluon", "transformers", "gluonts")]
+    print(f"\nML stack imported at startup: {'YES (' + str(len(heavy)) + ' modules)' if heavy else 'no'}")
+
+    print("\ncreate_app steps:")
+    for step, seconds in result["steps"].items():
+        print(f"  {seconds * 1000:9.1f} ms  {step}")
+    print(f"\nFirst /login response (HTTP {result['login_status']}) after {result['ready_s']:.2f}s")
+    if args.warmup:
+        print("\nBackground warm-up:")
+        for step, seconds in result.get("warmup", {}).items():
+            print(f"  {seconds * 1000:9.1f} ms  {step}")
+
+
+if __name__ == "__main__":
+    main()
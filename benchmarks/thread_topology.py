@@ -0,0 +1,89 @@
+# benchmarks/thread_topology.py
+"""
+Sweep inference thread/process topologies on the bundled datasets.
+
+    python -m benchmarks.thread_topology
+    python -m benchmarks.thread_topology --workers 1 2 4 --intra 1 2 4 --inter 1 --requests 48
+
+For every (workers, intra-op, inter-op, affinity) combination an InferencePool
+is started, warmed up (one request per worker, not timed), then --requests
+forecasts are submitted concurrently from --clients threads, round-robin over
+the bundled datasets. Prints throughput and latency per configuration and the
+best configuration by throughput and by p95 latency. Use the winner for
+INFERENCE_WORKERS / INFERENCE_INTRA_OP_THREADS / INFERENCE_INTER_OP_THREADS /
+INFERENCE_CPU_AFFINITY.
+"""
+import argparse
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from app.worker_pool import InferencePool, Topology, _available_cores
+from benchmarks.common import iter_datasets, percentile, timed
+
+
+def _sweep_one(topology, datasets, args):
+    pool = InferencePool(topology)
+    kwargs = dict(id_col="item_id", timestamp_col="timestamp", target_col="target",
+                  prediction_length=args.horizon, chronos_model=args.model, short_series_length=0)
+    try:
+        with ThreadPoolExecutor(max_workers=topology.workers) as warm:
+            list(warm.map(lambda df: pool.forecast(df, **kwargs), datasets[:1] * topology.workers))
+
+        def one(i):
+            (_, logs), seconds = timed(pool.forecast, datasets[i % len(datasets)], **kwargs)
+            return seconds
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as clients:
+            latencies = list(clients.map(one, range(args.requests)))
+        wall = time.perf_counter() - start
+    finally:
+        pool.shutdown()
+    return {
+        "workers": topology.workers,
+        "intra": topology.intra_op_threads,
+        "inter": topology.inter_op_threads,
+        "affinity": topology.cpu_affinity,
+        "throughput_rps": args.requests / wall,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+    }
+
+
+def main(argv=None):
+    cores = len(_available_cores())
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="amazon/chronos-bolt-tiny")
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4])
+    parser.add_argument("--intra", type=int, nargs="*", default=sorted({1, 2, 4, cores}))
+    parser.add_argument("--inter", type=int, nargs="*", default=[1])
+    parser.add_argument("--affinity", choices=["on", "off", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent callers")
+    args = parser.parse_args(argv)
+
+    datasets = [df for _, df in iter_datasets()]
+    affinity = {"on": [True], "off": [False], "both": [False, True]}[args.affinity]
+    rows = []
+    for workers, intra, inter, pin in itertools.product(args.workers, args.intra, args.inter, affinity):
+        if workers * intra > cores * 2:
+            continue   # hopelessly oversubscribed
+        topology = Topology(workers=workers, intra_op_threads=intra, inter_op_threads=inter, cpu_affinity=pin)
+        row = _sweep_one(topology, datasets, args)
+        rows.append(row)
+        print(f"[topology] {row}")
+
+    report = pd.DataFrame(rows)
+    print(report.round(4).to_string(index=False))
+    best_tp = report.loc[report["throughput_rps"].idxmax()]
+    best_p95 = report.loc[report["p95_s"].idxmin()]
+    print(f"\nBest throughput: {best_tp.to_dict()}")
+    print(f"Best p95 latency: {best_p95.to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# config.py
+"""
+Config profiles untuk run.py (development) dan wsgi.py (production).
+
+Pilih profil lewat APP_ENV=development|production (default: development).
+  development - Flask debug + reloader, Dash dev tools / hot reload / dev bundles
+  production  - tanpa debug, bundle Dash minified, dev tools & props check mati,
+                cookie Secure, graceful drain forecast yang sedang berjalan
+  benchmark   - production tanpa warm-up / pool, database sqlite sementara
+                (fixture benchmark & load test)
+
+Semua resource di-set eksplisit di sini (database, cache, model registry,
+artefak predictor, topologi worker inference) dan diterapkan oleh
+app_factory.create_app(config); default-nya tetap dari environment.
+"""
+import os
+import tempfile
+
+from app.deadline import DEFAULT_TIMEOUT
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, "1" if default else "0") in ("1", "true", "True")
+
+
+class Config:
+    NAME = "base"
+    DEBUG = False
+    # Dash dev tools (UI error overlay, props check, hot reload, unminified bundles)
+    DASH_DEV_TOOLS = False
+    DASH_PROPS_CHECK = False
+    DASH_HOT_RELOAD = False
+    DASH_SERVE_DEV_BUNDLES = False
+    SECRET_KEY = os.environ.get("SECRET_KEY")
+    SESSION_COOKIE_SAMESITE = "Lax"
+    SESSION_COOKIE_SECURE = False
+    # graceful shutdown: wait this long for in-flight forecasts, cancel them after DRAIN_CANCEL_AFTER
+    # (paling lambat DRAIN_TIMEOUT - app.deadline.DRAIN_GRACE, supaya sempat kembali dengan hasil parsial)
+    DRAIN_TIMEOUT = float(os.environ.get("DRAIN_TIMEOUT", DEFAULT_TIMEOUT))
+    DRAIN_CANCEL_AFTER = float(os.environ.get("DRAIN_CANCEL_AFTER", 30))
+
+    # resources
+    DATABASE_URL = os.environ.get("AUTH_DATABASE_URL", "sqlite:///./auth_users.db")
+    CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(ROOT, ".cache"))
+    MODEL_REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", os.path.join(ROOT, "models", "registry"))
+    # model yang belum di-fetch ke registry -> error; 1 = boleh download dari hub saat request
+    MODEL_REGISTRY_ALLOW_HUB = _env_bool("MODEL_REGISTRY_ALLOW_HUB", False)
+    PREDICTOR_DIR = os.environ.get("PREDICTOR_DIR", os.path.join(ROOT, "AutogluonModels"))
+    # app.worker_pool.Topology; None = dari env INFERENCE_*
+    INFERENCE_TOPOLOGY = None
+    INFERENCE_WARMUP = _env_bool("INFERENCE_WARMUP", True)
+    # layout Dash (shell + sidebar) di-memo per user/role; 0 = bangun ulang tiap request
+    DASH_LAYOUT_CACHE = _env_bool("DASH_LAYOUT_CACHE", True)
+    # forecast di dashboard sebagai background callback (dashboard/jobs.py); 0 = jalan di request
+    DASH_BACKGROUND = _env_bool("DASH_BACKGROUND", True)
+    # theme / icons harus ada di dashboard/vendor (dashboard/static_assets.py); 0 = fallback ke CDN
+    STATIC_VENDOR_REQUIRED = False
+    # buat tabel saat app dibuat (dev/benchmark); production pakai create_admin.py / migrasi
+    INIT_DB = False
+
+
+class DevelopmentConfig(Config):
+    NAME = "development"
+    DEBUG = _env_bool("FLASK_DEBUG", True)
+    DASH_DEV_TOOLS = DEBUG
+    DASH_PROPS_CHECK = DEBUG
+    DASH_HOT_RELOAD = DEBUG
+    DASH_SERVE_DEV_BUNDLES = DEBUG
+
+
+class ProductionConfig(Config):
+    NAME = "production"
+    SESSION_COOKIE_SECURE = _env_bool("SESSION_COOKIE_SECURE", True)
+    STATIC_VENDOR_REQUIRED = _env_bool("STATIC_VENDOR_REQUIRED", True)
+
+
+class BenchmarkConfig(ProductionConfig):
+    NAME = "benchmark"
+    SECRET_KEY = "benchmark"
+    SESSION_COOKIE_SECURE = False
+    DATABASE_URL = "sqlite:///" + os.path.join(tempfile.gettempdir(), "forecast_benchmark.db")
+    CACHE_DIR = os.path.join(tempfile.gettempdir(), "forecast_benchmark_cache")
+    INFERENCE_WARMUP = False
+    DASH_BACKGROUND = False
+    STATIC_VENDOR_REQUIRED = False
+    INIT_DB = True
+
+
+CONFIGS = {"development": DevelopmentConfig, "production": ProductionConfig, "benchmark": BenchmarkConfig}
+
+
+def get_config(name: str = None):
+    name = name or os.environ.get("APP_ENV", "development")
+    try:
+        return CONFIGS[name]
+    except KeyError:
+        raise ValueError(f"Unknown APP_ENV {name!r}, expected one of {list(CONFIGS)}")
@@ -1,4 +1,5 @@
 # dashboard/app.py (UPDATED)
+import functools
 import os
 import dash
 from dash import dcc, html, Input, Output
@@ -6,12 +7,24 @@ import dash_bootstrap_components as dbc
 import pprint
 
 # --- Theme + icons ---
-BOOTSTRAP_THEME = dbc.themes.FLATLY
-BOOTSTRAP_ICONS = "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.5/font/bootstrap-icons.css"
+# Flatly + Bootstrap Icons di-vendor di dashboard/vendor dan disajikan lokal
+# (hash di nama file, cache 1 tahun, gzip/brotli), lihat dashboard/static_assets.py
 
 # shared in-memory storage (dikembalikan/dioper ke callbacks module jika butuh)
 uploaded_df = {}
 
+# jumlah layout (per user/role) yang di-memo, lihat serve_layout()
+LAYOUT_CACHE_SIZE = int(os.environ.get("DASH_LAYOUT_CACHE_SIZE", 256))
+
+
+def _user_key():
+    """(username, role) dari current_user, None kalau belum login; kunci memo layout."""
+    from flask_login import current_user
+    if not getattr(current_user, "is_authenticated", False):
+        return None
+    name = getattr(current_user, "username", None) or getattr(current_user, "name", None) or ""
+    return name, getattr(current_user, "role", None)
+
 # ---------------------------------------------------------------------
 # Helper: duplicate-check (diagnostic) - panggil setelah Dash memuat pages
 # ---------------------------------------------------------------------
@@ -46,13 +59,25 @@ def create_dash_app(server):
         # If folder missing, tell user what to do (dash will otherwise raise later).
         raise FileNotFoundError(f"Pages folder not found: {pages_folder}. Create directory dashboard/pages with your page modules.")
 
+    # background callbacks (forecast run) lewat diskcache di CACHE_DIR, dipakai bersama semua worker
+    from dashboard import jobs, static_assets
+    profile = server.config.get("APP_PROFILE")
+    cache_dir = server.config.get("CACHE_DIR") or os.path.join(os.path.dirname(this_dir), ".cache")
+    manager = jobs.create_manager(cache_dir, enabled=getattr(profile, "DASH_BACKGROUND", True))
+
+    # theme, icons dan assets lokal: dibangun (hash + kompresi) saat startup, disajikan di /static/
+    static_assets.init_app(server, cache_dir, require_vendor=getattr(profile, "STATIC_VENDOR_REQUIRED", False))
+
     app = dash.Dash(
         __name__,
         server=server,
-        external_stylesheets=[BOOTSTRAP_THEME, BOOTSTRAP_ICONS],
+        external_stylesheets=static_assets.stylesheets(),
+        external_scripts=static_assets.scripts(),
+        assets_ignore=r"\.(css|js)$",           # css/js dari static_assets (nama ber-hash)
         use_pages=True,
         pages_folder=pages_folder,                # <- explicitly point to dashboard/pages
         suppress_callback_exceptions=True,
+        background_callback_manager=manager,
     )
     app.title = "Zero-Shot Probabilistic Forecasting"
 
@@ -61,17 +86,10 @@ def create_dash_app(server):
     _check_duplicate_page_paths_or_modules()
 
     # -----------------------------------------------------------------
-    # Helper: build sidebar (called per-request so current_user is present)
+    # Sidebar menu: static (from dash.page_registry), built once
     # -----------------------------------------------------------------
-    def build_sidebar():
-        """
-        Build sidebar: menu (from dash.page_registry) + bottom area:
-        - shows "Signed in as ..." when authenticated
-        - shows a visible Logout link styled as a red button (NavLink with btn-danger)
-        This approach avoids theme/button rendering issues that made the button invisible.
-        """
-        from flask_login import current_user
-
+    @functools.lru_cache(maxsize=1)
+    def build_menu():
         nav_items = []
         pages = list(dash.page_registry.values())
         pages = sorted(pages, key=lambda p: p.get("order", 99))
@@ -89,7 +107,7 @@ def create_dash_app(server):
             )
 
         # Menu: make it flexible and scrollable
-        menu_div = html.Div(
+        return html.Div(
             [
                 html.Div(html.H5("Menu", className="m-0"), className="p-3 border-bottom"),
                 dbc.Nav(nav_items, vertical=True, pills=True, className="p-3"),
@@ -103,10 +121,19 @@ def create_dash_app(server):
             },
         )
 
-        # Bottom area: user info + logout link styled as btn-danger (anchor)
+    # -----------------------------------------------------------------
+    # Sidebar footer: user info + logout (the only per-user part)
+    # -----------------------------------------------------------------
+    def build_footer(user_key):
+        """
+        Bottom area for `user_key` ((username, role) or None when anonymous):
+        - shows "Signed in as ..." when authenticated
+        - shows a visible Logout link styled as a red button (NavLink with btn-danger)
+        This approach avoids theme/button rendering issues that made the button invisible.
+        """
         bottom_children = []
-        if getattr(current_user, "is_authenticated", False):
-            display_name = getattr(current_user, "username", None) or getattr(current_user, "name", None) or ""
+        if user_key is not None:
+            display_name = user_key[0]
 
             bottom_children.append(
                 html.Div(
@@ -125,52 +152,31 @@ def create_dash_app(server):
                     html.Div(f"Signed in as {display_name}", style={"padding": "8px 12px", "fontSize": "13px", "color": "#333"})
                 )
 
-            # Use a NavLink (anchor) styled as a Bootstrap danger button so it's always visible
-            # bottom_children.append(
-            #     html.Div(
-            #         dbc.NavLink(
-            #             [html.I(className="bi bi-box-arrow-right me-2"), "Logout"],
-            #             href="#",
-            #             id="logout-btn",
-            #             className="btn btn-danger w-100 text-red",
-            #         ),
-            #         style={"padding": "12px"}
-            #     )
-            # )
-
-        logout_block = html.Div(bottom_children)
-
-        sidebar = html.Div(
+        return html.Div(bottom_children)
+
+    def build_sidebar(user_key):
+        return html.Div(
             [
                 html.Div(
-                    menu_div,
+                    build_menu(),
                     className="sidebar-menu",
                 ),
                 html.Div(
-                    logout_block,
+                    build_footer(user_key),
                     className="sidebar-footer",
                 ),
             ],
             className="sidebar fixed-sidebar"
         )
 
-
-
-        return sidebar
-
-
-
-
-
-    # -----------------------------------------------------------------
-    # Serve layout as a callable so build_sidebar() runs per-request
-    # -----------------------------------------------------------------
-    def serve_layout():
-        sidebar = build_sidebar()   # executed in request context
+    def build_layout(user_key):
+        sidebar = build_sidebar(user_key)
 
         return html.Div(
             [
                 dcc.Store(id='forecast-memory', storage_type='local'),
+                dcc.Store(id='forecast-cancel-signal', storage_type='memory'),
+                dcc.Store(id='forecast-owner', storage_type='memory'),
                 dbc.Navbar(
                     dbc.Container(
                         [
@@ -209,8 +215,23 @@ def create_dash_app(server):
             ]
         )
 
+    # layout lengkap di-memo per (username, role); shell + menu tidak dibangun ulang tiap request
+    cached_layout = functools.lru_cache(maxsize=LAYOUT_CACHE_SIZE)(build_layout)
+    layout_cache = getattr(server.config.get("APP_PROFILE"), "DASH_LAYOUT_CACHE", True)
+
+    # -----------------------------------------------------------------
+    # Serve layout as a callable: only the user key is resolved per-request
+    # -----------------------------------------------------------------
+    def serve_layout():
+        user_key = _user_key()   # executed in request context
+        if not layout_cache:
+            build_menu.cache_clear()
+            return build_layout(user_key)
+        return cached_layout(user_key)
+
     # set layout as callable so it's evaluated per-request (not at import time)
     app.layout = serve_layout
+    app.layout_cache_info = cached_layout.cache_info
 
     # -----------------------------------------------------------------
     # UI toggle callback: sembunyikan sidebar/topbar untuk root/login page
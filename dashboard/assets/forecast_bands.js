@@ -0,0 +1,49 @@
+// assets/forecast_bands.js
+// Client-side switch of the interval band (P10–P90, P5–P95, ...) on a forecast figure.
+// The stored forecast already holds the whole quantile grid (p05 ... p95), so the
+// band traces (meta 'band-upper' / 'band-lower') are rewritten in the browser
+// without another server round trip or model call.
+(function(){
+  var BANDS = {
+    '80': ['p10', 'p90'],
+    '90': ['p05', 'p95'],
+    '60': ['p20', 'p80'],
+    '50': ['p25', 'p75']
+  };
+
+  function dayKey(v){
+    return v === null || v === undefined ? '' : String(v).slice(0, 10);
+  }
+
+  function applyBand(band, storedData, figure){
+    if (!figure || !figure.data || !storedData || !storedData.length) {
+      return window.dash_clientside.no_update;
+    }
+    var cols = BANDS[band] || BANDS['80'];
+    var byDay = {};
+    storedData.forEach(function(r){ byDay[r.timestamp_str || dayKey(r.timestamp)] = r; });
+
+    var data = figure.data.map(function(trace){
+      var role = trace.meta;
+      if (role !== 'band-upper' && role !== 'band-lower') return trace;
+      var col = role === 'band-upper' ? cols[1] : cols[0];
+      var y = (trace.x || []).map(function(x){
+        var r = byDay[dayKey(x)];
+        return r && r[col] !== undefined ? r[col] : null;
+      });
+      var out = Object.assign({}, trace, {y: y});
+      if (role === 'band-lower') {
+        out.name = cols[0].toUpperCase() + '–' + cols[1].toUpperCase() + ' Interval';
+      }
+      return out;
+    });
+    return Object.assign({}, figure, {data: data});
+  }
+
+  window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    forecast_bands: {
+      applyBand: applyBand,
+      columns: function(band){ return BANDS[band] || BANDS['80']; }
+    }
+  });
+})();
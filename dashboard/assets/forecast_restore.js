@@ -0,0 +1,123 @@
+// assets/forecast_restore.js
+// Redraw a stored forecast in the browser: the table and chart are rebuilt from
+// forecast-memory / forecast-history (already in localStorage) when the page is
+// opened or reloaded, without a server round trip. Only the paged result table
+// asks the server for rows (page_forecast_table) when the full forecast is stored
+// there (metadata.forecast_id).
+// The figure mirrors dashboard/figures.py forecast_figure(): trace order
+// history, band upper, band lower, mean (+ real data on the compare page).
+(function(){
+  var HISTORY_COLOR = 'rgba(90,90,90,0.85)';
+  var BAND_FILL = 'rgba(33,150,243,0.16)';
+  var TABLE_STYLE = {
+    style_table: {overflowX: 'auto'},
+    style_cell: {textAlign: 'left', padding: '6px'},
+    style_header: {backgroundColor: '#2c3e50', color: 'white', fontWeight: 'bold'},
+    style_as_list_view: true
+  };
+
+  function component(namespace, type, props){
+    return {namespace: namespace, type: type, props: props};
+  }
+
+  function sortedRows(storedData){
+    return storedData.slice().sort(function(a, b){
+      return String(a.timestamp) < String(b.timestamp) ? -1 : (String(a.timestamp) > String(b.timestamp) ? 1 : 0);
+    });
+  }
+
+  function column(rows, key){
+    return rows.map(function(r){ return r[key] === undefined ? null : r[key]; });
+  }
+
+  // figure: forecast rows (+ optional history {x, y}); `template` is reused from the current figure
+  function buildFigure(storedData, band, history, template, opts){
+    var rows = sortedRows(storedData || []);
+    var cols = window.dash_clientside.forecast_bands.columns(band);
+    var x = column(rows, 'timestamp');
+    var hasBand = rows.length && rows[0][cols[0]] !== undefined && rows[0][cols[1]] !== undefined;
+    var data = [
+      {type: 'scattergl', x: (history && history.x) || [], y: (history && history.y) || [], mode: 'lines',
+       name: 'History', meta: 'history', line: {color: HISTORY_COLOR, width: 1.5}},
+      {type: 'scattergl', x: hasBand ? x : [], y: hasBand ? column(rows, cols[1]) : [], meta: 'band-upper',
+       line: {color: 'rgba(0,0,0,0)'}, showlegend: false, hoverinfo: 'skip'},
+      {type: 'scattergl', x: hasBand ? x : [], y: hasBand ? column(rows, cols[0]) : [], meta: 'band-lower',
+       line: {color: 'rgba(0,0,0,0)'}, fill: 'tonexty', fillcolor: BAND_FILL,
+       name: cols[0].toUpperCase() + '–' + cols[1].toUpperCase() + ' Interval'},
+      {type: 'scattergl', x: x, y: column(rows, 'mean'), mode: 'lines+markers', name: 'Forecast (mean)',
+       line: {width: 3}, marker: {size: 6}}
+    ];
+    var layout = {
+      title: {text: opts.title}, xaxis: {title: {text: opts.xaxisTitle || 'Timestamp'}},
+      yaxis: {title: {text: opts.yaxisTitle || 'Forecast Value'}},
+      margin: {t: 40, l: 40, r: 24, b: 40}
+    };
+    if (opts.legendTitle) layout.legend = {title: {text: opts.legendTitle}};
+    if (template) layout.template = template;
+    return {data: data, layout: layout};
+  }
+
+  // page size the table had when the forecast ran (its horizon); forecast-memory holds one
+  // series, so its length is the horizon for forecasts stored before metadata.page_size
+  function pageSize(storedData, metadata){
+    return (metadata && metadata.page_size) || storedData.length || 10;
+  }
+
+  function resultTable(storedData, metadata){
+    var keys = Object.keys(storedData[0]);
+    var size = pageSize(storedData, metadata);
+    if (metadata && metadata.forecast_id) {
+      // full forecast lives on the server: rows come page by page from page_forecast_table
+      keys = keys.filter(function(k){ return k !== 'timestamp_str'; });
+      return component('dash_table', 'DataTable', Object.assign({
+        id: 'forecast-table', data: [], page_current: 0, page_size: size,
+        page_action: 'custom', sort_action: 'custom', sort_mode: 'multi', sort_by: [],
+        filter_action: 'custom', filter_query: '',
+        columns: keys.map(function(k){ return {name: k, id: k}; })
+      }, TABLE_STYLE));
+    }
+    return component('dash_table', 'DataTable', Object.assign({
+      data: storedData, page_size: size,
+      columns: keys.map(function(k){ return {name: k, id: k}; })
+    }, TABLE_STYLE));
+  }
+
+  // forecasting page: table + chart from forecast-memory / forecast-history
+  function restoreForecast(storedData, pathname, nIntervals, band, metadata, history, figure){
+    var template = figure && figure.layout ? figure.layout.template : undefined;
+    if (!storedData || !storedData.length) {
+      return ['', {data: [], layout: {template: template}}];
+    }
+    return [
+      resultTable(storedData, metadata),
+      buildFigure(storedData, band, history, template, {title: 'Restored Forecast'})
+    ];
+  }
+
+  // compare page: forecast chart (real data is added by add_real_data)
+  function compareChart(storedData, band, figure){
+    var template = figure && figure.layout ? figure.layout.template : undefined;
+    if (!storedData || !storedData.length) {
+      var alert = component('dash_html_components', 'Div', {
+        style: {color: 'orange'},
+        children: [
+          component('dash_html_components', 'I', {className: 'bi bi-exclamation-circle-fill me-2'}),
+          'Belum ada hasil forecasting tersimpan di browser.',
+          component('dash_html_components', 'Br', {}),
+          'Silakan buka menu Forecasting → jalankan Forecast → lalu kembali ke halaman Compare.'
+        ]
+      });
+      return [{data: [], layout: {template: template, title: {text: 'Forecast vs Real Data'}}}, alert];
+    }
+    return [
+      buildFigure(storedData, band, null, template, {
+        title: 'Forecast vs Real Data', xaxisTitle: 'Tanggal', yaxisTitle: 'Nilai', legendTitle: 'Legenda'
+      }),
+      null
+    ];
+  }
+
+  window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    forecast_restore: {restoreForecast: restoreForecast, compareChart: compareChart}
+  });
+})();
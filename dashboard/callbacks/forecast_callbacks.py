@@ -1,5 +1,5 @@
 # dashboard/callbacks/forecast_callbacks.py
-from dash import Input, Output, State, html, dcc
+from dash import Input, Output, State, html, dcc, ClientsideFunction
 from dash import dash_table
 from dash.exceptions import PreventUpdate
 import plotly.graph_objs as go
@@ -11,7 +11,13 @@ import dash
 
 from auth.models import get_db_session, ForecastResult, RealDataInput, get_user_by_username
 from flask_login import current_user
+from itsdangerous import BadSignature, URLSafeSerializer
 from dash.exceptions import PreventUpdate
+from app import deadline as deadlines
+from app.deadline import Deadline, DeadlineExceeded, DEFAULT_TIMEOUT
+from dashboard.figures import forecast_figure, relayout_range, zoom_history, downsample, history_payload, HISTORY_TRACE
+from dashboard import datastore, jobs
+from dashboard.tables import paged_table, query_frame
 
 
 def sanitize_df_for_chronos(df, timestamp_col=None, target_col=None, preview_rows=3):
@@ -78,7 +84,35 @@ def sanitize_df_for_chronos(df, timestamp_col=None, target_col=None, preview_row
 
 
 
+def _history_patch(history, x_range=None):
+    """Patch for the history trace (and x-axis) from a history window or a zoomed range."""
+    x, y = zoom_history(history, *x_range) if x_range else downsample(history['timestamp'], history['value'])
+    patched = dash.Patch()
+    patched['data'][HISTORY_TRACE]['x'] = [pd.Timestamp(v).isoformat() for v in x]
+    patched['data'][HISTORY_TRACE]['y'] = [float(v) for v in y]
+    return patched
+
+
+def _owner():
+    """Deadline owner of the signed-in user (their id), None without a request / login."""
+    try:
+        return current_user.get_id() if current_user.is_authenticated else None
+    except (RuntimeError, AttributeError):   # no request context (background job process)
+        return None
+
+
 def register_callbacks(app, uploaded_df):
+    # forecast-owner holds the user id signed with the app's SECRET_KEY: a browser can send
+    # its own token back, never forge another user's (background jobs have no login session)
+    owner_signer = URLSafeSerializer(app.server.config.get('SECRET_KEY') or '', salt='forecast-owner')
+
+    def verified_owner(token):
+        try:
+            return owner_signer.loads(token) if token else None
+        except BadSignature:
+            print("[deadline] forecast-owner token rejected (bad signature)")
+            return None
+
     @app.callback(
         [Output('select-columns', 'children'),
          Output('preview-data', 'children'),
@@ -96,7 +130,8 @@ def register_callbacks(app, uploaded_df):
             df = pd.read_csv(decoded)
         except Exception:
             return html.Div("[ERROR] Gagal membaca file CSV. Pastikan format benar.", style={'color': 'red'}), ""
-        uploaded_df['df'] = df
+        # full dataset stays on the server; the browser keeps only a handle
+        dataset_id = datastore.save_frame(df)
         columns = df.columns
         dropdowns = [
             html.Label('ID Column:'),
@@ -117,40 +152,62 @@ def register_callbacks(app, uploaded_df):
             style_header={'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
             style_as_list_view=True
         )
-        return dropdowns, preview_table, df.to_dict('records')
-
-    @app.callback(
-        [Output('forecast-log', 'children', allow_duplicate=True),
-         Output('forecast-result', 'children'),
-         Output('forecast-chart', 'figure'),
-         Output('forecast-memory', 'data'),
-         Output('forecast-metadata', 'data')],
-        Input('forecast-btn', 'n_clicks'),
-        State('id-col', 'value'),
-        State('timestamp-col', 'value'),
-        State('target-col', 'value'),
-        State('pred-len', 'value'),
-        State('chronos-model', 'value'),
-        State('upload-memory', 'data'),
-        State('upload-data', 'filename'),
-        prevent_initial_call=True
-    )
-    def probabilistic_forecast(n_clicks, id_col, timestamp_col, target_col, pred_len, chronos_model, upload_memory,filename):
+        handle = {'dataset_id': dataset_id, 'filename': filename, 'rows': len(df), 'columns': list(map(str, columns))}
+        return dropdowns, preview_table, handle
+
+    # background callback when a job manager is configured (dashboard/jobs.py)
+    background = jobs.manager() is not None
+    if background:
+        background_options = dict(
+            background=True,
+            manager=jobs.manager(),
+            progress=[Output('forecast-progress', 'value'), Output('forecast-progress', 'label')],
+            progress_default=[0, ""],
+            running=[
+                (Output('forecast-btn', 'disabled'), True, False),
+                (Output('forecast-cancel-btn', 'disabled'), False, True),
+                (Output('forecast-progress-box', 'style'), {'display': 'block'}, {'display': 'none'}),
+            ],
+            cancel=[Input('forecast-cancel-btn', 'n_clicks'), Input('url', 'pathname')],
+        )
+    else:
+        background_options = {}
+
+    def probabilistic_forecast(set_progress, n_clicks, id_col, timestamp_col, target_col, pred_len, chronos_model, upload_memory,filename, band, owner=None):
+        """
+        Run the forecast. As a background callback (dashboard/jobs.py) this runs in a job
+        process that waits on the shared inference pool: set_progress feeds the progress
+        bar from the pipeline stages, Cancel / navigating away terminates the job and
+        cancels the pool request through its owner (signed forecast-owner token).
+        Without a manager set_progress is None.
+        """
+        def failed(message):
+            return message, "", go.Figure(), dash.no_update, dash.no_update, dash.no_update
 
         if upload_memory is None:
-            return print("[DEBUG] probabilistic_forecast: upload_memory kosong — tidak ada data terunggah."), "", go.Figure(), None
+            print("[DEBUG] probabilistic_forecast: upload_memory kosong — tidak ada data terunggah.")
+            return failed(None)
         # else:
             # print(upload_memory)
         logger = logging.getLogger("dashboard.forecast")
         if n_clicks is None or n_clicks == 0:
-            return "Log belum ada, silakan klik Forecast.", "", go.Figure()
+            return failed("Log belum ada, silakan klik Forecast.")
+
+        report = jobs.progress_reporter(set_progress)
+        if report:
+            report("start")
 
         # basic validation
-        df = uploaded_df.get('df', None)
+        df = datastore.load_frame(datastore.dataset_handle(upload_memory))
         if df is None:
-            return html.Div("Data not loaded! Upload data terlebih dahulu.", style={'color': 'red'}), "", go.Figure()
+            return failed(html.Div("Data not loaded! Upload data terlebih dahulu.", style={'color': 'red'}))
         if not all([id_col, timestamp_col, target_col, pred_len, chronos_model]):
-            return html.Div("Kolom belum lengkap dipilih!", style={'color': 'red'}), "", go.Figure()
+            return failed(html.Div("Kolom belum lengkap dipilih!", style={'color': 'red'}))
+
+        # per-request deadline, owned by the current user so Cancel / navigating away can cancel it
+        # (a background job has no request context: the owner comes from the signed forecast-owner token)
+        deadline = Deadline(DEFAULT_TIMEOUT, owner=verified_owner(owner) if background else _owner(),
+                            on_stage=report)
 
         # defensive: make a copy to avoid mutating original uploaded_df
         try:
@@ -182,13 +239,16 @@ def register_callbacks(app, uploaded_df):
                 # convert arrays to lists if present
                 for c, _ in ndarray_cols:
                     df_input[c] = df_input[c].apply(lambda x: x.tolist() if isinstance(x, np.ndarray) else x)
+            deadline.check("sanitize")
+        except DeadlineExceeded as e:
+            return failed(html.Div(f"Forecast dibatalkan: {e}", style={'color': 'red'}))
         except Exception as e:
             logger.exception("[ERROR] Sanitization failed")
             tb = traceback.format_exc()
-            return html.Div(f"Sanitization Error: {str(e)}\n{tb}", style={'color': 'red'}), "", go.Figure()
+            return failed(html.Div(f"Sanitization Error: {str(e)}\n{tb}", style={'color': 'red'}))
 
         # build payload info for passing (not used in direct call, but useful for logs)
-        from app.chronos_model import forecast_with_chronos
+        from app.worker_pool import run_forecast
         payload_info = {
             'id_col': id_col,
             'timestamp_col': timestamp_col,
@@ -202,16 +262,29 @@ def register_callbacks(app, uploaded_df):
 
         # call forecast function (internal) and catch errors
         try:
-            df_pred, logs = forecast_with_chronos(
-                df_input,
-                id_col=id_col,
-                timestamp_col=timestamp_col,
-                target_col=target_col,
-                freq='D',
-                prediction_length=int(pred_len),
-                chronos_model=chronos_model,
-            )
+            with deadlines.track(deadline):
+                df_pred, logs = run_forecast(
+                    df_input,
+                    id_col=id_col,
+                    timestamp_col=timestamp_col,
+                    target_col=target_col,
+                    freq='D',
+                    prediction_length=int(pred_len),
+                    chronos_model=chronos_model,
+                    deadline=deadline,
+                )
             forecast_log = logs or ""
+            if getattr(df_pred, "attrs", {}).get("partial"):
+                missing = df_pred.attrs.get("missing_series", [])
+                forecast_log += f"\n[deadline] Hasil parsial: {len(missing)} series tidak sempat diproses."
+            engines = getattr(df_pred, "attrs", {}).get("engines") or {}
+            if engines:
+                counts = pd.Series(engines).value_counts().to_dict()
+                forecast_log += "\n[engine] " + ", ".join(f"{k}: {v} series" for k, v in counts.items())
+            # Chronos could not run (model not in the registry, predictor fit failed): say so, loudly
+            engine_error = getattr(df_pred, "attrs", {}).get("engine_error")
+            if engine_error:
+                forecast_log += f"\n[engine] Chronos tidak dipakai: {engine_error}"
             # result_df = df_pred.copy() if hasattr(df_pred, "copy") else pd.DataFrame(df_pred)
 
             try:
@@ -232,12 +305,17 @@ def register_callbacks(app, uploaded_df):
             tb = traceback.format_exc()
             # try to include logs variable if exists
             logs_preview = locals().get("logs", "")
-            return html.Div(f"Model Error: {str(e_model)}\n{logs_preview}\n\nTraceback:\n{tb}", style={'color': 'red'}), "", go.Figure()
+            return failed(html.Div(f"Model Error: {str(e_model)}\n{logs_preview}\n\nTraceback:\n{tb}", style={'color': 'red'}))
 
         # validate result_df
         if result_df is None or result_df.empty:
             logger.error("Empty result_df returned from model. logs: %s", forecast_log)
-            return html.Div("API Error: empty forecast result. Periksa log model.", style={'color': 'red'}), "", go.Figure()
+            return failed(html.Div("API Error: empty forecast result. Periksa log model.", style={'color': 'red'}))
+
+        # "auto": the variant differs per series (Chronos / statistical); store the per-series mix
+        if chronos_model == 'auto' and engines:
+            counts = pd.Series(engines).value_counts()
+            chronos_model = "auto: " + ", ".join(f"{k} ({v} series)" for k, v in counts.items())
 
         # normalize timestamp column
         try:
@@ -254,18 +332,6 @@ def register_callbacks(app, uploaded_df):
         except Exception:
             logger.exception("[ERROR] Failed to normalize timestamp in result_df")
 
-        # If the model returns an id column (e.g., 'item_id' or same as id_col), filter to first id for plotting
-        try:
-            id_column_candidates = [c for c in [id_col, 'item_id', 'id'] if c in result_df.columns]
-            if id_column_candidates:
-                filter_col = id_column_candidates[0]
-                unique_ids = result_df[filter_col].unique()
-                if len(unique_ids) > 1:
-                    logger.debug("Multiple series in result_df; selecting first id: %s", unique_ids[0])
-                result_df = result_df[result_df[filter_col] == unique_ids[0]]
-        except Exception:
-            logger.exception(" [ERROR]Failed to filter by id column")
-
         # Adjust quantiles / mean to be consistent
         try:
             if 'p10' in result_df.columns and 'p90' in result_df.columns:
@@ -278,41 +344,62 @@ def register_callbacks(app, uploaded_df):
         except Exception:
             logger.exception(" [ERROR] Failed to normalize quantiles/mean")
 
-        # store forecast in shared dict for later download/use
+        # every series goes to the server-side store; the result table pages over it
+        forecast_id = None
+        table_columns = [c for c in result_df.columns if c != 'timestamp_str']
+        try:
+            forecast_id = datastore.save_frame(result_df[table_columns], kind="forecast")
+        except Exception:
+            logger.exception("[ERROR] Failed to store forecast")
+
+        series_id = None
+        # If the model returns an id column (e.g., 'item_id' or same as id_col), filter to first id for plotting
         try:
-            uploaded_df['forecast'] = result_df.copy()
+            id_column_candidates = [c for c in [id_col, 'item_id', 'id'] if c in result_df.columns]
+            if id_column_candidates:
+                filter_col = id_column_candidates[0]
+                unique_ids = result_df[filter_col].unique()
+                if len(unique_ids) > 1:
+                    logger.debug("Multiple series in result_df; selecting first id: %s", unique_ids[0])
+                result_df = result_df[result_df[filter_col] == unique_ids[0]]
+                series_id = unique_ids[0]
         except Exception:
-            logger.exception("[ERROR] Failed to write forecast to uploaded_df['forecast']")
+            logger.exception(" [ERROR]Failed to filter by id column")
 
-        # Build DataTable for UI
+        # Build DataTable for UI: columns only, rows are paged from the stored forecast (all series)
         try:
-            result_table = dash_table.DataTable(
-                data=result_df.to_dict('records'),
-                columns=[{"name": i, "id": i} for i in result_df.columns],
-                page_size=max(1, int(pred_len)),
-                style_table={'overflowX': 'auto'}, style_cell={'textAlign': 'left', 'padding': '6px'},
-                style_header={'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
-                style_as_list_view=True
-            )
+            if forecast_id:
+                result_table = paged_table('forecast-table', table_columns, page_size=max(1, int(pred_len)))
+            else:
+                result_table = dash_table.DataTable(
+                    data=result_df.to_dict('records'),
+                    columns=[{"name": i, "id": i} for i in result_df.columns],
+                    page_size=max(1, int(pred_len)),
+                    style_table={'overflowX': 'auto'}, style_cell={'textAlign': 'left', 'padding': '6px'},
+                    style_header={'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
+                    style_as_list_view=True
+                )
         except Exception:
             logger.exception("[ERROR] Failed to build result_table")
             result_table = html.Div("Error building result table", style={'color': 'red'})
 
-        # Build figure
+        # Build figure (history of the plotted series + forecast, WebGL, LTTB-downsampled)
+        # history is windowed to the recent context; older ranges load on demand (load more / zoom)
+        metadata = {"model_name": chronos_model, "uploaded_filename": filename, "forecast_id": forecast_id,
+                    "dataset_id": datastore.dataset_handle(upload_memory), "id_col": id_col,
+                    "timestamp_col": timestamp_col, "target_col": target_col,
+                    "series_id": None if series_id is None else str(series_id),
+                    "history_points": datastore.history_points(pred_len), "engine_error": engine_error,
+                    # page size of the result table, restored with it (assets/forecast_restore.js)
+                    "page_size": max(1, int(pred_len))}
+        history = None
         try:
-            fig = go.Figure(layout={'template': 'plotly_white'})
-            if 'p90' in result_df.columns and 'p10' in result_df.columns:
-                fig.add_trace(go.Scatter(x=result_df['timestamp'], y=result_df['p90'],
-                                         line=dict(color='rgba(0,0,0,0)'), showlegend=False, hoverinfo='skip'))
-                fig.add_trace(go.Scatter(x=result_df['timestamp'], y=result_df['p10'],
-                                         line=dict(color='rgba(0,0,0,0)'), fill='tonexty',
-                                         fillcolor='rgba(33,150,243,0.16)', name='P10–P90 Interval'))
-            if 'mean' in result_df.columns:
-                fig.add_trace(go.Scatter(x=result_df['timestamp'], y=result_df['mean'],
-                                         mode='lines+markers', name='Forecast (mean)', line=dict(width=3), marker=dict(size=6)))
-            fig.update_layout(title=f"Probabilistic Forecast ({chronos_model})",
-                              xaxis_title="Timestamp", yaxis_title="Forecast Value",
-                              legend_title="Quantile", margin={'t': 40, 'l': 40, 'r': 24, 'b': 40})
+            history = datastore.series_history(metadata, metadata["history_points"])
+            # title: engine of the plotted series
+            plotted_engine = str(result_df['engine'].iloc[0]) if 'engine' in result_df.columns and not result_df.empty \
+                else chronos_model
+            fig = forecast_figure(result_df, band, title=f"Probabilistic Forecast ({plotted_engine})",
+                                  history=history, legend_title="Quantile")
         except Exception:
             logger.exception("[ERROR] Failed to build figure")
             fig = go.Figure()
@@ -324,10 +411,142 @@ def register_callbacks(app, uploaded_df):
         except Exception:
             short_log = str(forecast_log)
 
-        return short_log, result_table, fig, result_df.to_dict('records'),  {"model_name": chronos_model, "uploaded_filename": filename}
+        if engine_error:
+            short_log = [html.Strong(f"Chronos tidak dipakai ({engine_error}); hasil dari model statistik.",
+                                     style={'color': '#c0392b'}), "\n", short_log]
+
+        if report:
+            report("done")
+        return short_log, result_table, fig, result_df.to_dict('records'), metadata, history_payload(history)
+
+    app.callback(
+        [Output('forecast-log', 'children', allow_duplicate=True),
+         Output('forecast-result', 'children'),
+         Output('forecast-chart', 'figure'),
+         Output('forecast-memory', 'data'),
+         Output('forecast-metadata', 'data'),
+         Output('forecast-history', 'data')],
+        Input('forecast-btn', 'n_clicks'),
+        State('id-col', 'value'),
+        State('timestamp-col', 'value'),
+        State('target-col', 'value'),
+        State('pred-len', 'value'),
+        State('chronos-model', 'value'),
+        State('upload-memory', 'data'),
+        State('upload-data', 'filename'),
+        State('interval-band', 'value'),
+        State('forecast-owner', 'data'),
+        prevent_initial_call=True,
+        **background_options
+    )(probabilistic_forecast if background else
+      lambda *args: probabilistic_forecast(None, *args))
     
 
 
+    @app.callback(
+        Output('forecast-table', 'data'),
+        Output('forecast-table', 'page_count'),
+        Input('forecast-table', 'page_current'),
+        Input('forecast-table', 'page_size'),
+        Input('forecast-table', 'sort_by'),
+        Input('forecast-table', 'filter_query'),
+        State('forecast-metadata', 'data'),
+    )
+    def page_forecast_table(page_current, page_size, sort_by, filter_query, metadata):
+        """One page of the stored forecast (all series), sorted / filtered on the server."""
+        df = datastore.load_frame((metadata or {}).get('forecast_id'), kind="forecast")
+        if df is None:
+            raise PreventUpdate
+        return query_frame(df, page_current, page_size, sort_by, filter_query)
+
+    # switch the displayed interval band in the browser from the stored quantile grid
+    app.clientside_callback(
+        ClientsideFunction(namespace='forecast_bands', function_name='applyBand'),
+        Output('forecast-chart', 'figure', allow_duplicate=True),
+        Input('interval-band', 'value'),
+        State('forecast-memory', 'data'),
+        State('forecast-chart', 'figure'),
+        prevent_initial_call=True
+    )
+
+    @app.callback(
+        Output('forecast-chart', 'figure', allow_duplicate=True),
+        Input('forecast-chart', 'relayoutData'),
+        State('forecast-metadata', 'data'),
+        prevent_initial_call=True
+    )
+    def refetch_history_on_zoom(relayout_data, metadata):
+        """Zoom / pan: resend only the visible history range, at full resolution; reset: the recent window."""
+        x_range = relayout_range(relayout_data)
+        if x_range is False:
+            raise PreventUpdate
+        if x_range == (None, None):
+            history = datastore.series_history(metadata, (metadata or {}).get('history_points'))
+            x_range = None
+        else:
+            history = datastore.series_history(metadata)
+        if history is None or history.empty:
+            raise PreventUpdate
+        return _history_patch(history, x_range)
+
+    @app.callback(
+        Output('forecast-chart', 'figure', allow_duplicate=True),
+        Output('forecast-metadata', 'data', allow_duplicate=True),
+        Output('forecast-history', 'data', allow_duplicate=True),
+        Input('history-more', 'n_clicks'),
+        State('forecast-metadata', 'data'),
+        prevent_initial_call=True
+    )
+    def load_more_history(n_clicks, metadata):
+        """Double the history window (older observations) shown before the forecast."""
+        if not n_clicks or not metadata or not metadata.get('dataset_id'):
+            raise PreventUpdate
+        points = int(metadata.get('history_points') or datastore.HISTORY_MIN_POINTS) * 2
+        history = datastore.series_history(metadata, points)
+        if history is None or history.empty:
+            raise PreventUpdate
+        patched = _history_patch(history)
+        patched['layout']['xaxis']['autorange'] = True
+        return patched, dict(metadata, history_points=points), history_payload(history)
+
+    @app.callback(
+        Output('forecast-cancel-signal', 'data'),
+        Input('url', 'pathname'),
+        prevent_initial_call=True
+    )
+    def cancel_forecast_on_navigate(pathname):
+        """Cancel the user's in-flight forecast once they leave the forecasting page."""
+        if pathname == '/forecasting':
+            raise PreventUpdate
+        cancelled = deadlines.cancel_owner(_owner())
+        if not cancelled:
+            raise PreventUpdate
+        return {"pathname": pathname, "cancelled": cancelled}
+
+    @app.callback(
+        Output('forecast-cancel-signal', 'data', allow_duplicate=True),
+        Input('forecast-cancel-btn', 'n_clicks'),
+        prevent_initial_call=True
+    )
+    def cancel_forecast_on_click(n_clicks):
+        """
+        Cancel button: the background callback kills its job, this stops the request
+        in the inference pool (it would otherwise run on until its deadline).
+        """
+        if not n_clicks:
+            raise PreventUpdate
+        cancelled = deadlines.cancel_owner(_owner())
+        return {"cancelled": cancelled}
+
+    @app.callback(
+        Output('forecast-owner', 'data'),
+        Input('url', 'pathname'),
+    )
+    def remember_forecast_owner(pathname):
+        """Signed user id for background jobs, which run without the request's login session."""
+        owner = _owner()
+        return owner_signer.dumps(owner) if owner is not None else None
+
     @app.callback(
         [
             Output('upload-data', 'contents'),
@@ -338,6 +557,7 @@ def register_callbacks(app, uploaded_df):
             Output('forecast-result', 'children', allow_duplicate=True),
             Output('forecast-chart', 'figure', allow_duplicate=True),
             Output('forecast-metadata', 'clear_data', allow_duplicate=True),
+            Output('forecast-history', 'clear_data', allow_duplicate=True),
         ],
         Input('reset-upload', 'n_clicks'),
         prevent_initial_call=True
@@ -347,95 +567,26 @@ def register_callbacks(app, uploaded_df):
         if n_clicks:
             uploaded_df.clear()
             empty_fig = go.Figure()
-            return None, None, True, True, None, None, empty_fig, None
-        return dash.no_update, dash.no_update,  dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+            return None, None, True, True, None, None, empty_fig, None, True
+        return dash.no_update, dash.no_update,  dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
 
 
 
 
 
-    @app.callback(
-    [Output('forecast-result', 'children',allow_duplicate=True),
-     Output('forecast-chart', 'figure', allow_duplicate=True)],
-    [Input('forecast-memory', 'data'),
-    Input('url', 'pathname'),
-    Input('page-load-trigger', 'n_intervals')],
-    prevent_initial_call=True
+    # redraw the stored forecast (table + chart) in the browser on navigation / reload:
+    # no server round trip, the paged table fetches its rows via page_forecast_table
+    app.clientside_callback(
+        ClientsideFunction(namespace='forecast_restore', function_name='restoreForecast'),
+        [Output('forecast-result', 'children', allow_duplicate=True),
+         Output('forecast-chart', 'figure', allow_duplicate=True)],
+        [Input('forecast-memory', 'data'),
+         Input('url', 'pathname'),
+         Input('page-load-trigger', 'n_intervals')],
+        State('interval-band', 'value'),
+        State('forecast-metadata', 'data'),
+        State('forecast-history', 'data'),
+        State('forecast-chart', 'figure'),
+        prevent_initial_call=True
     )
-    def restore_previous_forecast(stored_data, pathname, n_intervals):
-        """Menampilkan ulang hasil forecasting dari session/browser dengan debug info."""
-
-        print("\n[DEBUG] restore_previous_forecast() terpanggil")
-        print("[DEBUG] stored_data type:", type(stored_data))
-        if not stored_data:
-            print("[DEBUG] stored_data kosong — tidak ada forecast tersimpan.")
-            return "", go.Figure()
-
-        try:
-            # --- Konversi data ke DataFrame ---
-            df = pd.DataFrame(stored_data)
-            print(f"[DEBUG] DataFrame dibuat dengan {len(df)} baris dan kolom: {list(df.columns)}")
-
-            # --- Membuat tabel hasil forecast ---
-            result_table = dash_table.DataTable(
-                data=df.to_dict('records'),
-                columns=[{"name": i, "id": i} for i in df.columns],
-                page_size=10,
-                style_table={'overflowX': 'auto'},
-                style_cell={'textAlign': 'left', 'padding': '6px'},
-                style_header={'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
-                style_as_list_view=True
-            )
-
-            # --- Membuat grafik hasil forecast ---
-            fig = go.Figure(layout={'template': 'plotly_white'})
-            if 'p90' in df.columns and 'p10' in df.columns:
-                fig.add_trace(go.Scatter(
-                    x=df['timestamp'], y=df['p90'],
-                    line=dict(color='rgba(0,0,0,0)'), showlegend=False, hoverinfo='skip'
-                ))
-                fig.add_trace(go.Scatter(
-                    x=df['timestamp'], y=df['p10'],
-                    line=dict(color='rgba(0,0,0,0)'), fill='tonexty',
-                    fillcolor='rgba(33,150,243,0.16)', name='P10–P90 Interval'
-                ))
-            if 'mean' in df.columns:
-                fig.add_trace(go.Scatter(
-                    x=df['timestamp'], y=df['mean'],
-                    mode='lines+markers', name='Forecast (mean)',
-                    line=dict(width=3), marker=dict(size=6)
-                ))
-            fig.update_layout(
-                title="Restored Forecast",
-                xaxis_title="Timestamp",
-                yaxis_title="Forecast Value"
-            )
-
-            print("[DEBUG] Callback restore_previous_forecast selesai tanpa error.")
-            return result_table, fig
-
-        except Exception as e:
-            import traceback
-            print("[ERROR] restore_previous_forecast gagal:", e)
-            traceback.print_exc()
-
-            # Kembalikan pesan error ke UI agar kelihatan di halaman
-            error_div = html.Div(
-                [
-                    html.H5("⚠️ Terjadi error saat memulihkan hasil forecasting", style={'color': 'red'}),
-                    html.Pre(str(e), style={'whiteSpace': 'pre-wrap', 'fontFamily': 'monospace'})
-                ],
-                style={'padding': '10px', 'backgroundColor': '#ffeeee', 'border': '1px solid #ffaaaa'}
-            )
-
-        return error_div, go.Figure()
-    
-
-  
-
-
-
-
-
-
@@ -0,0 +1,247 @@
+# dashboard/compare_engine.py
+"""
+Join real observations against a forecast for the compare page.
+
+normalized_forecast() turns a stored forecast into one frame indexed by
+(series, date) with the date as 'YYYY-MM-DD' (the key the compare table uses),
+keeping mean and the whole quantile grid. It prefers the full forecast kept
+server-side (dashboard.datastore, kind "forecast", all series) and falls back
+to the records in forecast-memory; the result is cached per forecast id, so a
+click only pays for the join.
+
+join_actuals() computes forecast, error, band bounds and the anomaly flag for
+every observation with one merge on (series, date).
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from app.quantiles import band_columns
+from dashboard import datastore
+
+CACHE_SIZE = 16
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    if 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    elif 'timestamp_str' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp_str'], errors='coerce')
+    else:
+        possible = [c for c in df.columns if 'date' in c.lower() or 'time' in c.lower()]
+        df['timestamp'] = pd.to_datetime(df[possible[0]], errors='coerce') if possible else pd.NaT
+    df = df.dropna(subset=['timestamp'])
+    df['series'] = df['item_id'].astype(str) if 'item_id' in df.columns else ''
+    df['date'] = df['timestamp'].dt.strftime('%Y-%m-%d')
+    df = df.drop(columns=['timestamp_str'], errors='ignore')
+    return df.drop_duplicates(['series', 'date']).set_index(['series', 'date']).sort_index()
+
+
+def normalized_forecast(stored_forecast=None, forecast_id: str = None) -> pd.DataFrame:
+    """Forecast indexed by (series, date); cached by forecast id. Empty frame if there is none."""
+    if forecast_id:
+        with _lock:
+            cached = _cache.get(forecast_id)
+            if cached is not None:
+                _cache.move_to_end(forecast_id)
+                return cached
+    df = datastore.load_frame(forecast_id, kind="forecast") if forecast_id else None
+    if df is None:
+        if not stored_forecast:
+            return pd.DataFrame()
+        df = pd.DataFrame(stored_forecast)
+    if df.empty:
+        return pd.DataFrame()
+    normalized = _normalize(df)
+    if forecast_id:
+        with _lock:
+            _cache[forecast_id] = normalized
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return normalized
+
+
+def series_ids(forecast: pd.DataFrame) -> list:
+    return forecast.index.get_level_values('series').unique().tolist() if not forecast.empty else []
+
+
+def series_forecast_id(forecast: pd.DataFrame, series_id=None) -> str:
+    """`series_id` if the forecast has it, else its first series ('' when empty)."""
+    ids = series_ids(forecast)
+    if series_id is not None and str(series_id) in ids:
+        return str(series_id)
+    return ids[0] if ids else ''
+
+
+def series_forecast(forecast: pd.DataFrame, series_id=None) -> pd.DataFrame:
+    """Rows of one series (default: the first) as a flat frame for forecast_figure()."""
+    if forecast.empty:
+        return pd.DataFrame()
+    return forecast.xs(series_forecast_id(forecast, series_id), level='series').reset_index()
+
+
+def join_actuals(actuals: pd.DataFrame, forecast: pd.DataFrame, band=None, series_id=None) -> pd.DataFrame:
+    """
+    `actuals` (date, value[, series][, alert_sent]) joined with `forecast`:
+    adds forecast (mean), error, lower / upper of `band`, band and anomaly
+    ('Yes' outside the band). Observations without a series belong to
+    `series_id` (default: the forecast's first series).
+    """
+    lower_col, upper_col = band_columns(band)
+    out = actuals.copy()
+    out['date'] = pd.to_datetime(out['date'], errors='coerce').dt.strftime('%Y-%m-%d')
+    out['value'] = pd.to_numeric(out['value'], errors='coerce')
+    default = series_forecast_id(forecast, series_id)
+    if 'series' not in out.columns:
+        out['series'] = default
+    out['series'] = out['series'].fillna('').astype(str).replace('', default)
+
+    cols = [c for c in ('mean', lower_col, upper_col) if c in forecast.columns]
+    fc = forecast[cols].rename(columns={'mean': '_mean', lower_col: '_lower', upper_col: '_upper'}) \
+        if cols else pd.DataFrame(index=forecast.index)
+    for c in ('_mean', '_lower', '_upper'):
+        if c not in fc.columns:
+            fc[c] = np.nan
+    merged = out.drop(columns=['forecast', 'error', 'lower', 'upper', 'band', 'anomaly'], errors='ignore') \
+        .merge(fc, left_on=['series', 'date'], right_index=True, how='left')
+
+    matched = merged['_mean'].notna()
+    has_band = matched & merged['_lower'].notna() & merged['_upper'].notna()
+    outside = (merged['value'] < merged['_lower']) | (merged['value'] > merged['_upper'])
+    merged['forecast'] = merged['_mean'].round(3)
+    merged['error'] = (merged['value'] - merged['_mean']).round(3)
+    merged['lower'] = merged['_lower'].where(has_band)
+    merged['upper'] = merged['_upper'].where(has_band)
+    merged['band'] = np.where(matched, f"{lower_col}-{upper_col}", None)
+    merged['anomaly'] = np.where(has_band & outside, 'Yes', '')
+    return merged.drop(columns=['_mean', '_lower', '_upper'])
+
+
+def display_records(records: list) -> list:
+    """Page rows for the table: NaN forecast values as '-'."""
+    return [{k: '-' if isinstance(v, float) and v != v else v for k, v in r.items()} for r in records]
+
+
+def to_records(joined: pd.DataFrame) -> list:
+    """Table rows; missing forecast values shown as '-' like the manual entry table always did."""
+    df = joined.copy()
+    for c in ('forecast', 'error', 'lower', 'upper'):
+        df[c] = df[c].astype(object).where(df[c].notna(), '-')
+    if 'alert_sent' in df.columns:
+        df['alert_sent'] = df['alert_sent'].fillna(False).astype(bool)
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
+
+
+# ---------------------------------------------------------------------------
+# Actuals working set: kept server-side (datastore kind "actuals"), the
+# browser holds {'actuals_id', 'rows'} and the table pages over it
+# ---------------------------------------------------------------------------
+ACTUALS_COLUMNS = ['series', 'date', 'value', 'forecast', 'error', 'lower', 'upper', 'band', 'anomaly', 'alert_sent']
+# upload column names recognised (lowercase)
+DATE_NAMES = ('date', 'timestamp', 'tanggal', 'ds', 'time')
+VALUE_NAMES = ('value', 'real', 'actual', 'target', 'nilai', 'y')
+SERIES_NAMES = ('series', 'item_id', 'id', 'series_id', 'site')
+# alert-select shows every anomaly plus the most recent rows
+ALERT_OPTIONS_RECENT = 200
+
+
+def load_actuals(handle) -> pd.DataFrame:
+    df = datastore.load_frame((handle or {}).get('actuals_id'), kind="actuals")
+    return df if df is not None else pd.DataFrame(columns=ACTUALS_COLUMNS)
+
+
+def save_actuals(df: pd.DataFrame, previous=None) -> dict:
+    """Store the working set (replacing `previous`); returns the new handle for actuals-memory."""
+    if previous and previous.get('actuals_id'):
+        datastore.delete_frame(previous['actuals_id'], kind="actuals")
+    df = df.reindex(columns=ACTUALS_COLUMNS).reset_index(drop=True)
+    return {'actuals_id': datastore.save_frame(df, kind="actuals"), 'rows': len(df)}
+
+
+def actuals_from_records(records) -> pd.DataFrame:
+    """Working set from saved table rows (database / older browser state)."""
+    df = pd.DataFrame(records or [])
+    if df.empty:
+        return pd.DataFrame(columns=ACTUALS_COLUMNS)
+    # rows saved before the configurable grid carry p10/p90 instead of lower/upper
+    for legacy, col in (('p10', 'lower'), ('p90', 'upper')):
+        if col not in df.columns and legacy in df.columns:
+            df[col] = df[legacy]
+    for c in ('forecast', 'error', 'lower', 'upper'):
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c].replace('-', np.nan), errors='coerce')
+    if 'series' not in df.columns:
+        df['series'] = ''
+    if 'alert_sent' not in df.columns:
+        df['alert_sent'] = False
+    df['series'] = df['series'].fillna('').astype(str)
+    return df.reindex(columns=ACTUALS_COLUMNS)
+
+
+def merge_actuals(existing: pd.DataFrame, new: pd.DataFrame, keep: str = 'last') -> pd.DataFrame:
+    """Union by (series, date); keep='last' lets `new` replace existing observations."""
+    combined = pd.concat([existing, new], ignore_index=True)
+    combined['series'] = combined['series'].fillna('').astype(str)
+    return combined.drop_duplicates(['series', 'date'], keep=keep).sort_values(['series', 'date'], kind='mergesort')
+
+
+def row_key(series, date) -> str:
+    return f"{series or ''}|{date}"
+
+
+def split_key(key: str):
+    series, _, date = str(key).rpartition('|')
+    return series, date
+
+
+def alert_options(df: pd.DataFrame) -> list:
+    """alert-select options: all anomalies + the most recent rows, value 'series|date'."""
+    if df.empty:
+        return []
+    picked = pd.concat([df[df['anomaly'] == 'Yes'], df.sort_values('date').tail(ALERT_OPTIONS_RECENT)])
+    picked = picked.drop_duplicates(['series', 'date']).sort_values(['date', 'series'])
+    return [
+        {"label": f"{r['date']}{' [' + r['series'] + ']' if r['series'] else ''} — Real: {r['value']}"
+                  f"{' ⚠️' if r['anomaly'] == 'Yes' else ''}",
+         "value": row_key(r['series'], r['date'])}
+        for r in picked.to_dict('records')
+    ]
+
+
+def _pick(columns, names):
+    lower = {str(c).lower().strip(): c for c in columns}
+    return next((lower[n] for n in names if n in lower), None)
+
+
+def read_actuals_upload(contents: str, filename: str) -> pd.DataFrame:
+    """
+    Observations from an uploaded CSV / Parquet (dcc.Upload contents) as
+    series / date / value; raises ValueError when the columns are not found.
+    """
+    import base64
+    import io
+    _, encoded = contents.split(',', 1)
+    raw = base64.b64decode(encoded)
+    if (filename or '').lower().endswith(('.parquet', '.pq')):
+        df = pd.read_parquet(io.BytesIO(raw))
+    else:
+        df = pd.read_csv(io.BytesIO(raw))
+    date_col, value_col = _pick(df.columns, DATE_NAMES), _pick(df.columns, VALUE_NAMES)
+    if date_col is None or value_col is None:
+        raise ValueError(f"kolom tanggal/nilai tidak ditemukan (tanggal: {', '.join(DATE_NAMES)}; "
+                         f"nilai: {', '.join(VALUE_NAMES)})")
+    series_col = _pick(df.columns, SERIES_NAMES)
+    out = pd.DataFrame({
+        'series': df[series_col].fillna('').astype(str) if series_col else '',
+        'date': pd.to_datetime(df[date_col], errors='coerce').dt.strftime('%Y-%m-%d'),
+        'value': pd.to_numeric(df[value_col], errors='coerce'),
+    }).dropna(subset=['date', 'value'])
+    out['alert_sent'] = False
+    return out.drop_duplicates(['series', 'date'], keep='last')
@@ -0,0 +1,194 @@
+# dashboard/datastore.py
+"""
+Server-side store for uploaded datasets (and other frames the dashboard
+needs again later), so the browser only keeps a small handle.
+
+Frames are pickled under <CACHE_DIR>/datastore/<kind>/<id>.pkl (CACHE_DIR from
+the app config, see config.py), which every web worker can read, with a small
+in-process LRU in front. The browser stores {'dataset_id', 'filename',
+'rows', 'columns'} instead of the full records.
+
+series_history() returns the history of one series windowed to the most
+recent `points` observations; charts start from that window and pull older
+ranges on demand ("load more" / zoom).
+
+Frames older than DATASTORE_MAX_AGE_DAYS are removed by cleanup(): at app
+startup (app factory), at most every CLEANUP_INTERVAL s from save_frame() in
+a long-running process, and on demand (cron):
+
+    python -m dashboard.datastore cleanup [--max-age-days N] [--dry-run]
+"""
+import argparse
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+
+# frames kept in memory per process
+MEMORY_CACHE_SIZE = 8
+# recent history shown with a forecast: max(HISTORY_MIN_POINTS, HISTORY_HORIZON_MULT * horizon)
+HISTORY_MIN_POINTS = 120
+HISTORY_HORIZON_MULT = 8
+# stored frames older than this are removed by cleanup()
+MAX_AGE_DAYS = float(os.environ.get("DATASTORE_MAX_AGE_DAYS", 7))
+# seconds between the cleanups save_frame() triggers in one process
+CLEANUP_INTERVAL = 3600
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_base_dir = None
+_last_cleanup = time.monotonic()
+
+
+def configure(cache_dir: str) -> None:
+    """Use `cache_dir` (app factory); also holds in background job processes, which have no app context."""
+    global _base_dir
+    _base_dir = cache_dir
+
+
+def _root() -> str:
+    base = _base_dir
+    if base is None:
+        try:
+            from flask import current_app
+            base = current_app.config.get("CACHE_DIR")
+        except RuntimeError:
+            pass   # outside an app context (scripts, benchmarks)
+    base = base or os.environ.get("CACHE_DIR") or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+    return os.path.join(base, "datastore")
+
+
+def _path(kind: str, frame_id: str) -> str:
+    if not frame_id or not all(c in "0123456789abcdef" for c in frame_id):
+        raise ValueError(f"invalid frame id {frame_id!r}")
+    return os.path.join(_root(), kind, f"{frame_id}.pkl")
+
+
+def _remember(key, df):
+    with _lock:
+        _cache[key] = df
+        _cache.move_to_end(key)
+        while len(_cache) > MEMORY_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def save_frame(df: pd.DataFrame, kind: str = "dataset") -> str:
+    """Persist `df`; returns its id."""
+    frame_id = uuid.uuid4().hex
+    path = _path(kind, frame_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_pickle(path + ".tmp")
+    os.replace(path + ".tmp", path)
+    _remember((kind, frame_id), df)
+    _maybe_cleanup()
+    return frame_id
+
+
+def load_frame(frame_id: str, kind: str = "dataset"):
+    """The stored frame, or None if it does not exist (expired / other host)."""
+    if not frame_id:
+        return None
+    with _lock:
+        df = _cache.get((kind, frame_id))
+        if df is not None:
+            _cache.move_to_end((kind, frame_id))
+            return df
+    try:
+        df = pd.read_pickle(_path(kind, frame_id))
+    except (OSError, ValueError):
+        return None
+    _remember((kind, frame_id), df)
+    return df
+
+
+def delete_frame(frame_id: str, kind: str = "dataset") -> None:
+    with _lock:
+        _cache.pop((kind, frame_id), None)
+    try:
+        os.remove(_path(kind, frame_id))
+    except (OSError, ValueError):
+        pass
+
+
+def cleanup(max_age_days: float = None, dry_run: bool = False) -> int:
+    """Remove stored frames older than `max_age_days`; returns how many were (or would be) removed."""
+    max_age_days = MAX_AGE_DAYS if max_age_days is None else max_age_days
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for dirpath, _, filenames in os.walk(_root()):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                if not dry_run:
+                    os.remove(path)
+            except OSError:
+                continue   # removed by another worker meanwhile
+            removed += 1
+    return removed
+
+
+def _maybe_cleanup() -> None:
+    global _last_cleanup
+    with _lock:
+        if time.monotonic() - _last_cleanup < CLEANUP_INTERVAL:
+            return
+        _last_cleanup = time.monotonic()
+    try:
+        removed = cleanup()
+    except OSError as e:
+        print(f"[datastore] cleanup failed: {e}")
+        return
+    if removed:
+        print(f"[datastore] removed {removed} expired frame(s)")
+
+
+def dataset_handle(upload_memory):
+    """dataset_id from the upload-memory store (None for old full-record stores)."""
+    return upload_memory.get("dataset_id") if isinstance(upload_memory, dict) else None
+
+
+def history_points(prediction_length: int) -> int:
+    return max(HISTORY_MIN_POINTS, HISTORY_HORIZON_MULT * int(prediction_length or 1))
+
+
+def series_history(meta, points: int = None) -> pd.DataFrame:
+    """
+    History (timestamp / value) of the plotted series described by the forecast
+    metadata (dataset_id, id_col, timestamp_col, target_col, series_id), limited
+    to the last `points` observations when given.
+    """
+    if not meta:
+        return None
+    df = load_frame(meta.get("dataset_id"))
+    cols = [meta.get(k) for k in ("id_col", "timestamp_col", "target_col")]
+    if df is None or not all(c in df.columns for c in cols):
+        return None
+    id_col, ts_col, target_col = cols
+    rows = df[df[id_col].astype(str) == str(meta.get("series_id"))]
+    history = pd.DataFrame({
+        "timestamp": pd.to_datetime(rows[ts_col], errors="coerce"),
+        "value": pd.to_numeric(rows[target_col], errors="coerce"),
+    }).dropna().sort_values("timestamp")
+    return history.iloc[-int(points):] if points else history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    clean = sub.add_parser("cleanup", help="remove frames older than DATASTORE_MAX_AGE_DAYS")
+    clean.add_argument("--max-age-days", type=float, default=None)
+    clean.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    removed = cleanup(args.max_age_days, args.dry_run)
+    print(f"[datastore] {removed} frame(s) {'to remove' if args.dry_run else 'removed'} under {_root()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# dashboard/figures.py
+"""
+Shared figure builder for the forecast / compare charts.
+
+All line traces are WebGL (go.Scattergl), so long series do not stall the
+browser the way SVG scatter does. The history trace is downsampled on the
+server with LTTB (Largest-Triangle-Three-Buckets) to a point budget of about
+the chart's pixel width; zooming sends a relayout event and
+zoom_history() returns the zoomed range again at full resolution (or LTTB'd
+to the same budget when it is still too long).
+
+Trace order is fixed so callbacks can patch by index:
+  0  history      (meta 'history', possibly empty)
+  1  band upper   (meta 'band-upper')
+  2  band lower   (meta 'band-lower', filled to the upper trace)
+  3  mean
+  4  real data    (compare page only)
+The band traces keep their meta for the client-side band switch
+(assets/forecast_bands.js); assets/forecast_restore.js builds the same figure
+in the browser when a stored forecast is redrawn.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+
+from app.quantiles import band_columns, band_label
+
+# points per trace sent to the browser (~ chart width in px)
+DEFAULT_POINT_BUDGET = 1200
+HISTORY_TRACE = 0
+BAND_FILL = 'rgba(33,150,243,0.16)'
+HISTORY_COLOR = 'rgba(90,90,90,0.85)'
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the `n_out` points LTTB keeps from (x, y); x numeric and ascending."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    every = (n - 2) / (n_out - 2)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        # candidates: bucket i; reference: mean of bucket i + 1 (the last one includes point n - 1)
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        nxt_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:nxt_end].mean()
+        avg_y = y[end:nxt_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample(timestamps, values, budget: int = DEFAULT_POINT_BUDGET):
+    """(timestamps, values) reduced to at most `budget` points with LTTB; NaNs dropped."""
+    ts = pd.to_datetime(pd.Series(timestamps)).reset_index(drop=True)
+    vals = pd.to_numeric(pd.Series(values), errors='coerce').reset_index(drop=True)
+    keep = ts.notna() & vals.notna()
+    ts, vals = ts[keep].to_numpy(), vals[keep].to_numpy(dtype=np.float64)
+    if len(ts) <= budget:
+        return ts, vals
+    idx = lttb_indices(ts.astype('datetime64[ns]').astype(np.int64), vals, budget)
+    return ts[idx], vals[idx]
+
+
+def history_trace(history: pd.DataFrame = None, budget: int = DEFAULT_POINT_BUDGET) -> go.Scattergl:
+    """History as a downsampled WebGL line; `history` has columns timestamp / value."""
+    x, y = [], []
+    if history is not None and not history.empty:
+        x, y = downsample(history['timestamp'], history['value'], budget)
+    return go.Scattergl(x=x, y=y, mode='lines', name='History', meta='history',
+                        line=dict(color=HISTORY_COLOR, width=1.5))
+
+
+def history_payload(history: pd.DataFrame = None, budget: int = DEFAULT_POINT_BUDGET):
+    """Downsampled history as {'x', 'y'} lists (forecast-history store, redrawn client-side)."""
+    if history is None or history.empty:
+        return None
+    x, y = downsample(history['timestamp'], history['value'], budget)
+    return {'x': pd.DatetimeIndex(x).strftime('%Y-%m-%dT%H:%M:%S').tolist(), 'y': y.tolist()}
+
+
+def empty_figure(title=None) -> go.Figure:
+    """Blank chart for page layouts; client-side redraws reuse its template."""
+    return go.Figure(layout={'template': 'plotly_white', 'title': title})
+
+
+def forecast_figure(forecast_df: pd.DataFrame, band=None, title=None, history: pd.DataFrame = None,
+                    real=None, xaxis_title="Timestamp", yaxis_title="Forecast Value", legend_title=None,
+                    budget: int = DEFAULT_POINT_BUDGET) -> go.Figure:
+    """
+    Forecast chart: history (optional), interval band from the stored quantile
+    grid, mean line and optional real observations (list of {'date', 'value',
+    'anomaly'} rows from the compare page).
+    """
+    fig = go.Figure(layout={'template': 'plotly_white'})
+    fig.add_trace(history_trace(history, budget))
+
+    df = forecast_df.sort_values('timestamp') if forecast_df is not None and not forecast_df.empty else None
+    lower_col, upper_col = band_columns(band)
+    has_band = df is not None and {lower_col, upper_col} <= set(df.columns)
+    fig.add_trace(go.Scattergl(
+        x=df['timestamp'] if has_band else [], y=df[upper_col] if has_band else [], meta='band-upper',
+        line=dict(color='rgba(0,0,0,0)'), showlegend=False, hoverinfo='skip',
+    ))
+    fig.add_trace(go.Scattergl(
+        x=df['timestamp'] if has_band else [], y=df[lower_col] if has_band else [], meta='band-lower',
+        line=dict(color='rgba(0,0,0,0)'), fill='tonexty', fillcolor=BAND_FILL, name=band_label(band),
+    ))
+    has_mean = df is not None and 'mean' in df.columns
+    fig.add_trace(go.Scattergl(
+        x=df['timestamp'] if has_mean else [], y=df['mean'] if has_mean else [],
+        mode='lines+markers', name='Forecast (mean)', line=dict(width=3), marker=dict(size=6),
+    ))
+
+    if real:
+        fig.add_trace(go.Scattergl(
+            x=[pd.to_datetime(r['date']) for r in real], y=[r['value'] for r in real],
+            mode='markers+text', name='Real Data',
+            marker=dict(color=['red' if r.get('anomaly') == 'Yes' else 'green' for r in real],
+                        size=10, symbol='diamond'),
+            text=[f"{r['value']}" for r in real], textposition='top center',
+        ))
+
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title,
+                      legend_title=legend_title, margin={'t': 40, 'l': 40, 'r': 24, 'b': 40})
+    return fig
+
+
+def relayout_range(relayout_data):
+    """
+    x-range from a Plotly relayout event: (x0, x1) for a zoom, (None, None) for
+    an autorange reset, or False when the event did not touch the x-axis.
+    """
+    if not relayout_data:
+        return False
+    if relayout_data.get('xaxis.autorange'):
+        return None, None
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return pd.to_datetime(relayout_data['xaxis.range[0]']), pd.to_datetime(relayout_data['xaxis.range[1]'])
+    if 'xaxis.range' in relayout_data:
+        x0, x1 = relayout_data['xaxis.range'][:2]
+        return pd.to_datetime(x0), pd.to_datetime(x1)
+    return False
+
+
+def zoom_history(history: pd.DataFrame, x0=None, x1=None, budget: int = DEFAULT_POINT_BUDGET):
+    """History points inside [x0, x1] at full resolution, LTTB'd only if still over budget."""
+    if history is None or history.empty:
+        return [], []
+    ts = pd.to_datetime(history['timestamp'])
+    mask = pd.Series(True, index=history.index)
+    if x0 is not None:
+        mask &= ts >= x0
+    if x1 is not None:
+        mask &= ts <= x1
+    window = history[mask]
+    return downsample(window['timestamp'], window['value'], budget)
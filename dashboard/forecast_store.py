@@ -0,0 +1,342 @@
+# dashboard/forecast_store.py
+"""
+Forecast runs and real observations in the database (auth.models ForecastRun /
+Observation) for the compare page.
+
+A run is written once per (user, forecast): the forecast records go into one
+JSON column, keyed by the datastore forecast id (or a hash of the records when
+the forecast only lives in the browser). Every observation is its own row,
+upserted by (run, series, timestamp), so adding or uploading real data writes
+only those rows instead of re-saving the forecast and the whole list. On
+SQLite / PostgreSQL the writes are INSERT ... ON CONFLICT, so two requests
+saving the same point (or creating the same run) at once both land; other
+databases retry once after a unique-constraint conflict.
+
+migrate_legacy() copies the old ForecastResult / RealDataInput blobs into the
+new tables:
+
+    python update_db.py
+    python -m dashboard.forecast_store migrate [--drop-legacy]
+"""
+import hashlib
+import json
+import sys
+from datetime import datetime, timezone
+
+import pandas as pd
+from sqlalchemy.exc import IntegrityError
+
+from auth.models import (
+    get_db_session, get_user_by_username, ForecastResult, RealDataInput, ForecastRun, Observation,
+)
+from dashboard import compare_engine
+
+OBSERVATION_FIELDS = ('series', 'timestamp', 'value', 'forecast', 'lower', 'upper', 'band', 'anomaly', 'alert_sent')
+OBSERVATION_KEY = ('run_id', 'series', 'timestamp')
+RUN_KEY = ('user_id', 'run_key')
+
+
+def _now():
+    """Naive UTC, like the models' column defaults."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _dialect_insert(db):
+    """insert() with ON CONFLICT support for the session's database, or None."""
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def run_key(stored_forecast, metadata=None) -> str:
+    """Datastore forecast id when there is one, else a hash of the forecast records."""
+    forecast_id = (metadata or {}).get('forecast_id')
+    if forecast_id:
+        return str(forecast_id)
+    payload = json.dumps(stored_forecast or [], sort_keys=True, default=str)
+    return "sha1:" + hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _user_id(username):
+    user = get_user_by_username(username) if username else None
+    return user.id if user else None
+
+
+def _find_run(db, user_id, key):
+    return db.query(ForecastRun).filter(ForecastRun.user_id == user_id, ForecastRun.run_key == key).first()
+
+
+def _ensure_run(db, user_id, key, stored_forecast, metadata=None, created_at=None):
+    run = _find_run(db, user_id, key)
+    if run is not None:
+        return run
+    metadata = metadata or {}
+    now = created_at or _now()
+    values = dict(
+        user_id=user_id, run_key=key,
+        model_name=metadata.get("model_name", "unknown"),
+        uploaded_filename=metadata.get("uploaded_filename", "unknown.csv"),
+        forecast_output=stored_forecast,
+        created_at=now, updated_at=now,
+    )
+    insert = _dialect_insert(db)
+    if insert is not None:
+        # a concurrent request may create the same run: keep theirs
+        db.execute(insert(ForecastRun).values(**values).on_conflict_do_nothing(index_elements=list(RUN_KEY)))
+        return _find_run(db, user_id, key)
+    try:
+        with db.begin_nested():
+            run = ForecastRun(**values)
+            db.add(run)
+    except IntegrityError:
+        run = _find_run(db, user_id, key)
+    return run
+
+
+def _observation_rows(actuals: pd.DataFrame) -> list:
+    """Working-set rows (compare_engine.ACTUALS_COLUMNS) as Observation mappings."""
+    df = actuals.reindex(columns=compare_engine.ACTUALS_COLUMNS).copy()
+    df['timestamp'] = pd.to_datetime(df['date'], errors='coerce')
+    df['value'] = pd.to_numeric(df['value'], errors='coerce')
+    df = df.dropna(subset=['timestamp', 'value'])
+    for c in ('forecast', 'lower', 'upper'):
+        df[c] = pd.to_numeric(df[c].replace('-', float('nan')), errors='coerce')
+    df['series'] = df['series'].fillna('').astype(str)
+    df['alert_sent'] = df['alert_sent'].fillna(False).astype(bool)
+    df = df.drop_duplicates(['series', 'timestamp'], keep='last')[list(OBSERVATION_FIELDS)]
+    rows = df.astype(object).where(df.notna(), None).to_dict('records')
+    for r in rows:
+        r['timestamp'] = r['timestamp'].to_pydatetime()
+    return rows
+
+
+def upsert_observations(db, run, actuals: pd.DataFrame, overwrite: bool = True):
+    """
+    Insert / update the observations of `run` by (series, timestamp); with
+    overwrite=False existing rows are kept. Returns (inserted, updated).
+    """
+    rows = _observation_rows(actuals)
+    if not rows:
+        return 0, 0
+    now = _now()
+    insert = _dialect_insert(db)
+    for attempt in (1, 2):
+        inserts, updates = _split_existing(db, run, rows, overwrite, now)
+        if insert is not None:
+            _upsert(db, insert, inserts + updates, overwrite)
+            break
+        try:
+            with db.begin_nested():
+                if inserts:
+                    db.bulk_insert_mappings(Observation, inserts)
+                if updates:
+                    db.bulk_update_mappings(Observation, updates)
+            break
+        except IntegrityError:
+            if attempt == 2:
+                raise
+            print(f"[DEBUG] forecast_run={run.id}: observasi ditulis bersamaan, ulangi sekali")
+    run.updated_at = now
+    return len(inserts), len(updates)
+
+
+def _split_existing(db, run, rows, overwrite, now):
+    """(inserts, updates) mappings of `rows` against the run's stored points."""
+    stamps = [r['timestamp'] for r in rows]
+    existing = {
+        (series, timestamp): obs_id
+        for series, timestamp, obs_id in db.query(Observation.series, Observation.timestamp, Observation.id)
+        .filter(Observation.run_id == run.id,
+                Observation.timestamp >= min(stamps), Observation.timestamp <= max(stamps))
+    }
+    inserts, updates = [], []
+    for r in rows:
+        obs_id = existing.get((r['series'], r['timestamp']))
+        if obs_id is None:
+            inserts.append(dict(r, run_id=run.id, updated_at=now))
+        elif overwrite:
+            updates.append(dict(r, id=obs_id, run_id=run.id, updated_at=now))
+    return inserts, updates
+
+
+def _upsert(db, insert, mappings, overwrite):
+    """One INSERT ... ON CONFLICT (run, series, timestamp) for all mappings (executemany)."""
+    if not mappings:
+        return
+    stmt = insert(Observation)
+    if overwrite:
+        changed = [f for f in OBSERVATION_FIELDS if f not in OBSERVATION_KEY] + ['updated_at']
+        stmt = stmt.on_conflict_do_update(index_elements=list(OBSERVATION_KEY),
+                                          set_={f: stmt.excluded[f] for f in changed})
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(OBSERVATION_KEY))
+    db.execute(stmt, [{k: v for k, v in m.items() if k != 'id'} for m in mappings])
+
+
+def save_observations(username, metadata, stored_forecast, actuals: pd.DataFrame):
+    """Run (created on first use) + the given observations, in one transaction; run id or None."""
+    try:
+        with get_db_session() as db:
+            user_id = _user_id(username)
+            if user_id is None:
+                print("[ERROR] User tidak ditemukan di database!")
+                return None
+            run = _ensure_run(db, user_id, run_key(stored_forecast, metadata), stored_forecast, metadata)
+            inserted, updated = upsert_observations(db, run, actuals)
+            run_id = run.id
+        print(f"[DEBUG] forecast_run={run_id}: {inserted} observasi baru, {updated} diperbarui ({username})")
+        return run_id
+    except Exception as e:
+        print(f"[ERROR] Gagal menyimpan ke database: {e}")
+        return None
+
+
+def save_run(username, metadata, stored_forecast):
+    """Forecast saja (tombol Save Forecast); run yang sudah ada tidak ditulis ulang."""
+    with get_db_session() as db:
+        user_id = _user_id(username)
+        if user_id is None:
+            raise ValueError("user not found")
+        return _ensure_run(db, user_id, run_key(stored_forecast, metadata), stored_forecast, metadata).id
+
+
+def _observation_query(db, username, metadata, stored_forecast, series, date):
+    user_id = _user_id(username)
+    run = _find_run(db, user_id, run_key(stored_forecast, metadata)) if user_id is not None else None
+    if run is None:
+        return None
+    return db.query(Observation).filter(
+        Observation.run_id == run.id, Observation.series == (series or ''),
+        Observation.timestamp == pd.Timestamp(date).to_pydatetime(),
+    )
+
+
+def delete_observation(username, metadata, stored_forecast, series, date) -> int:
+    with get_db_session() as db:
+        query = _observation_query(db, username, metadata, stored_forecast, series, date)
+        return query.delete(synchronize_session=False) if query is not None else 0
+
+
+def mark_alert_sent(username, metadata, stored_forecast, series, date) -> int:
+    with get_db_session() as db:
+        query = _observation_query(db, username, metadata, stored_forecast, series, date)
+        return query.update({Observation.alert_sent: True}, synchronize_session=False) if query is not None else 0
+
+
+def latest_run(username):
+    """
+    (forecast records, metadata, observations as a compare working set) of the
+    user's last updated run, or None. metadata carries the run's forecast_id
+    (None for hashed keys) so later writes land in the same run.
+    """
+    with get_db_session() as db:
+        user_id = _user_id(username)
+        if user_id is None:
+            return None
+        run = (
+            db.query(ForecastRun)
+            .filter(ForecastRun.user_id == user_id)
+            .order_by(ForecastRun.updated_at.desc(), ForecastRun.id.desc())
+            .first()
+        )
+        if run is None:
+            return None
+        rows = (
+            db.query(*[getattr(Observation, f) for f in OBSERVATION_FIELDS])
+            .filter(Observation.run_id == run.id)
+            .order_by(Observation.series, Observation.timestamp)
+            .all()
+        )
+        forecast_output = run.forecast_output
+        metadata = {
+            "forecast_id": None if run.run_key.startswith("sha1:") else run.run_key,
+            "model_name": run.model_name, "uploaded_filename": run.uploaded_filename,
+        }
+    actuals = pd.DataFrame(rows, columns=list(OBSERVATION_FIELDS))
+    actuals['date'] = pd.to_datetime(actuals['timestamp']).dt.strftime('%Y-%m-%d')
+    for c in ('value', 'forecast', 'lower', 'upper'):
+        actuals[c] = pd.to_numeric(actuals[c], errors='coerce')
+    actuals['error'] = (actuals['value'] - actuals['forecast']).round(3)
+    actuals['anomaly'] = actuals['anomaly'].fillna('')
+    return forecast_output, metadata, actuals.reindex(columns=compare_engine.ACTUALS_COLUMNS)
+
+
+def delete_user_data(username):
+    """Semua run + observasi user (dan sisa tabel lama). Returns (runs, observations) deleted."""
+    with get_db_session() as db:
+        user_id = _user_id(username)
+        if user_id is None:
+            return 0, 0
+        run_ids = [r for (r,) in db.query(ForecastRun.id).filter(ForecastRun.user_id == user_id)]
+        deleted_obs = db.query(Observation).filter(Observation.run_id.in_(run_ids)) \
+            .delete(synchronize_session=False) if run_ids else 0
+        deleted_runs = db.query(ForecastRun).filter(ForecastRun.user_id == user_id).delete(synchronize_session=False)
+
+        legacy_ids = [r for (r,) in db.query(ForecastResult.id).filter(ForecastResult.user_id == user_id)]
+        if legacy_ids:
+            db.query(RealDataInput).filter(RealDataInput.forecast_id.in_(legacy_ids)).delete(synchronize_session=False)
+            db.query(ForecastResult).filter(ForecastResult.id.in_(legacy_ids)).delete(synchronize_session=False)
+    return deleted_runs, deleted_obs
+
+
+def migrate_legacy(drop_legacy: bool = False) -> dict:
+    """
+    ForecastResult / RealDataInput -> ForecastRun / Observation. Identical
+    forecasts of a user (one ForecastResult per click) collapse into one run;
+    their real data lists are merged oldest to newest. Rows already in the new
+    tables are never overwritten, so the migration can be re-run safely.
+    """
+    stats = {'legacy_forecasts': 0, 'runs': 0, 'inserted': 0}
+    with get_db_session() as db:
+        legacy = db.query(ForecastResult).order_by(ForecastResult.created_at, ForecastResult.id).all()
+        groups = {}
+        for fr in legacy:
+            if fr.user_id is None:
+                continue
+            groups.setdefault((fr.user_id, run_key(fr.forecast_output)), []).append(fr)
+        stats['legacy_forecasts'] = len(legacy)
+
+        for (user_id, key), results in groups.items():
+            first = results[0]
+            run = _ensure_run(db, user_id, key, first.forecast_output,
+                              {"model_name": first.model_name, "uploaded_filename": first.uploaded_filename},
+                              created_at=first.created_at)
+            entries = (
+                db.query(RealDataInput)
+                .filter(RealDataInput.forecast_id.in_([fr.id for fr in results]))
+                .order_by(RealDataInput.created_at, RealDataInput.id)
+                .all()
+            )
+            actuals = compare_engine.actuals_from_records([])
+            for entry in entries:
+                actuals = compare_engine.merge_actuals(actuals, compare_engine.actuals_from_records(entry.real_data))
+            # baris lama tanpa series milik series pertama forecast
+            default = compare_engine.series_forecast_id(compare_engine.normalized_forecast(first.forecast_output))
+            actuals['series'] = actuals['series'].replace('', default)
+            last_update = max([run.updated_at] + [fr.created_at for fr in results if fr.created_at])
+            inserted, _ = upsert_observations(db, run, actuals, overwrite=False)
+            run.updated_at = last_update
+            stats['runs'] += 1
+            stats['inserted'] += inserted
+
+        if drop_legacy and legacy:
+            db.query(RealDataInput).delete(synchronize_session=False)
+            db.query(ForecastResult).delete(synchronize_session=False)
+    print(f"[migrate] {stats['legacy_forecasts']} ForecastResult -> {stats['runs']} forecast_runs, "
+          f"{stats['inserted']} observations{' (tabel lama dikosongkan)' if drop_legacy else ''}")
+    return stats
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "migrate":
+        from auth.models import init_db
+        init_db()
+        migrate_legacy(drop_legacy="--drop-legacy" in sys.argv[2:])
+    else:
+        sys.exit("usage: python -m dashboard.forecast_store migrate [--drop-legacy]")
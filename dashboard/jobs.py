@@ -0,0 +1,88 @@
+# dashboard/jobs.py
+"""
+Background job manager for long dashboard callbacks (the forecast run).
+
+probabilistic_forecast is a Dash background callback: the click returns at
+once, the forecast runs in a separate job process and the browser polls for
+progress and the result. The manager is Dash's DiskcacheManager on a
+diskcache (SQLite) directory under CACHE_DIR, so every web worker on the host
+shares the job state: any worker can answer a poll, and Cancel terminates
+the job process whichever worker started it.
+
+A job only waits: it submits the forecast to the inference service
+(app/worker_pool.get_pool(), INFERENCE_WORKERS > 0), whose warm workers keep
+the loaded pipelines and predictors across requests, and the Cancel callback
+stops that request through deadlines.cancel_owner(). Without a service the
+job runs the forecast itself and loads the model weights on every run.
+
+  DASH_BACKGROUND   1 (default) = background callbacks, 0 = run inside the request
+                    (also the fallback when diskcache is not installed)
+
+Progress comes from the pipeline's stage checkpoints (Deadline.on_stage):
+stage_progress() maps a stage to (percent, label) for the progress bar.
+"""
+import os
+
+# stage -> (percent, label); predict spreads over PREDICT_RANGE by series done
+STAGES = {
+    "start": (2, "Memulai..."),
+    "sanitize": (8, "Menyiapkan data"),
+    "dataset": (15, "Menyusun dataset"),
+    "model_load": (30, "Memuat model"),
+    "done": (100, "Selesai"),
+}
+PREDICT_RANGE = (40, 95)
+
+_manager = None
+
+
+def create_manager(cache_dir: str, enabled: bool = True):
+    """DiskcacheManager under <cache_dir>/dash-jobs, or None (disabled / diskcache missing)."""
+    global _manager
+    if not enabled:
+        print("[jobs] background callbacks disabled (DASH_BACKGROUND=0)")
+        _manager = None
+        return None
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+    except ImportError as e:
+        print(f"[jobs] diskcache not available ({e}); forecasts run inside the request")
+        _manager = None
+        return None
+    path = os.path.join(cache_dir, "dash-jobs")
+    os.makedirs(path, exist_ok=True)
+    _manager = DiskcacheManager(diskcache.Cache(path))
+    print(f"[jobs] background callbacks via diskcache at {path}")
+    if not os.environ.get("INFERENCE_ADDRESS"):
+        print("[jobs] WARNING: no inference service (INFERENCE_WORKERS=0): each job loads the model itself")
+    return _manager
+
+
+def manager():
+    return _manager
+
+
+def stage_progress(stage: str, done: int = None, total: int = None) -> tuple:
+    """(percent, label) shown for a pipeline stage."""
+    if stage == "predict":
+        lo, hi = PREDICT_RANGE
+        if total:
+            return lo + int((hi - lo) * min(done or 0, total) / total), f"Prediksi {done or 0}/{total} series"
+        return lo, "Prediksi"
+    return STAGES.get(stage, (None, stage))
+
+
+def progress_reporter(set_progress):
+    """on_stage listener that pushes stage_progress() to a Dash set_progress (None = no-op)."""
+    if set_progress is None:
+        return None
+    last = [None]
+
+    def report(stage, done=None, total=None):
+        value, label = stage_progress(stage, done, total)
+        if value is None or (value, label) == last[0]:
+            return
+        last[0] = (value, label)
+        set_progress((value, label))
+    return report
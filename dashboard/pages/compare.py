@@ -2,7 +2,9 @@
 import dash
 from dash import html, dcc
 import dash_bootstrap_components as dbc
-from dash import dash_table
+from dashboard.tables import paged_table
+from app.quantiles import DEFAULT_BAND, band_options
+from dashboard.figures import empty_figure
 
 dash.register_page(__name__, path='/compare', name='Compare with Real Data', order=2, icon='bi bi-bar-chart-line')
 
@@ -20,6 +22,18 @@ def layout():
                         ],
                         className="g-2"
                     ),
+                    dcc.Upload(
+                        id='actuals-upload',
+                        children=html.Div([
+                            html.I(className="bi bi-upload me-2"),
+                            "Atau unggah CSV / Parquet (kolom: date, value, opsional series)"
+                        ]),
+                        multiple=False,
+                        style={
+                            'borderWidth': '1px', 'borderStyle': 'dashed', 'borderRadius': '6px',
+                            'textAlign': 'center', 'padding': '10px', 'marginTop': '10px', 'cursor': 'pointer'
+                        },
+                    ),
                     html.Div(id='forecast-alert', style={'marginTop': 8})
                 ]
             )
@@ -32,24 +46,27 @@ def layout():
             dbc.CardHeader(html.Strong("Real vs Forecast Table")),
             dbc.CardBody(
                 [
-                    dash_table.DataTable(
-                        id='real-data-table',
-                        columns=[
+                    paged_table(
+                        'real-data-table',
+                        [
+                            {"name": "Series", "id": "series"},
                             {"name": "Date", "id": "date"},
                             {"name": "Value", "id": "value"},
                             {"name": "Forecast", "id": "forecast"},
                             {"name": "Error", "id": "error"},
                             {"name": "Anomaly", "id": "anomaly"},
                             {"name": "Alert Sent", "id": "alert_sent"},
-                    
                         ],
-                        data=[],
                         page_size=8,
-                        style_table={'overflowX': 'auto'},
                         style_cell={'textAlign': 'left', 'padding': '8px'},
-                        style_header={'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
-                        style_data_conditional=[],
-                        style_as_list_view=True
+                        style_data_conditional=[
+                            {
+                                'if': {'filter_query': '{anomaly} = "Yes"'},
+                                'backgroundColor': '#ffdddd',
+                                'color': '#222',
+                                'fontWeight': '600'
+                            }
+                        ],
                     ),
                     html.Div([
                         html.Label("Pilih data untuk dikirim / dihapus:", className="fw-bold mb-2"),
@@ -76,8 +93,25 @@ def layout():
 
     chart_card = dbc.Card(
         [
-            dbc.CardHeader(html.Strong("Compare Chart")),
-            dbc.CardBody([dcc.Graph(id='compare-chart', style={'height': '480px'})])
+            dbc.CardHeader(
+                dbc.Row(
+                    [
+                        dbc.Col(html.Strong("Compare Chart")),
+                        dbc.Col(
+                            dcc.Dropdown(
+                                id='compare-interval-band',
+                                options=band_options(),
+                                value=DEFAULT_BAND,
+                                clearable=False,
+                                persistence=True, persistence_type='local',
+                            ),
+                            md=3,
+                        ),
+                    ],
+                    align='center',
+                )
+            ),
+            dbc.CardBody([dcc.Graph(id='compare-chart', figure=empty_figure('Forecast vs Real Data'), style={'height': '480px'})])
         ],
         style={'borderRadius': 10}
     )
@@ -86,6 +120,7 @@ def layout():
         [
             dcc.Store(id='forecast-memory', storage_type='local'),
             dcc.Store(id='forecast-metadata', storage_type='local'),
+            dcc.Store(id='actuals-memory', storage_type='local'),
             dcc.Interval(
             id="db-load-trigger",
             interval=1*1000,  # 1 detik, hanya untuk trigger awal
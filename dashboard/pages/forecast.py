@@ -2,6 +2,8 @@
 import dash
 from dash import html, dcc
 import dash_bootstrap_components as dbc
+from app.quantiles import DEFAULT_BAND, band_options
+from dashboard.figures import empty_figure
 
 dash.register_page(__name__, path='/forecasting', name='Forecasting', order=1, icon='bi bi-graph-up')
 
@@ -34,6 +36,9 @@ def layout():
                             dcc.Store(id='forecast-memory', storage_type='local'),
 
                             dcc.Store(id='forecast-metadata', storage_type='local'),
+
+                            # ✅ Store untuk histori (downsampled) yang digambar ulang di browser
+                            dcc.Store(id='forecast-history', storage_type='local'),
                    
 
                             # ✅ Store untuk UI state (dropdown, pred_len, dsb)
@@ -44,6 +49,7 @@ def layout():
                         dcc.Dropdown(
                             id='chronos-model',
                             options=[
+                                {'label': 'Auto (latency-aware)', 'value': 'auto'},
                                 {'label': 'Chronos T5 Tiny', 'value': 'amazon/chronos-t5-tiny'},
                                 {'label': 'Chronos T5 Mini', 'value': 'amazon/chronos-t5-mini'},
                                 {'label': 'Chronos T5 Small', 'value': 'amazon/chronos-t5-small'},
@@ -57,6 +63,15 @@ def layout():
                             value='amazon/chronos-t5-tiny',
                             clearable=False,
                             style={'marginTop': 6}
+                        ),
+                        html.Label('Interval:', style={'marginTop': 8}),
+                        dcc.Dropdown(
+                            id='interval-band',
+                            options=band_options(),
+                            value=DEFAULT_BAND,
+                            clearable=False,
+                            persistence=True, persistence_type='local',
+                            style={'marginTop': 6}
                         )
                     ], style={'marginBottom': 12}),
                     html.Div(id='select-columns'),
@@ -67,9 +82,19 @@ def layout():
                     ], style={'display': 'none'}),
 
                     html.Div(className="d-flex justify-content-between", children=[
-                        html.Button('Forecast', id='forecast-btn', n_clicks=0, className="btn btn-primary"),
+                        html.Div([
+                            html.Button('Forecast', id='forecast-btn', n_clicks=0, className="btn btn-primary"),
+                            dbc.Button("Batal", id='forecast-cancel-btn', n_clicks=0, color="danger", outline=True,
+                                       disabled=True, className="ms-2"),
+                        ]),
                         dbc.Button("Reset Upload", id="reset-upload", color="secondary", outline=True, className="ms-2")
                     ]),
+                    # ✅ progress forecast (diisi dari tahap pipeline oleh background callback)
+                    html.Div(
+                        dbc.Progress(id='forecast-progress', value=0, label="", striped=True, animated=True,
+                                     style={'height': '18px'}),
+                        id='forecast-progress-box', className="mt-2", style={'display': 'none'},
+                    ),
                     html.Div(id="upload-hint", className="mt-2 text-muted", style={'fontSize': 12})
                 ]
             )
@@ -96,7 +121,9 @@ def layout():
                     children=[
                         html.Pre(id='forecast-log', style={'fontSize': '12px', 'whiteSpace': 'pre-wrap', 'background': '#f7f7f9', 'padding': '8px', 'borderRadius': '8px', 'minHeight': '54px'}),
                         html.Div(id='forecast-result', className='mt-3'),
-                        dcc.Graph(id='forecast-chart', config={'displayModeBar': True}, style={'height': '420px', 'marginTop': 12}),
+                        dcc.Graph(id='forecast-chart', figure=empty_figure(), config={'displayModeBar': True}, style={'height': '420px', 'marginTop': 12}),
+                        dbc.Button("Muat histori lebih lama", id='history-more', n_clicks=0, size='sm',
+                                   color='secondary', outline=True, className='mt-2'),
                         # dbc.Button("💾 Save Forecast",id="save-forecast-btn",color="success",className="mt-3",n_clicks=0 )
 
                         
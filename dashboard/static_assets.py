@@ -0,0 +1,258 @@
+# dashboard/static_assets.py
+"""
+Self-hosted static assets: vendored theme / icons + the dashboard's own assets,
+served with content-hashed names, far-future cache headers and precompressed
+gzip / brotli variants.
+
+Sources
+  dashboard/vendor/   Flatly (Bootswatch 5.3.5) and Bootstrap Icons 1.13.1, committed
+                      with the app so offline hosts never call a CDN (pinned URLs in
+                      VENDOR_FILES, sha256 in vendor/MANIFEST.json); refresh them
+                      with `python -m dashboard.static_assets vendor` (needs network),
+                      check them with `... verify`
+  dashboard/assets/   custom.css and the clientside scripts
+
+build() runs at startup (create_dash_app) and writes into <CACHE_DIR>/static:
+  - every file renamed to <name>.<sha256[:12]><ext>; url(...) references inside
+    CSS (icon fonts) are rewritten to the hashed names first, so a changed font
+    also changes the stylesheet's hash;
+  - .gz (and .br when the `brotli` package is installed) next to every
+    compressible file.
+serve() answers /static/<hashed name> with Cache-Control immutable (1 year),
+picking the .br / .gz variant from Accept-Encoding.
+
+Missing vendored files are a startup error when the profile sets
+STATIC_VENDOR_REQUIRED (production); elsewhere (development) the theme / icons
+fall back to the CDN URLs with a warning, so a fresh checkout still renders.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+VENDOR_DIR = os.path.join(HERE, "vendor")
+ASSETS_DIR = os.path.join(HERE, "assets")
+URL_PREFIX = "/static/"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+BOOTSWATCH = "https://cdn.jsdelivr.net/npm/bootswatch@5.3.5/dist"
+BOOTSTRAP_ICONS = "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.13.1/font"
+# vendor path -> pinned source URL
+VENDOR_FILES = {
+    "flatly/bootstrap.min.css": f"{BOOTSWATCH}/flatly/bootstrap.min.css",
+    "bootstrap-icons/bootstrap-icons.min.css": f"{BOOTSTRAP_ICONS}/bootstrap-icons.min.css",
+    "bootstrap-icons/fonts/bootstrap-icons.woff2": f"{BOOTSTRAP_ICONS}/fonts/bootstrap-icons.woff2",
+    "bootstrap-icons/fonts/bootstrap-icons.woff": f"{BOOTSTRAP_ICONS}/fonts/bootstrap-icons.woff",
+}
+# stylesheets in page order (theme first, then icons)
+VENDOR_STYLESHEETS = ["flatly/bootstrap.min.css", "bootstrap-icons/bootstrap-icons.min.css"]
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".map", ".ttf", ".txt"}
+
+_URL_RE = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+
+# source path (relative to its root, prefixed "vendor/" or "assets/") -> hashed name
+_manifest = {}
+_build_dir = None
+
+
+def _hashed_name(rel: str, content: bytes) -> str:
+    base, ext = os.path.splitext(rel)
+    return f"{base}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def _write(path: str, content: bytes) -> None:
+    if os.path.exists(path):
+        return   # same name = same content
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(content)
+    os.replace(path + ".tmp", path)
+
+
+def _compress(path: str, content: bytes) -> None:
+    if os.path.splitext(path)[1] not in COMPRESSIBLE:
+        return
+    if not os.path.exists(path + ".gz"):
+        _write(path + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return
+    if not os.path.exists(path + ".br"):
+        _write(path + ".br", brotli.compress(content, quality=11))
+
+
+def _rewrite_css(content: bytes, rel: str, names: dict) -> bytes:
+    """Point url(...) references of a CSS file at the hashed names of the files they load."""
+    css_dir = os.path.dirname(rel)
+
+    def replace(match):
+        quote, ref = match.group(1), match.group(2)
+        if ref.startswith(("data:", "http:", "https:", "/")):
+            return match.group(0)
+        path, sep, rest = ref, "", ""
+        cut = re.search(r"[?#]", ref)
+        if cut:
+            path, sep, rest = ref[:cut.start()], ref[cut.start()], ref[cut.start() + 1:]
+        target = os.path.normpath(os.path.join(css_dir, path)).replace(os.sep, "/")
+        if target not in names:
+            return match.group(0)
+        hashed = os.path.relpath(names[target], css_dir or ".").replace(os.sep, "/")
+        # the query string of the source (cache buster) is dropped, the name now carries the hash
+        return f"url({quote}{hashed}{'#' + rest if sep == '#' else ''}{quote})"
+
+    return _URL_RE.sub(replace, content.decode("utf-8")).encode("utf-8")
+
+
+def _sources():
+    """(key, root, rel) of every file to publish; non-CSS first so CSS can reference them."""
+    found = []
+    for prefix, root in (("vendor", VENDOR_DIR), ("assets", ASSETS_DIR)):
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                if name.startswith(".") or name == "MANIFEST.json":
+                    continue
+                rel = os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/")
+                found.append((f"{prefix}/{rel}", root, rel))
+    return sorted(found, key=lambda f: (f[2].endswith(".css"), f[0]))
+
+
+def build(cache_dir: str) -> dict:
+    """Publish all sources into <cache_dir>/static; returns {source key: hashed name}."""
+    global _build_dir
+    out_dir = os.path.join(cache_dir, "static")
+    names, manifest = {}, {}
+    for key, root, rel in _sources():
+        with open(os.path.join(root, rel), "rb") as f:
+            content = f.read()
+        prefix = key.split("/", 1)[0]
+        if rel.endswith(".css"):
+            content = _rewrite_css(content, rel, names.get(prefix, {}))
+        hashed = _hashed_name(rel, content)
+        names.setdefault(prefix, {})[rel] = hashed
+        manifest[key] = f"{prefix}/{hashed}"
+        path = os.path.join(out_dir, prefix, hashed)
+        _write(path, content)
+        _compress(path, content)
+    _manifest.clear()
+    _manifest.update(manifest)
+    _build_dir = out_dir
+    print(f"[static] {len(manifest)} files published to {out_dir}")
+    return manifest
+
+
+def url(key: str):
+    """Hashed URL of a published source (e.g. 'assets/custom.css'), None if not built."""
+    hashed = _manifest.get(key)
+    return URL_PREFIX + hashed if hashed else None
+
+
+def stylesheets() -> list:
+    """Theme + icons + local CSS; CDN URLs for vendored files that are missing."""
+    sheets = []
+    for rel in VENDOR_STYLESHEETS:
+        local = url(f"vendor/{rel}")
+        if local is None:
+            print(f"[static] vendor/{rel} missing, using CDN (run: python -m dashboard.static_assets vendor)")
+        sheets.append(local or VENDOR_FILES[rel])
+    sheets += [url(k) for k in sorted(_manifest) if k.startswith("assets/") and k.endswith(".css")]
+    return sheets
+
+
+def scripts() -> list:
+    """Local scripts in file name order (the order Dash loads assets in)."""
+    return [url(k) for k in sorted(_manifest) if k.startswith("assets/") and k.endswith(".js")]
+
+
+def serve(name: str):
+    """Flask view for /static/<name>: precompressed variant if accepted, immutable caching."""
+    from flask import abort, request, send_from_directory
+    if _build_dir is None:
+        abort(404)
+    accept = request.headers.get("Accept-Encoding", "")
+    mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    response, encoding = None, None
+    for enc, ext in (("br", ".br"), ("gzip", ".gz")):
+        if enc in accept and os.path.isfile(os.path.join(_build_dir, name + ext)):
+            response, encoding = send_from_directory(_build_dir, name + ext, mimetype=mimetype), enc
+            break
+    if response is None:
+        response = send_from_directory(_build_dir, name, mimetype=mimetype)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+def missing_vendor() -> list:
+    """VENDOR_FILES not published by the last build()."""
+    return [rel for rel in VENDOR_FILES if f"vendor/{rel}" not in _manifest]
+
+
+def init_app(server, cache_dir: str, require_vendor: bool = False) -> None:
+    """
+    Build the static files and register the /static/<name> route on the Flask server;
+    RuntimeError if `require_vendor` and vendored files are missing (no CDN fallback).
+    """
+    build(cache_dir)
+    missing = missing_vendor()
+    if missing and require_vendor:
+        raise RuntimeError(f"vendored static files missing: {', '.join(missing)} "
+                           f"(run: python -m dashboard.static_assets vendor, and ship dashboard/vendor)")
+    if "dashboard_static" not in server.view_functions:
+        server.add_url_rule(URL_PREFIX + "<path:name>", "dashboard_static", serve)
+
+
+def vendor() -> None:
+    """Download VENDOR_FILES into dashboard/vendor and record their sha256 (needs network once)."""
+    import requests
+    manifest = {}
+    for rel, source in VENDOR_FILES.items():
+        r = requests.get(source, timeout=60)
+        r.raise_for_status()
+        path = os.path.join(VENDOR_DIR, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(r.content)
+        manifest[rel] = {"url": source, "sha256": hashlib.sha256(r.content).hexdigest()}
+        print(f"[static] vendored {rel} ({len(r.content) / 1024:.0f} KB)")
+    with open(os.path.join(VENDOR_DIR, "MANIFEST.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def verify() -> bool:
+    """Check the vendored files against vendor/MANIFEST.json."""
+    try:
+        with open(os.path.join(VENDOR_DIR, "MANIFEST.json")) as f:
+            manifest = json.load(f)
+    except OSError:
+        print("[static] vendor/MANIFEST.json missing")
+        return False
+    ok = True
+    for rel, entry in manifest.items():
+        try:
+            with open(os.path.join(VENDOR_DIR, rel), "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            digest = None
+        if digest != entry["sha256"]:
+            print(f"[static] {rel}: {'missing' if digest is None else 'checksum mismatch'}")
+            ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "vendor":
+        vendor()
+    elif command == "verify":
+        sys.exit(0 if verify() else 1)
+    elif command == "build":
+        build(os.environ.get("CACHE_DIR") or os.path.join(os.path.dirname(HERE), ".cache"))
+    else:
+        sys.exit("usage: python -m dashboard.static_assets [vendor|verify|build]")
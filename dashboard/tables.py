@@ -0,0 +1,130 @@
+# dashboard/tables.py
+"""
+DataTables backed by server-side paging, sorting and filtering.
+
+paged_table() renders an empty DataTable with page_action / sort_action /
+filter_action = 'custom'; a callback on (page_current, page_size, sort_by,
+filter_query) answers with query_frame() over the frame kept on the server
+(dashboard.datastore), so only the visible page is serialized.
+"""
+import math
+
+import pandas as pd
+from dash import dash_table
+
+DEFAULT_PAGE_SIZE = 10
+
+TABLE_STYLE = dict(
+    style_table={'overflowX': 'auto'}, style_cell={'textAlign': 'left', 'padding': '6px'},
+    style_header={'backgroundColor': '#2c3e50', 'color': 'white', 'fontWeight': 'bold'},
+    style_as_list_view=True,
+)
+
+# Dash filter syntax: "{col} op value" joined with " && "
+_OPERATORS = [
+    ('ge ', '>='), ('le ', '<='), ('lt ', '<'), ('gt ', '>'), ('ne ', '!='), ('eq ', '='),
+    ('contains ',), ('datestartswith ',),
+]
+
+
+def paged_table(table_id, columns, page_size: int = DEFAULT_PAGE_SIZE, **kwargs):
+    """Empty custom-paged DataTable; `columns` are ids or full {'name', 'id'} dicts."""
+    return dash_table.DataTable(
+        id=table_id,
+        columns=[c if isinstance(c, dict) else {"name": c, "id": c} for c in columns],
+        data=[],
+        page_current=0,
+        page_size=page_size,
+        page_action='custom',
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
+        **{**TABLE_STYLE, **kwargs},
+    )
+
+
+def _split_filter_part(part):
+    for operators in _OPERATORS:
+        for op in operators:
+            if op in part:
+                name_part, value_part = part.split(op, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+                value = value_part.strip()
+                if value and value[0] == value[-1] and value[0] in ("'", '"', '`'):
+                    value = value[1:-1].replace('\\\\' + value[0], value[0])
+                else:
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        pass
+                return name, operators[0].strip(), value
+    return None, None, None
+
+
+def _text(value) -> str:
+    # unquoted numbers arrive as floats: {timestamp} > 2024 / contains 2024 mean '2024', not '2024.0'
+    return str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+
+
+def _comparable(series: pd.Series, value):
+    """(series, operand) converted to the column's dtype, or (None, None) when they do not match."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        try:
+            operand = pd.to_datetime(_text(value))
+        except (ValueError, TypeError, OverflowError):
+            return None, None
+        tz = getattr(series.dt, 'tz', None)
+        if tz is not None:
+            operand = operand.tz_localize(tz) if operand.tzinfo is None else operand.tz_convert(tz)
+        elif operand.tzinfo is not None:
+            operand = operand.tz_localize(None)
+        return series, operand
+    if isinstance(value, float):
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return series, value
+        # text column holding numbers (e.g. '-' placeholders): compare what parses
+        return pd.to_numeric(series, errors='coerce'), value
+    return series.astype(str), str(value)
+
+
+def apply_filter(df: pd.DataFrame, filter_query: str) -> pd.DataFrame:
+    """Rows matching the Dash filter query; a part whose operand does not fit its column is ignored."""
+    for part in (filter_query or '').split(' && '):
+        col, op, value = _split_filter_part(part)
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if op in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
+            series, operand = _comparable(series, value)
+            if series is None:
+                continue
+            try:
+                df = df[getattr(series, op)(operand).fillna(False).astype(bool)]
+            except TypeError:
+                continue
+        elif op == 'contains':
+            df = df[series.astype(str).str.contains(_text(value), case=False, regex=False, na=False)]
+        elif op == 'datestartswith':
+            df = df[series.astype(str).str.startswith(_text(value))]
+    return df
+
+
+def query_frame(df: pd.DataFrame, page_current, page_size, sort_by=None, filter_query=None):
+    """(records of the requested page, page_count) after filtering and sorting `df`."""
+    if df is None or df.empty:
+        return [], 1
+    df = apply_filter(df, filter_query)
+    sort_by = [s for s in (sort_by or []) if s.get('column_id') in df.columns]
+    if sort_by:
+        df = df.sort_values([s['column_id'] for s in sort_by],
+                            ascending=[s['direction'] == 'asc' for s in sort_by], kind='mergesort')
+    page_size = max(1, int(page_size or DEFAULT_PAGE_SIZE))
+    page_count = max(1, math.ceil(len(df) / page_size))
+    start = min(int(page_current or 0), page_count - 1) * page_size
+    page = df.iloc[start:start + page_size].copy()
+    for col in page.columns:
+        if pd.api.types.is_datetime64_any_dtype(page[col]):
+            page[col] = page[col].dt.strftime('%Y-%m-%d %H:%M:%S').str.replace(' 00:00:00', '', regex=False)
+    return page.to_dict('records'), page_count
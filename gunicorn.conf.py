@@ -0,0 +1,75 @@
+# gunicorn.conf.py
+"""
+Gunicorn config untuk wsgi:application (profil dari APP_ENV, default production).
+
+  WEB_CONCURRENCY    jumlah worker web (default: 2)
+  WEB_THREADS        thread per worker (default: 4, worker class gthread)
+  BIND               alamat listen (default: 0.0.0.0:$PORT atau :8050)
+
+Graceful shutdown (SIGTERM / deploy): worker berhenti menerima request, lalu
+menunggu forecast yang sedang berjalan (app.deadline registry). Forecast yang
+masih jalan setelah DRAIN_CANCEL_AFTER detik di-cancel secara kooperatif
+sehingga mengembalikan hasil parsial, sebelum graceful_timeout habis.
+
+Dengan INFERENCE_WORKERS > 0, pool inference hidup di satu proses terpisah
+(app.inference_service) yang dimulai master saat preload_app, sebelum worker
+di-fork; semua worker memakai pool yang sama dan proses itu dimatikan di on_exit.
+"""
+import os
+import signal
+import threading
+
+# profil dari APP_ENV seperti wsgi.py (default production)
+os.environ.setdefault("APP_ENV", "production")
+
+from config import get_config  # noqa: E402
+
+CONFIG = get_config()
+
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', 8050)}")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+# app.worker_pool.Topology membagi core antar worker web saat INFERENCE_WORKERS=0
+os.environ["WEB_CONCURRENCY"] = str(workers)
+threads = int(os.environ.get("WEB_THREADS", 4))
+worker_class = "gthread"
+# app dirakit sekali di master, worker di-fork (copy-on-write)
+preload_app = True
+# forecast bisa berjalan sampai DEFAULT_TIMEOUT; jangan bunuh worker sebelum itu
+timeout = int(CONFIG.DRAIN_TIMEOUT) + 30
+graceful_timeout = int(CONFIG.DRAIN_TIMEOUT) + 10
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info")
+
+
+def _drain(worker):
+    from app import deadline as deadlines
+    left = deadlines.drain(CONFIG.DRAIN_TIMEOUT, cancel_after=CONFIG.DRAIN_CANCEL_AFTER)
+    worker.log.info("[drain] worker %s: %d forecast(s) still running at exit", worker.pid, left)
+
+
+def post_worker_init(worker):
+    # ML stack di-warm-up per worker (setelah fork), tidak di master
+    if CONFIG.INFERENCE_WARMUP:
+        from app import warmup
+        warmup.start()
+
+    # bungkus handler SIGTERM gunicorn: mulai drain forecast di background
+    original = signal.getsignal(signal.SIGTERM)
+
+    def handle_term(signum, frame):
+        from app import deadline as deadlines
+        n = len(deadlines.active_requests())
+        worker.log.info("[drain] worker %s: SIGTERM, %d forecast(s) in flight", worker.pid, n)
+        threading.Thread(target=_drain, args=(worker,), daemon=True).start()
+        if callable(original):
+            original(signum, frame)
+
+    signal.signal(signal.SIGTERM, handle_term)
+
+
+def on_exit(server):
+    # proses inference (app.inference_service) dimulai master saat preload; matikan setelah worker selesai drain
+    from app.worker_pool import stop_service
+    stop_service()
@@ -0,0 +1,9 @@
+# tests/conftest.py
+"""
+auth.models builds its engine at import from AUTH_DATABASE_URL (.env points
+at MySQL): tests always get a throwaway sqlite database instead.
+"""
+import os
+import tempfile
+
+os.environ["AUTH_DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="forecast-tests-"), "auth.db")
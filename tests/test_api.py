@@ -0,0 +1,34 @@
+# tests/test_api.py
+"""
+app.api: every /forecast route needs a logged-in user, also when the
+blueprint is mounted without the before_request guard.
+
+    python -m pytest tests/test_api.py
+"""
+import pytest
+
+pytest.importorskip("pandas")
+flask = pytest.importorskip("flask")
+flask_login = pytest.importorskip("flask_login")
+
+from app.api import forecast_bp  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    server = flask.Flask(__name__)
+    server.config["SECRET_KEY"] = "test"
+    server.register_blueprint(forecast_bp)
+    login_manager = flask_login.LoginManager(server)
+    login_manager.user_loader(lambda user_id: None)
+    return server.test_client()
+
+
+@pytest.mark.parametrize("method, path", [
+    ("post", "/forecast"),
+    ("post", "/forecast/cancel"),
+    ("get", "/forecast/workers"),
+])
+def test_forecast_routes_need_login(client, method, path):
+    response = getattr(client, method)(path, json={})
+    assert response.status_code == 401
@@ -0,0 +1,82 @@
+# tests/test_chronos_export.py
+"""
+Numerical equivalence of exported Chronos-Bolt graphs (app.chronos_export)
+with the eager pipeline, on a tiny randomly initialised Bolt model (no
+download): TorchScript always, ONNX when onnxruntime is installed.
+
+    python -m pytest tests/test_chronos_export.py
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+chronos_bolt = pytest.importorskip("chronos.chronos_bolt")
+transformers = pytest.importorskip("transformers")
+
+from app import chronos_export  # noqa: E402
+
+NATIVE_QUANTILES = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+CONTEXT_LENGTH = 64
+PREDICTION_LENGTH = 16
+
+
+@pytest.fixture(scope="module")
+def eager():
+    """ChronosBoltPipeline around a 1-layer, 32-dim random model (seeded)."""
+    torch.manual_seed(0)
+    config = transformers.T5Config(
+        vocab_size=2, d_model=32, d_kv=8, d_ff=64, num_layers=1, num_decoder_layers=1, num_heads=4,
+        dense_act_fn="relu", is_gated_act=False, decoder_start_token_id=0, pad_token_id=0,
+    )
+    config.chronos_config = {
+        "context_length": CONTEXT_LENGTH,
+        "prediction_length": PREDICTION_LENGTH,
+        "input_patch_size": 16,
+        "input_patch_stride": 16,
+        "quantiles": NATIVE_QUANTILES,
+        "use_reg_token": True,
+    }
+    model = chronos_bolt.ChronosBoltModelForForecasting(config).eval()
+    return chronos_bolt.ChronosBoltPipeline(model=model)
+
+
+def _export(eager, tmp_path, fmt):
+    return chronos_export.export_model(eager.model, str(tmp_path / fmt), fmt, model_id="tiny-random-bolt")
+
+
+# subsets of the native grid only: for other levels eager Bolt sorts the
+# (possibly crossing) quantiles of a random model before interpolating
+@pytest.mark.parametrize("levels", [NATIVE_QUANTILES, [0.1, 0.5, 0.9]])
+def test_torchscript_matches_eager(eager, tmp_path, levels):
+    sidecar = _export(eager, tmp_path, "torchscript")
+    diff = chronos_export.verify_export("tiny-random-bolt", sidecar, eager=eager, quantile_levels=levels,
+                                        rtol=1e-4, atol=1e-4)
+    assert diff < 1e-4
+
+
+def test_onnx_matches_eager(eager, tmp_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    sidecar = _export(eager, tmp_path, "onnx")
+    assert chronos_export.verify_export("tiny-random-bolt", sidecar, eager=eager) < 1e-3
+
+
+def test_mean_is_native_median(eager, tmp_path):
+    exported = chronos_export.ExportedBoltPipeline(_export(eager, tmp_path, "torchscript"))
+    contexts = chronos_export.synthetic_contexts(4, seed=1)
+    q, mean = exported.predict_quantiles(contexts, 8, [0.5])
+    assert q.shape == (4, 8, 1)
+    np.testing.assert_allclose(mean.numpy(), q[..., 0].numpy(), rtol=1e-6, atol=1e-6)
+
+
+def test_longer_horizon_is_rejected(eager, tmp_path):
+    exported = chronos_export.ExportedBoltPipeline(_export(eager, tmp_path, "torchscript"))
+    assert exported.supports(PREDICTION_LENGTH)
+    assert not exported.supports(PREDICTION_LENGTH + 1)
+    with pytest.raises(ValueError):
+        exported.predict_quantiles(chronos_export.synthetic_contexts(2), PREDICTION_LENGTH + 1, NATIVE_QUANTILES)
+
+
+def test_unknown_format_is_rejected(eager, tmp_path):
+    with pytest.raises(ValueError):
+        chronos_export.export_model(eager.model, str(tmp_path), "tflite")
@@ -0,0 +1,103 @@
+# tests/test_compare_engine.py
+"""
+dashboard.compare_engine.join_actuals against the per-row join the compare
+page used before (unmatched dates, default series, anomaly flag, forecasts
+without band columns) and the actuals upload reader.
+
+    python -m pytest tests/test_compare_engine.py
+"""
+import base64
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from dashboard import compare_engine  # noqa: E402
+
+FORECAST = [
+    {"item_id": "A", "timestamp": "2024-01-01", "mean": 10.0, "p10": 8.0, "p90": 12.0, "p05": 7.0, "p95": 13.0},
+    {"item_id": "A", "timestamp": "2024-01-02", "mean": 11.0, "p10": 9.0, "p90": 13.0, "p05": 8.0, "p95": 14.0},
+    {"item_id": "B", "timestamp": "2024-01-01", "mean": 20.0, "p10": 18.0, "p90": 22.0, "p05": 17.0, "p95": 23.0},
+]
+
+
+def _join(actuals, forecast=FORECAST, **kwargs):
+    joined = compare_engine.join_actuals(pd.DataFrame(actuals), compare_engine.normalized_forecast(forecast),
+                                         **kwargs)
+    return compare_engine.to_records(joined)
+
+
+def test_unmatched_date_has_no_forecast_or_band():
+    row, = _join([{"series": "A", "date": "2024-03-01", "value": 5.0}])
+    assert (row["forecast"], row["error"], row["lower"], row["upper"]) == ("-", "-", "-", "-")
+    assert row["band"] is None
+    assert row["anomaly"] == ""
+
+
+def test_matched_row():
+    row, = _join([{"series": "A", "date": "2024-01-02", "value": 12.0}])
+    assert (row["forecast"], row["error"], row["lower"], row["upper"]) == (11.0, 1.0, 9.0, 13.0)
+    assert row["band"] == "p10-p90"
+
+
+@pytest.mark.parametrize("series, expected", [(None, "A"), ("", "A"), ("B", "B")])
+def test_missing_series_takes_default(series, expected):
+    row, = _join([{"series": series, "date": "2024-01-01", "value": 15.0}])
+    assert row["series"] == expected
+    assert row["forecast"] == {"A": 10.0, "B": 20.0}[expected]
+
+
+def test_no_series_column_uses_requested_series():
+    row, = _join([{"date": "2024-01-01", "value": 15.0}], series_id="B")
+    assert (row["series"], row["forecast"]) == ("B", 20.0)
+
+
+@pytest.mark.parametrize("value, band, anomaly", [
+    (10.0, None, ""),      # inside p10-p90
+    (8.0, None, ""),       # on the bound: inside
+    (7.9, None, "Yes"),    # below
+    (12.1, None, "Yes"),   # above
+    (7.5, "90", ""),       # inside the wider p05-p95 band
+    (13.5, "90", "Yes"),
+])
+def test_anomaly_flag(value, band, anomaly):
+    row, = _join([{"series": "A", "date": "2024-01-01", "value": value}], band=band)
+    assert row["anomaly"] == anomaly
+
+
+def test_forecast_without_band_columns():
+    mean_only = [{k: r[k] for k in ("item_id", "timestamp", "mean")} for r in FORECAST]
+    row, = _join([{"series": "A", "date": "2024-01-01", "value": 100.0}], forecast=mean_only)
+    assert (row["forecast"], row["error"]) == (10.0, 90.0)
+    assert (row["lower"], row["upper"], row["anomaly"]) == ("-", "-", "")
+
+
+def test_previous_join_columns_are_recomputed():
+    stale = {"series": "A", "date": "2024-01-01", "value": 30.0, "forecast": 1.0, "error": 29.0,
+             "lower": 0.0, "upper": 100.0, "band": "p05-p95", "anomaly": "", "alert_sent": True}
+    row, = _join([stale])
+    assert (row["forecast"], row["band"], row["anomaly"], row["alert_sent"]) == (10.0, "p10-p90", "Yes", True)
+
+
+def _upload(csv: str, filename="actuals.csv"):
+    contents = "data:text/csv;base64," + base64.b64encode(csv.encode()).decode()
+    return compare_engine.read_actuals_upload(contents, filename)
+
+
+def test_upload_missing_series_falls_back_to_default():
+    actuals = _upload("Series,Date,Value\nB,2024-01-01,19\n,2024-01-01,9\n")
+    assert actuals["series"].tolist() == ["B", ""]
+    rows = _join(actuals)
+    assert [(r["series"], r["forecast"]) for r in rows] == [("B", 20.0), ("A", 10.0)]
+
+
+def test_upload_without_required_columns():
+    with pytest.raises(ValueError):
+        _upload("when,how_much\n2024-01-01,3\n")
+
+
+def test_upload_without_series_column():
+    actuals = _upload("tanggal,nilai\n2024-01-02,12\n")
+    assert actuals[["series", "date", "value"]].values.tolist() == [["", "2024-01-02", 12]]
+    row, = _join(actuals)
+    assert (row["series"], row["forecast"]) == ("A", 11.0)
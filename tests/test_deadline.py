@@ -0,0 +1,58 @@
+# tests/test_deadline.py
+"""
+app.deadline.drain(): requests still running at shutdown are cancelled early
+enough to return their partial result before the drain timeout.
+
+    python -m pytest tests/test_deadline.py
+"""
+import threading
+import time
+
+import pytest
+
+from app import deadline as deadlines
+from app.deadline import Deadline
+
+
+def _request(started, stop_after_cancel=0.1):
+    """A tracked request that only ends once cancelled (then takes a moment to wrap up)."""
+    deadline = Deadline(None)
+
+    def run():
+        with deadlines.track(deadline):
+            started.set()
+            while not deadline.cancelled:
+                time.sleep(0.02)
+            time.sleep(stop_after_cancel)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return deadline, thread
+
+
+@pytest.mark.parametrize("cancel_after", [None, 1.5, 10.0])
+def test_drain_leaves_grace_after_cancel(cancel_after):
+    started = threading.Event()
+    deadline, thread = _request(started)
+    started.wait(1)
+    t0 = time.monotonic()
+    left = deadlines.drain(1.5, cancel_after=cancel_after, grace=1.0, poll=0.02)
+    assert left == 0
+    assert deadline.cancelled
+    # cancelled at timeout - grace (0.5 s), done well before the timeout
+    assert time.monotonic() - t0 < 1.4
+    thread.join(1)
+
+
+def test_drain_returns_at_once_without_requests():
+    t0 = time.monotonic()
+    assert deadlines.drain(5.0) == 0
+    assert time.monotonic() - t0 < 0.5
+
+
+def test_drain_reports_requests_that_ignore_the_cancel():
+    started = threading.Event()
+    deadline, thread = _request(started, stop_after_cancel=1.0)
+    started.wait(1)
+    assert deadlines.drain(0.6, grace=0.3, poll=0.02) == 1
+    thread.join(2)
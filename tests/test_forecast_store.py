@@ -0,0 +1,130 @@
+# tests/test_forecast_store.py
+"""
+dashboard.forecast_store on a temporary sqlite database: the legacy
+ForecastResult / RealDataInput migration, observation upserts (ON CONFLICT
+and the savepoint fallback other databases use) and alert marking.
+
+    python -m pytest tests/test_forecast_store.py
+"""
+import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sqlalchemy")
+
+from auth import models  # noqa: E402
+from dashboard import forecast_store  # noqa: E402
+
+FORECAST = [
+    {"item_id": "A", "timestamp": f"2024-01-0{d}", "mean": 10.0, "p10": 8.0, "p90": 12.0} for d in (1, 2, 3)
+] + [
+    {"item_id": "B", "timestamp": f"2024-01-0{d}", "mean": 20.0, "p10": 18.0, "p90": 22.0} for d in (1, 2, 3)
+]
+METADATA = {"forecast_id": None, "model_name": "amazon/chronos-bolt-tiny", "uploaded_filename": "data.csv"}
+
+
+@pytest.fixture(params=["on_conflict", "fallback"])
+def db_user(request, tmp_path, monkeypatch):
+    """Fresh database with one user; 'fallback' runs the path used without ON CONFLICT (e.g. MySQL)."""
+    models.init_engine(f"sqlite:///{tmp_path / 'auth.db'}")
+    models.init_db()
+    if request.param == "fallback":
+        monkeypatch.setattr(forecast_store, "_dialect_insert", lambda db: None)
+    with models.get_db_session() as db:
+        db.add(models.User(username="alice", password_hash="x"))
+    return "alice"
+
+
+def _actuals(rows):
+    """Working set rows: (series, date, value[, alert_sent])."""
+    return pd.DataFrame([
+        {"series": s, "date": d, "value": v, "forecast": None, "lower": None, "upper": None,
+         "band": None, "anomaly": "", "alert_sent": rest[0] if rest else False}
+        for s, d, v, *rest in rows
+    ])
+
+
+def _observations():
+    with models.get_db_session() as db:
+        rows = db.query(models.Observation).order_by(models.Observation.series, models.Observation.timestamp)
+        return [(o.series, o.timestamp.strftime("%Y-%m-%d"), o.value, o.alert_sent) for o in rows]
+
+
+def _legacy(username):
+    """Two clicks on the same forecast, each with a real-data blob (old rows carry no series)."""
+    with models.get_db_session() as db:
+        user = db.query(models.User).filter_by(username=username).one()
+        older = datetime.datetime(2024, 2, 1)
+        for i, real in enumerate([
+            [{"date": "2024-01-01", "value": 9.0, "forecast": 10.0, "p10": 8.0, "p90": 12.0}],
+            [{"date": "2024-01-01", "value": 9.5}, {"date": "2024-01-02", "value": 30.0, "series": "B"}],
+        ]):
+            fr = models.ForecastResult(user_id=user.id, model_name="m", uploaded_filename="f.csv",
+                                       forecast_output=FORECAST, created_at=older + datetime.timedelta(days=i))
+            db.add(fr)
+            db.flush()
+            db.add(models.RealDataInput(forecast_id=fr.id, real_data=real,
+                                        created_at=older + datetime.timedelta(days=i)))
+
+
+def test_migrate_legacy_blobs(db_user):
+    _legacy(db_user)
+    stats = forecast_store.migrate_legacy()
+    assert stats == {"legacy_forecasts": 2, "runs": 1, "inserted": 2}
+    # identical forecasts collapse into one run; the newer blob wins; no series -> first series
+    assert _observations() == [("A", "2024-01-01", 9.5, False), ("B", "2024-01-02", 30.0, False)]
+    with models.get_db_session() as db:
+        run = db.query(models.ForecastRun).one()
+        assert run.forecast_output == FORECAST
+        assert run.run_key == forecast_store.run_key(FORECAST)
+        assert run.updated_at == datetime.datetime(2024, 2, 2)
+
+
+def test_migrate_rerun_is_idempotent(db_user):
+    _legacy(db_user)
+    forecast_store.migrate_legacy()
+    before = _observations()
+    # a value edited after the first migration survives a second run
+    forecast_store.save_observations(db_user, METADATA, FORECAST, _actuals([("A", "2024-01-01", 11.0)]))
+    stats = forecast_store.migrate_legacy()
+    assert stats["runs"] == 1 and stats["inserted"] == 0
+    after = _observations()
+    assert len(after) == len(before)
+    assert after[0] == ("A", "2024-01-01", 11.0, False)
+    with models.get_db_session() as db:
+        assert db.query(models.ForecastRun).count() == 1
+
+
+def test_upsert_replaces_point(db_user):
+    run_id = forecast_store.save_observations(
+        db_user, METADATA, FORECAST, _actuals([("A", "2024-01-01", 9.0), ("A", "2024-01-02", 10.0)]))
+    again = forecast_store.save_observations(
+        db_user, METADATA, FORECAST, _actuals([("A", "2024-01-02", 12.5), ("B", "2024-01-02", 21.0)]))
+    assert again == run_id
+    assert _observations() == [
+        ("A", "2024-01-01", 9.0, False), ("A", "2024-01-02", 12.5, False), ("B", "2024-01-02", 21.0, False),
+    ]
+
+
+def test_upsert_counts_and_keep_existing(db_user):
+    with models.get_db_session() as db:
+        user_id = db.query(models.User.id).scalar()
+        run = forecast_store._ensure_run(db, user_id, "k", FORECAST, METADATA)
+        assert forecast_store.upsert_observations(db, run, _actuals([("A", "2024-01-01", 1.0)])) == (1, 0)
+        assert forecast_store.upsert_observations(
+            db, run, _actuals([("A", "2024-01-01", 2.0), ("A", "2024-01-03", 3.0)])) == (1, 1)
+        assert forecast_store.upsert_observations(
+            db, run, _actuals([("A", "2024-01-01", 99.0)]), overwrite=False) == (0, 0)
+    assert [o[2] for o in _observations()] == [2.0, 3.0]
+
+
+def test_mark_alert_sent(db_user):
+    forecast_store.save_observations(
+        db_user, METADATA, FORECAST, _actuals([("A", "2024-01-01", 30.0), ("A", "2024-01-02", 10.0)]))
+    assert forecast_store.mark_alert_sent(db_user, METADATA, FORECAST, "A", "2024-01-01") == 1
+    assert forecast_store.mark_alert_sent(db_user, METADATA, FORECAST, "A", "2024-01-09") == 0
+    assert [o[3] for o in _observations()] == [True, False]
+    # the flag comes back with the working set
+    _, _, actuals = forecast_store.latest_run(db_user)
+    assert actuals.set_index("date")["alert_sent"].to_dict() == {"2024-01-01": True, "2024-01-02": False}
@@ -0,0 +1,54 @@
+# tests/test_static_assets.py
+"""
+Vendored theme / icons (dashboard/vendor) are complete and the production
+profile, which refuses to fall back to the CDN, starts with them.
+
+    python -m pytest tests/test_static_assets.py
+"""
+import pytest
+
+from dashboard import static_assets
+
+
+@pytest.fixture(scope="module")
+def built(tmp_path_factory):
+    return static_assets.build(str(tmp_path_factory.mktemp("cache")))
+
+
+def test_vendor_files_match_manifest():
+    assert static_assets.verify()
+
+
+def test_no_vendor_file_missing(built):
+    assert static_assets.missing_vendor() == []
+    # theme + icons come from /static/, never from the CDN
+    sheets = static_assets.stylesheets()
+    assert all(s.startswith(static_assets.URL_PREFIX) for s in sheets)
+
+
+def test_icon_fonts_point_at_hashed_names(built):
+    css_key = "vendor/bootstrap-icons/bootstrap-icons.min.css"
+    with open(static_assets._build_dir + "/" + built[css_key], encoding="utf-8") as f:
+        css = f.read()
+    for font in ("woff2", "woff"):
+        hashed = built[f"vendor/bootstrap-icons/fonts/bootstrap-icons.{font}"]
+        assert hashed.rsplit("/", 1)[1] in css
+
+
+def test_production_app_starts(tmp_path, monkeypatch):
+    pytest.importorskip("flask")
+    pytest.importorskip("dash")
+    pytest.importorskip("sqlalchemy")
+    from config import ProductionConfig
+    from app_factory import create_app
+
+    assert ProductionConfig.STATIC_VENDOR_REQUIRED
+    monkeypatch.setattr(ProductionConfig, "SECRET_KEY", "test")
+    monkeypatch.setattr(ProductionConfig, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(ProductionConfig, "INIT_DB", True)
+    monkeypatch.delenv("INFERENCE_ADDRESS", raising=False)
+    monkeypatch.setenv("INFERENCE_WORKERS", "0")
+
+    flask_app = create_app(ProductionConfig)
+    response = flask_app.test_client().get("/login")
+    assert response.status_code == 200
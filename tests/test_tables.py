@@ -0,0 +1,75 @@
+# tests/test_tables.py
+"""
+dashboard.tables.apply_filter: Dash filter queries compared in each
+column's dtype (numeric, datetime, text), and malformed queries.
+
+    python -m pytest tests/test_tables.py
+"""
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("dash")
+
+from dashboard.tables import apply_filter, query_frame  # noqa: E402
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "num": [1.5, 10.0, 2.0, None],
+        "ts": pd.to_datetime(["2023-12-31", "2024-01-01", "2024-06-15", "2025-02-01"]),
+        "name": ["alpha", "Beta", "gamma 10", "delta"],
+        "mixed": ["3", "-", "12", "7"],          # numbers with '-' placeholders, stored as text
+    })
+
+
+@pytest.mark.parametrize("query, expected", [
+    # numeric
+    ("{num} > 2", [1]),
+    ("{num} <= 2", [0, 2]),
+    ("{num} = 10", [1]),
+    ("{num} contains 1", [0, 1]),
+    # datetime: the year arrives as the float 2024.0
+    ("{ts} > 2024", [2, 3]),
+    ("{ts} <= 2024-06-15", [0, 1, 2]),
+    ("{ts} = 2024-01-01", [1]),
+    ("{ts} contains 2024", [1, 2]),
+    ("{ts} datestartswith 2025", [3]),
+    # text
+    ("{name} > b", [2, 3]),
+    ("{name} <= alpha", [0, 1]),
+    ("{name} = 'gamma 10'", [2]),
+    ("{name} contains ET", [1]),
+    # text column holding numbers: numeric comparison, placeholders never match
+    ("{mixed} > 5", [2, 3]),
+    ("{mixed} <= 3", [0]),
+    # several parts
+    ("{num} > 1 && {name} contains a", [0, 1, 2]),
+    ("{num} > 1 && {ts} > 2024", [2]),
+])
+def test_filter(frame, query, expected):
+    assert apply_filter(frame, query).index.tolist() == expected
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    None,
+    "{num} ~~ 3",                 # no operator
+    "{unknown} > 3",              # no such column
+    "{ts} > not-a-date",          # operand is not a date
+    "{ts} = 99999999999999999",   # out of datetime range
+])
+def test_malformed_filter_keeps_rows(frame, query):
+    assert apply_filter(frame, query).index.tolist() == [0, 1, 2, 3]
+
+
+def test_malformed_part_does_not_drop_valid_parts(frame):
+    assert apply_filter(frame, "{ts} > not-a-date && {num} > 2").index.tolist() == [1]
+
+
+def test_query_frame_pages_filtered_rows(frame):
+    records, pages = query_frame(frame, 0, 2, sort_by=[{"column_id": "num", "direction": "desc"}],
+                                 filter_query="{num} > 1")
+    assert pages == 2
+    assert [r["num"] for r in records] == [10.0, 2.0]
+    assert records[0]["ts"] == "2024-01-01"
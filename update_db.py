@@ -5,3 +5,7 @@ if __name__ == "__main__":
     print("🔄 Memeriksa dan membuat tabel yang belum ada...")
     init_db()
     print("✅ Struktur database sudah diperbarui (tabel baru ditambahkan jika perlu).")
+
+    # ForecastResult / RealDataInput lama -> forecast_runs / observations (aman dijalankan ulang)
+    from dashboard.forecast_store import migrate_legacy
+    migrate_legacy()
@@ -0,0 +1,19 @@
+# wsgi.py
+"""
+Entry point production (WSGI):
+
+    APP_ENV=production SECRET_KEY=... gunicorn -c gunicorn.conf.py wsgi:application
+
+App dirakit sekali oleh app_factory.create_app() dengan profil dari APP_ENV (default di sini:
+production). Dengan preload_app di gunicorn.conf.py ini terjadi di master,
+lalu worker di-fork dan berbagi memori app yang sudah jadi.
+"""
+import os
+
+os.environ.setdefault("APP_ENV", "production")
+
+from config import get_config  # noqa: E402
+from app_factory import create_app  # noqa: E402
+
+application = create_app(get_config())
+app = application